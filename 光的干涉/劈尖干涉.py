@@ -1,4 +1,12 @@
 import math
+import os
+import sys
+
+# 结果修约使用 数据处理工具/有效数字.py 中的 round_to_uncertainty (与批量处理工具的修约规则相同)，
+# 仪器误差限按每个读数从 数据处理工具/仪器检定.csv 查出 (仪器登记.py)
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "数据处理工具"))
+from 有效数字 import round_to_uncertainty
+from 仪器登记 import get_instrument
 
 # --- 用户输入区 ---
 # 请将你的实验数据填入下面的列表中
@@ -20,7 +28,7 @@ user_data_groups = [
 # --- 常量定义 ---
 lambda_nm = 589.3  # 光的波长 (nm)，例如钠黄光平均波长。请根据实际情况修改。
 k_fringes = 10     # 测量的暗纹条数 (固定为10)
-delta_ins_mm = 0.005 # 仪器允许误差极限 (mm)，例如与牛顿环实验相同。请根据实际情况修改。
+instrument_key = "reading_microscope" # 所用仪器在 仪器检定.csv 中的代号 (Δ_ins、误差分布按读数所在量程段查出)
 # --- END 用户输入区 ---
 
 lambda_mm = lambda_nm * 1e-6  # 波长转换为 mm
@@ -47,11 +55,11 @@ def calculate_type_A_uncertainty(std_dev, num_measurements):
         return 0.0
     return std_dev / math.sqrt(num_measurements) if num_measurements > 0 else float('inf')
 
-def calculate_type_B_uncertainty_from_instrument_two_readings(delta_ins):
+def calculate_type_B_uncertainty_from_instrument_two_readings(instrument, reading_1, reading_2):
     """计算由两次读数确定的长度 (如 x 或 L) 因仪器误差极限引起的B类不确定度"""
-    # u(Reading) = delta_ins / sqrt(3)
-    # u(Length = |R2 - R1|) = sqrt(u(R1)^2 + u(R2)^2) = delta_ins * sqrt(2/3)
-    return delta_ins * math.sqrt(2.0/3.0)
+    # u(Reading) 按检定表中该读数所在量程段的 Δ_ins 和误差分布查出 (矩形分布时 = delta_ins / sqrt(3))
+    # u(Length = |R2 - R1|) = sqrt(u(R1)^2 + u(R2)^2)，同一量程段时 = delta_ins * sqrt(2/3)
+    return float(instrument.type_b_difference(reading_1, reading_2))
 
 def calculate_combined_uncertainty_of_mean_length(type_A_uncertainty_of_mean, type_B_uncertainty_single_measurement):
     """计算平均长度 (如 x_avg 或 L_avg) 的合成不确定度"""
@@ -62,8 +70,11 @@ def calculate_combined_uncertainty_of_mean_length(type_A_uncertainty_of_mean, ty
 if not user_data_groups:
     print("错误：用户数据列表 user_data_groups 为空，请输入数据后再运行。")
 else:
+    instrument = get_instrument(instrument_key)
     x_values = []  # 存储每组计算得到的10条暗纹长度x
     L_measurement_values = [] # 存储每组计算得到的劈尖总长度L
+    uB_x_values = []  # 每组 x 和 L 的B类不确定度
+    uB_L_values = []
 
     for group_data in user_data_groups:
         X_init, X_fin, L_init, L_fin = group_data
@@ -71,6 +82,11 @@ else:
         L_val_i = abs(L_fin - L_init) # 计算单组的劈尖总长度
         x_values.append(x_i)
         L_measurement_values.append(L_val_i)
+        uB_x_values.append(calculate_type_B_uncertainty_from_instrument_two_readings(instrument, X_init, X_fin))
+        uB_L_values.append(calculate_type_B_uncertainty_from_instrument_two_readings(instrument, L_init, L_fin))
+
+    if any(math.isnan(u) for u in uB_x_values + uB_L_values):
+        sys.exit(f"错误：有读数超出{instrument.name}的检定量程，请检查数据或 仪器检定.csv。")
 
     N = len(user_data_groups) # 测量组数
 
@@ -84,12 +100,14 @@ else:
     std_dev_L = calculate_std_dev(L_measurement_values, mean_L)
     uA_mean_L = calculate_type_A_uncertainty(std_dev_L, N)
 
-    # --- B类不确定度计算 (由仪器误差极限引起，对每次x或L的测量均适用) ---
-    uB_instr_length = calculate_type_B_uncertainty_from_instrument_two_readings(delta_ins_mm)
+    # --- B类不确定度 (由仪器误差极限引起) ---
+    # 同一台仪器的误差在各次测量间不随次数减小，平均值的 uB 取各次测量的 uB 的平均
+    uB_mean_x = calculate_mean(uB_x_values)
+    uB_mean_L = calculate_mean(uB_L_values)
 
     # --- x 和 L 平均值的合成不确定度 ---
-    u_total_mean_x = calculate_combined_uncertainty_of_mean_length(uA_mean_x, uB_instr_length)
-    u_total_mean_L = calculate_combined_uncertainty_of_mean_length(uA_mean_L, uB_instr_length)
+    u_total_mean_x = calculate_combined_uncertainty_of_mean_length(uA_mean_x, uB_mean_x)
+    u_total_mean_L = calculate_combined_uncertainty_of_mean_length(uA_mean_L, uB_mean_L)
 
     # --- 计算玻璃丝直径 D --- (公式 D = L * lambda * k / (2*x))
     if mean_x == 0:
@@ -113,7 +131,9 @@ else:
 
     # --- 结果输出 ---
     print(f"--- 劈尖干涉实验数据处理结果 (N = {N} 组) ---")
-    print(f"常数: λ = {lambda_nm} nm, k = {k_fringes} 条暗纹, Δ_ins = {delta_ins_mm} mm")
+    delta_ins_values = sorted(set(float(d) for d in instrument.limits(user_data_groups).ravel()))
+    print(f"常数: λ = {lambda_nm} nm, k = {k_fringes} 条暗纹, "
+          f"Δ_ins = {', '.join(f'{d:g}' for d in delta_ins_values)} mm ({instrument.name})")
     print("-" * 60)
 
     print("1. 10条暗纹总长度 x 计算 (单位: mm):")
@@ -121,7 +141,7 @@ else:
     print(f"  平均值 x_avg = {mean_x:.4f} mm")
     print(f"  x 值的标准差 S_x = {std_dev_x:.4f} mm")
     print(f"  x_avg 的 A 类不确定度 uA(x_avg) = {uA_mean_x:.4f} mm")
-    print(f"  单次长度测量的 B 类不确定度 uB(instr) = {uB_instr_length:.4f} mm")
+    print(f"  x_avg 的 B 类不确定度 uB(x_avg) = {uB_mean_x:.4f} mm")
     print(f"  x_avg 的合成不确定度 u_c(x_avg) = {u_total_mean_x:.4f} mm")
     print(f"  因此, x = ({mean_x:.4f} ± {u_total_mean_x:.4f}) mm (未规范有效数字)")
     print("-" * 60)
@@ -131,37 +151,16 @@ else:
     print(f"  平均值 L_avg = {mean_L:.4f} mm")
     print(f"  L 值的标准差 S_L = {std_dev_L:.4f} mm")
     print(f"  L_avg 的 A 类不确定度 uA(L_avg) = {uA_mean_L:.4f} mm")
+    print(f"  L_avg 的 B 类不确定度 uB(L_avg) = {uB_mean_L:.4f} mm")
     print(f"  L_avg 的合成不确定度 u_c(L_avg) = {u_total_mean_L:.4f} mm")
     print(f"  因此, L = ({mean_L:.4f} ± {u_total_mean_L:.4f}) mm (未规范有效数字)")
     print("-" * 60)
 
     print("3. 玻璃丝直径 D 计算 (单位: mm):")
-    num_decimals_uD = 0
-    if not math.isnan(u_D) and u_D != 0:
-        # 简单规则：u_D首位有效数字若>=3，u_D取1位有效数字，否则取2位。
-        # D的小数位数与u_D对齐。
-        # 此处为简化显示，具体报告时应手动调整。
-        abs_u_D = abs(u_D)
-        if abs_u_D == 0: # Avoid log(0)
-             num_decimals_uD = 4 # Default if u_D is zero
-        elif abs_u_D < 0.0001: # very small uncertainty
-            num_decimals_uD = 5
-        else:
-            # Determine number of significant figures for u_D (1 or 2)
-            # first_digit = int(str(abs_u_D).replace('.', '').lstrip('0')[0])
-            # num_sig_figs_uD = 1 if first_digit >=3 else 2
-            # This logic is tricky, using a simpler fixed approach for now based on magnitude
-            if abs_u_D < 0.001: num_decimals_uD = 5 # e.g. 0.00023
-            elif abs_u_D < 0.01: num_decimals_uD = 4 # e.g. 0.0023
-            elif abs_u_D < 0.1: num_decimals_uD = 3  # e.g. 0.023
-            elif abs_u_D < 1: num_decimals_uD = 3    # e.g. 0.23 (or 0.2 if 1 sig fig)
-            else: num_decimals_uD = 2 # e.g. 1.2 or 12.3 (adjust D accordingly)
-    else:
-        num_decimals_uD = 3 # Default if u_D is NaN or zero, or cannot determine
-    
-    # 确保 D_calculated 和 u_D 不是 NaN
-    d_val_str = f"{D_calculated:.{num_decimals_uD}f}" if not math.isnan(D_calculated) else "NaN"
-    u_d_val_str = f"{abs(u_D):.{num_decimals_uD}f}" if not math.isnan(u_D) else "NaN"
+    # 不确定度保留1-2位有效数字，D 保留到与 u_D 末位相同的数位
+    D_rounded, u_D_rounded, num_decimals_uD = round_to_uncertainty(D_calculated, u_D)
+    d_val_str = f"{D_rounded:.{num_decimals_uD}f}" if not math.isnan(D_calculated) else "NaN"
+    u_d_val_str = f"{u_D_rounded:.{num_decimals_uD}f}" if not math.isnan(u_D) else "NaN"
 
     print(f"  计算得到的 D = {d_val_str} mm")
     print(f"  D 的不确定度 u_D = {u_d_val_str} mm")
@@ -169,4 +168,4 @@ else:
 
     print("最终结果表达式 (D = D_avg ± u_D):")
     print(f"  D = ({d_val_str} ± {u_d_val_str}) mm")
-    print("注意: 上述输出中 D 和 u_D 的小数位数是初步估计，实际报告时请根据不确定度 u_D 的有效数字位数 (通常1-2位) 来规范调整 D 和 u_D 的表示。")
+    print("注意: u_D 按首位数字保留1-2位有效数字 (首位 >= 3 时保留1位)，D 与 u_D 的末位对齐。")
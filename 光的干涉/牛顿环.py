@@ -1,4 +1,12 @@
 import math
+import os
+import sys
+
+# 结果修约使用 数据处理工具/有效数字.py 中的 round_to_uncertainty (与批量处理工具的修约规则相同)，
+# 仪器误差限按每个读数从 数据处理工具/仪器检定.csv 查出 (仪器登记.py)
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "数据处理工具"))
+from 有效数字 import round_to_uncertainty
+from 仪器登记 import get_instrument
 
 # --- 用户输入区 ---
 # 请将你的实验数据填入下面的列表中
@@ -20,7 +28,7 @@ user_data_groups = [
 # --- 常量定义 ---
 lambda_nm = 589.3  # 钠黄光平均波长 (nm)
 lambda_mm = lambda_nm * 1e-6  # 波长转换为 mm
-delta_ins_mm = 0.005  # 仪器允许误差极限 (mm)
+instrument_key = "reading_microscope"  # 读数显微镜在 仪器检定.csv 中的代号 (Δ_ins、误差分布按读数所在量程段查出)
 m_ring = 11  # 第 m 个暗环 (远环)
 n_ring = 1   # 第 n 个暗环 (近环)
 
@@ -46,14 +54,13 @@ def calculate_type_A_uncertainty(std_dev, num_measurements):
         return 0.0
     return std_dev / math.sqrt(num_measurements) if num_measurements > 0 else float('inf')
 
-def calculate_type_B_uncertainty_for_Dk_from_instrument(delta_ins):
+def calculate_type_B_uncertainty_for_Dk_from_instrument(instrument, X_left, X_right):
     """
     计算单个直径 Dk = |Xk_R - Xk_L| 由于仪器误差极限引起的B类不确定度.
-    u(X) = delta_ins / sqrt(3) (矩形分布)
-    u(Dk) = sqrt(u(X_R)^2 + u(X_L)^2) = sqrt( (delta_ins/√3)^2 + (delta_ins/√3)^2 )
-          = delta_ins * sqrt(2/3)
+    u(X) 按检定表中该读数所在量程段的 Δ_ins 和误差分布查出 (矩形分布时 u(X) = Δ_ins / sqrt(3))
+    u(Dk) = sqrt(u(X_R)^2 + u(X_L)^2)，两次读数在同一量程段时 = Δ_ins * sqrt(2/3)
     """
-    return delta_ins * math.sqrt(2.0/3.0)
+    return float(instrument.type_b_difference(X_left, X_right))
 
 def calculate_combined_uncertainty_of_mean_Dk(type_A_uncertainty_of_mean, type_B_uncertainty_for_single_Dk_measurement):
     """
@@ -67,8 +74,11 @@ def calculate_combined_uncertainty_of_mean_Dk(type_A_uncertainty_of_mean, type_B
 if not user_data_groups:
     print("错误：用户数据列表 user_data_groups 为空，请输入数据后再运行。")
 else:
+    microscope = get_instrument(instrument_key)
     D1_values = []
     D11_values = []
+    uB_D1_values = []
+    uB_D11_values = []
 
     for group_data in user_data_groups:
         X1_L, X1_R, X11_L, X11_R = group_data
@@ -77,6 +87,11 @@ else:
         d11 = abs(X11_R - X11_L)
         D1_values.append(d1)
         D11_values.append(d11)
+        uB_D1_values.append(calculate_type_B_uncertainty_for_Dk_from_instrument(microscope, X1_L, X1_R))
+        uB_D11_values.append(calculate_type_B_uncertainty_for_Dk_from_instrument(microscope, X11_L, X11_R))
+
+    if any(math.isnan(u) for u in uB_D1_values + uB_D11_values):
+        sys.exit(f"错误：有读数超出{microscope.name}的检定量程，请检查数据或 仪器检定.csv。")
 
     N = len(user_data_groups) # 测量组数
 
@@ -90,12 +105,14 @@ else:
     std_dev_D11 = calculate_std_dev(D11_values, mean_D11)
     uA_mean_D11 = calculate_type_A_uncertainty(std_dev_D11, N)
 
-    # --- B类不确定度计算 (由仪器误差极限引起，对每次Dk测量均适用) ---
-    uB_instr_Dk = calculate_type_B_uncertainty_for_Dk_from_instrument(delta_ins_mm)
+    # --- B类不确定度 (由仪器误差极限引起) ---
+    # 同一台仪器的误差在各次测量间不随次数减小，平均值的 uB 取各次 Dk 的 uB 的平均
+    uB_mean_D1 = calculate_mean(uB_D1_values)
+    uB_mean_D11 = calculate_mean(uB_D11_values)
 
     # --- D1 和 D11 平均值的合成不确定度 ---
-    u_total_mean_D1 = calculate_combined_uncertainty_of_mean_Dk(uA_mean_D1, uB_instr_Dk)
-    u_total_mean_D11 = calculate_combined_uncertainty_of_mean_Dk(uA_mean_D11, uB_instr_Dk)
+    u_total_mean_D1 = calculate_combined_uncertainty_of_mean_Dk(uA_mean_D1, uB_mean_D1)
+    u_total_mean_D11 = calculate_combined_uncertainty_of_mean_Dk(uA_mean_D11, uB_mean_D11)
 
     # --- 计算牛顿环曲率半径 R ---
     # 公式: R = (D_m^2 - D_n^2) / (4 * (m-n) * λ)
@@ -123,7 +140,9 @@ else:
 
     # --- 结果输出 ---
     print(f"--- 实验数据处理结果 (N = {N} 组) ---")
-    print(f"常数: λ = {lambda_nm} nm, Δ_ins = {delta_ins_mm} mm, m = {m_ring}, n = {n_ring}")
+    delta_ins_values = sorted(set(float(d) for d in microscope.limits(user_data_groups).ravel()))
+    print(f"常数: λ = {lambda_nm} nm, Δ_ins = {', '.join(f'{d:g}' for d in delta_ins_values)} mm "
+          f"({microscope.name}), m = {m_ring}, n = {n_ring}")
     print("-" * 40)
 
     print("D1 (第1暗环直径) 计算:")
@@ -131,7 +150,7 @@ else:
     print(f"  平均值 D1_avg = {mean_D1:.4f} mm")
     print(f"  D1 值的标准差 S_D1 = {std_dev_D1:.4f} mm")
     print(f"  D1_avg 的 A 类不确定度 uA(D1_avg) = {uA_mean_D1:.4f} mm")
-    print(f"  单次 Dk 测量的 B 类不确定度 uB(Dk_instr) = {uB_instr_Dk:.4f} mm")
+    print(f"  D1_avg 的 B 类不确定度 uB(D1_avg) = {uB_mean_D1:.4f} mm")
     print(f"  D1_avg 的合成不确定度 u(D1_avg) = {u_total_mean_D1:.4f} mm")
     print(f"  因此, D1 = ({mean_D1:.4f} ± {u_total_mean_D1:.4f}) mm (未考虑有效数字)")
     print("-" * 40)
@@ -141,36 +160,16 @@ else:
     print(f"  平均值 D11_avg = {mean_D11:.4f} mm")
     print(f"  D11 值的标准差 S_D11 = {std_dev_D11:.4f} mm")
     print(f"  D11_avg 的 A 类不确定度 uA(D11_avg) = {uA_mean_D11:.4f} mm")
+    print(f"  D11_avg 的 B 类不确定度 uB(D11_avg) = {uB_mean_D11:.4f} mm")
     print(f"  D11_avg 的合成不确定度 u(D11_avg) = {u_total_mean_D11:.4f} mm")
     print(f"  因此, D11 = ({mean_D11:.4f} ± {u_total_mean_D11:.4f}) mm (未考虑有效数字)")
     print("-" * 40)
 
     print("牛顿环曲率半径 R 计算:")
-    # 根据不确定度位数调整R的报告位数。通常不确定度取1-2位有效数字。
-    # 这里简单用固定小数位，具体报告时应手动调整。
-    # 例如，如果 u_R = 15.3 mm，则报告 u_R = 15 mm 或 u_R = 20mm。R的值保留到相应小数位。
-    # 如果 u_R = 0.53 mm，则报告 u_R = 0.5 mm。R的值保留到0.1 mm。
-    # 这是一个粗略的显示，精确的有效数字处理比较复杂。
-    
-    num_decimals_uR = 0
-    if not math.isnan(u_R) and u_R != 0:
-        if u_R >= 1: # e.g. u_R = 15.3 -> 0 decimals for R if u_R -> 15 or 20. u_R = 1.53 -> 1 decimal.
-            # A simple rule: if u_R's first sig fig is >=3, use 1 sig fig for u_R. Else use 2.
-            # Then match R's decimal places. For simplicity here, fixed decimals.
-            # Let's try to estimate decimals for R and u_R.
-            # For u_R, usually 1 or 2 significant figures.
-            # Example: u_R = 23.45 -> 23. u_R = 2.345 -> 2.3. u_R = 0.2345 -> 0.23
-            if u_R < 0.1: num_decimals_uR = 3 # e.g. 0.023
-            elif u_R < 1: num_decimals_uR = 2 # e.g. 0.23
-            elif u_R < 10: num_decimals_uR = 2 # e.g. 2.3
-            elif u_R < 100: num_decimals_uR = 1 # e.g. 23
-            else: num_decimals_uR = 0 # e.g. 123
-    else: # u_R is NaN or 0
-        num_decimals_uR = 2 # Default if cannot determine
-
-    # Ensure R_calculated and u_R are not NaN before formatting
-    r_val_str = f"{R_calculated:.{num_decimals_uR}f}" if not math.isnan(R_calculated) else "NaN"
-    u_r_val_str = f"{u_R:.{num_decimals_uR}f}" if not math.isnan(u_R) else "NaN"
+    # 不确定度保留1-2位有效数字，R 保留到与 u_R 末位相同的数位
+    R_rounded, u_R_rounded, num_decimals_uR = round_to_uncertainty(R_calculated, u_R)
+    r_val_str = f"{R_rounded:.{num_decimals_uR}f}" if not math.isnan(R_calculated) else "NaN"
+    u_r_val_str = f"{u_R_rounded:.{num_decimals_uR}f}" if not math.isnan(u_R) else "NaN"
 
     print(f"  计算得到的 R = {r_val_str} mm")
     print(f"  R 的不确定度 u_R = {u_r_val_str} mm")
@@ -178,4 +177,4 @@ else:
 
     print("最终结果表达式 (R = R_avg ± u_R):")
     print(f"  R = ({r_val_str} ± {u_r_val_str}) mm")
-    print("注意: 上述输出中 R 和 u_R 的小数位数是初步估计，实际报告时请根据不确定度 u_R 的有效数字位数 (通常1-2位) 来调整 R 和 u_R 的表示。")
+    print("注意: u_R 按首位数字保留1-2位有效数字 (首位 >= 3 时保留1位)，R 与 u_R 的末位对齐。")
@@ -1,37 +1,62 @@
+import os
+import sys
 
 import numpy as np
 
+# 水的密度及其不确定度使用 数据处理工具/水密度.py (与 实验公式.irregular_density 相同)，
+# 天平的仪器误差限、误差分布和包含因子按每次称量从 数据处理工具/仪器检定.csv 查出 (仪器登记.py)
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "数据处理工具"))
+from 仪器登记 import get_instrument
+from 水密度 import T_MAX_C, T_MIN_C, water_density, water_density_uncertainty
+
 # --- 实验数据和参数 ---
-rho_water = 0.997795  # g/cm³, 水在22°C的密度
+t_water = 22.0        # °C, 实验时的水温
+delta_ins_temp = 0.5  # °C, 温度计的仪器误差限
 m_a = 10.3            # g, 待测物在空气中的质量
 m_asw = 20.6          # g, 物在空气中 + 坠子在水中的系统质量读数
 m_osw = 9.15          # g, 物体和坠子都浸入水中的系统质量读数
-delta_ins_mass = 0.05 # g, 物理天平的仪器误差限
-k_balance = 1.645     # 物理天平测量质量的包含因子
+balance_key = "physical_balance"  # 物理天平在 仪器检定.csv 中的代号
 k_density = 1.0       # 最终密度报告使用的包含因子 (按要求，与天平的k无关)
 
+# --- 水的密度 (Tanaka 2001 公式，适用于 0-40 °C) ---
+if not T_MIN_C <= t_water <= T_MAX_C:
+    sys.exit(f"错误：水温 {t_water} °C 超出水密度公式的适用范围 ({T_MIN_C:g}-{T_MAX_C:g} °C)。")
+rho_water = float(water_density(t_water))
+# 水温不确定度引起的水密度不确定度 u(ρ_water) = |dρ/dt| * u(t)
+u_t_water = delta_ins_temp / np.sqrt(3)
+u_rho_water = float(water_density_uncertainty(t_water, u_t_water))
+
+balance = get_instrument(balance_key)
+masses = np.array([m_a, m_asw, m_osw])
+delta_ins_mass = balance.limits(masses)
+if np.any(np.isnan(delta_ins_mass)):
+    sys.exit(f"错误：称量值超出{balance.name}的检定量程，请检查数据或 仪器检定.csv。")
+k_balance = balance.coverage(masses)
+
 print(f"--- 实验数据 ---")
-print(f"水在22°C的密度 (ρ_water): {rho_water} g/cm³")
+print(f"水温 (t_water): {t_water} °C")
+print(f"水在{t_water}°C的密度 (ρ_water): {rho_water:.6f} g/cm³, u(ρ_water) = {u_rho_water:.1e} g/cm³")
 print(f"待测物在空气中的质量 (m_a): {m_a} g")
 print(f"物在空气中 + 坠子在水中的质量 (m_asw): {m_asw} g")
 print(f"物体和坠子都浸入水中的质量 (m_osw): {m_osw} g")
-print(f"物理天平仪器误差限 (Δ_ins_mass): {delta_ins_mass} g")
-print(f"物理天平对应包含因子 (k_balance): {k_balance}")
+print(f"物理天平仪器误差限 (Δ_ins_mass，依次对应 m_a, m_asw, m_osw): {', '.join(f'{d:g}' for d in delta_ins_mass)} g")
+print(f"物理天平对应包含因子 (k_balance): {', '.join(f'{k:g}' for k in sorted(set(k_balance)))}")
 print(f"最终密度报告使用包含因子 (k_density): {k_density}\n")
 
 # --- 计算过程 ---
 
-# 1. 计算各质量测量的标准不确定度 u_c(m)
-u_b_mass = delta_ins_mass / np.sqrt(3)
+# 1. 计算各质量测量的标准不确定度 u_c(m) (每次称量按所在量程段查表)
+u_b_mass = balance.type_b(masses)
 u_a_mass = 0
-uc_m = np.sqrt(u_a_mass**2 + u_b_mass**2)
+uc_m_a, uc_m_asw, uc_m_osw = np.sqrt(u_a_mass**2 + u_b_mass**2)
 
 print(f"--- 中间计算值 ---")
-print(f"单个质量测量的标准不确定度 u_c(m): {uc_m:.4f} g")
+print(f"各质量测量的标准不确定度 u_c(m_a), u_c(m_asw), u_c(m_osw): "
+      f"{uc_m_a:.4f}, {uc_m_asw:.4f}, {uc_m_osw:.4f} g")
 
 # 2. 计算物体排开水的质量 (m_dw) 及其不确定度
 m_dw = m_asw - m_osw
-uc_m_dw_sq = uc_m**2 + uc_m**2
+uc_m_dw_sq = uc_m_asw**2 + uc_m_osw**2
 uc_m_dw = np.sqrt(uc_m_dw_sq)
 
 print(f"物体排开水的质量 m_dw: {m_dw:.2f} g")
@@ -45,7 +70,7 @@ if rho_water == 0:
 else:
     V_obj = m_dw / rho_water
     if m_dw != 0:
-        relative_uc_V_obj_sq = (uc_m_dw / m_dw)**2
+        relative_uc_V_obj_sq = (uc_m_dw / m_dw)**2 + (u_rho_water / rho_water)**2
         uc_V_obj = V_obj * np.sqrt(relative_uc_V_obj_sq)
     else:
         print("错误: m_dw 为零，无法计算体积不确定度")
@@ -67,9 +92,10 @@ if V_obj == 0:
 else:
     rho_obj = m_a / V_obj
     if m_a != 0 and m_dw != 0:
-        term1_sq_rho = (uc_m / m_a)**2
+        term1_sq_rho = (uc_m_a / m_a)**2
         term2_sq_rho = (uc_m_dw / m_dw)**2
-        relative_uc_rho_obj_sq = term1_sq_rho + term2_sq_rho
+        term3_sq_rho = (u_rho_water / rho_water)**2
+        relative_uc_rho_obj_sq = term1_sq_rho + term2_sq_rho + term3_sq_rho
         relative_uc_rho_obj = np.sqrt(relative_uc_rho_obj_sq)
         uc_rho_obj = rho_obj * relative_uc_rho_obj
     else:
@@ -1,5 +1,14 @@
+import os
+import sys
+
 import numpy as np
 
+# 结果修约使用 数据处理工具/有效数字.py 中的 round_to_uncertainty (与批量处理工具的修约规则相同)，
+# 仪器误差限、误差分布和包含因子按每个读数从 数据处理工具/仪器检定.csv 查出 (仪器登记.py)
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "数据处理工具"))
+from 有效数字 import round_to_uncertainty
+from 仪器登记 import get_instrument
+
 # --- 用户输入数据 ---
 # 请在此处填入您的测量数据和仪器参数
 
@@ -12,23 +21,19 @@ height_measurements = [33.20,33.18,33.20,33.10,33.20,33.12,33.18]         # 示
 # 2. 铝件质量 (单位: g)
 mass_measurement = 35.75 # 示例数据，请替换为您的质量测量值
 
-# 3. 仪器误差参数
-# 长度测量仪器的仪器误差限 (例如，游标卡尺为0.02mm或0.05mm，千分尺为0.004mm)
-# 这个值 'a' 用于计算B类不确定度 u_B = a / sqrt(3)
-delta_ins_length = 0.02           # (mm) 示例数据，请根据您的仪器修改
-delta_ins_mass = 0.05             # (g) (题目给定)
-
-# 4. 包含因子
-k_mass = 1.645                    # (题目给定, 仅用于质量)
+# 3. 所用仪器在 仪器检定.csv 中的代号 (请按实际使用的仪器修改，如螺旋测微器为 "micrometer")
+# 每个读数按其所在量程段查出 Δ_ins 和误差分布 (均匀分布时 u_B = Δ_ins / sqrt(3))，质量的包含因子也从检定表查出
+length_instrument_key = "vernier_caliper"
+mass_instrument_key = "physical_balance"
 
 # --- 辅助函数：计算单个物理量的统计数据和不确定度 ---\
-def calculate_dimension_stats(measurements, delta_ins_dim_val, dimension_name):
+def calculate_dimension_stats(measurements, instrument, dimension_name):
     """
     计算给定测量序列的平均值、标准差、A类、B类及合成标准不确定度。
     
     Args:
         measurements (list): 测量数据列表。
-        delta_ins_dim_val (float): 该物理量的仪器误差限。
+        instrument (仪器登记.Instrument): 测量该物理量的仪器，按每个读数查出 u_B。
         dimension_name (str): 物理量的名称 (用于打印)。
         
     Returns:
@@ -49,83 +54,97 @@ def calculate_dimension_stats(measurements, delta_ins_dim_val, dimension_name):
         std_dev = 0 # 单次测量，标准差为0
         u_A = 0     # 单次测量，A类不确定度为0
     
-    # B类不确定度 (假设为均匀分布)
-    u_B = delta_ins_dim_val / np.sqrt(3)
+    # B类不确定度: 各读数按所在量程段查表；同一台仪器的误差不随测量次数减小，平均值的 u_B 取各读数 u_B 的平均
+    u_B_readings = instrument.type_b(measurements)
+    if np.any(np.isnan(u_B_readings)):
+        sys.exit(f"错误：{dimension_name} 有读数超出{instrument.name}的检定量程，请检查数据或 仪器检定.csv。")
+    u_B = float(np.mean(u_B_readings))
     
     # 合成标准不确定度
     u_c = np.sqrt(u_A**2 + u_B**2)
         
     return mean_val, std_dev, u_A, u_B, u_c
 
+def describe_limits(instrument, readings):
+    """读数所用的仪器误差限 (读数跨越几个量程段时列出各段的值)"""
+    return ", ".join(f"{d:.3f}" for d in sorted(set(float(v) for v in np.ravel(instrument.limits(readings)))))
+
 # --- 计算过程 ---
 
+length_instrument = get_instrument(length_instrument_key)
+mass_instrument = get_instrument(mass_instrument_key)
+
 print("--- 物理量测量结果与不确定度分析 ---")
 
 # 1. 外直径 (D)
-mean_D, std_D, uA_D, uB_D, uc_D = calculate_dimension_stats(outer_diameter_measurements, delta_ins_length, "外直径")
+mean_D, std_D, uA_D, uB_D, uc_D = calculate_dimension_stats(outer_diameter_measurements, length_instrument, "外直径")
 U_D = uc_D # 扩展不确定度 (k=1)
 print(f"外直径 (D):")
 print(f"  测量数据: {outer_diameter_measurements} mm")
 print(f"  平均值: {mean_D:.3f} mm")
 print(f"  标准差 (s_D): {std_D:.3f} mm")
 print(f"  A类不确定度 (u_A(D)): {uA_D:.4f} mm")
-print(f"  B类不确定度 (u_B(D)) (基于 Δ_ins_L = {delta_ins_length:.3f} mm): {uB_D:.4f} mm")
+print(f"  B类不确定度 (u_B(D)) (基于 Δ_ins_L = {describe_limits(length_instrument, outer_diameter_measurements)} mm): {uB_D:.4f} mm")
 print(f"  合成标准不确定度 (u_c(D)): {uc_D:.4f} mm")
 print(f"  扩展不确定度 (U_D, k=1): {U_D:.3f} mm")
 print(f"  测量结果: D = ({mean_D:.3f} ± {U_D:.3f}) mm (k=1)\\n")
 
 # 2. 内直径 (d)
-mean_d, std_d, uA_d, uB_d, uc_d = calculate_dimension_stats(inner_diameter_measurements, delta_ins_length, "内直径")
+mean_d, std_d, uA_d, uB_d, uc_d = calculate_dimension_stats(inner_diameter_measurements, length_instrument, "内直径")
 U_d = uc_d # 扩展不确定度 (k=1)
 print(f"内直径 (d):")
 print(f"  测量数据: {inner_diameter_measurements} mm")
 print(f"  平均值: {mean_d:.3f} mm")
 print(f"  标准差 (s_d): {std_d:.3f} mm")
 print(f"  A类不确定度 (u_A(d)): {uA_d:.4f} mm")
-print(f"  B类不确定度 (u_B(d)) (基于 Δ_ins_L = {delta_ins_length:.3f} mm): {uB_d:.4f} mm")
+print(f"  B类不确定度 (u_B(d)) (基于 Δ_ins_L = {describe_limits(length_instrument, inner_diameter_measurements)} mm): {uB_d:.4f} mm")
 print(f"  合成标准不确定度 (u_c(d)): {uc_d:.4f} mm")
 print(f"  扩展不确定度 (U_d, k=1): {U_d:.3f} mm")
 print(f"  测量结果: d = ({mean_d:.3f} ± {U_d:.3f}) mm (k=1)\\n")
 
 # 3. 凹槽深度 (h_cavity)
-mean_h_cavity, std_h_cavity, uA_h_cavity, uB_h_cavity, uc_h_cavity = calculate_dimension_stats(depth_measurements, delta_ins_length, "凹槽深度")
+mean_h_cavity, std_h_cavity, uA_h_cavity, uB_h_cavity, uc_h_cavity = calculate_dimension_stats(depth_measurements, length_instrument, "凹槽深度")
 U_h_cavity = uc_h_cavity # 扩展不确定度 (k=1)
 print(f"凹槽深度 (h_cavity):")
 print(f"  测量数据: {depth_measurements} mm")
 print(f"  平均值: {mean_h_cavity:.3f} mm")
 print(f"  标准差 (s_h_cavity): {std_h_cavity:.3f} mm")
 print(f"  A类不确定度 (u_A(h_cavity)): {uA_h_cavity:.4f} mm")
-print(f"  B类不确定度 (u_B(h_cavity)) (基于 Δ_ins_L = {delta_ins_length:.3f} mm): {uB_h_cavity:.4f} mm")
+print(f"  B类不确定度 (u_B(h_cavity)) (基于 Δ_ins_L = {describe_limits(length_instrument, depth_measurements)} mm): {uB_h_cavity:.4f} mm")
 print(f"  合成标准不确定度 (u_c(h_cavity)): {uc_h_cavity:.4f} mm")
 print(f"  扩展不确定度 (U_h_cavity, k=1): {U_h_cavity:.3f} mm")
 print(f"  测量结果: h_cavity = ({mean_h_cavity:.3f} ± {U_h_cavity:.3f}) mm (k=1)\\n")
 
 # 4. 总高度 (H)
-mean_H, std_H, uA_H, uB_H, uc_H = calculate_dimension_stats(height_measurements, delta_ins_length, "总高度")
+mean_H, std_H, uA_H, uB_H, uc_H = calculate_dimension_stats(height_measurements, length_instrument, "总高度")
 U_H = uc_H # 扩展不确定度 (k=1)
 print(f"总高度 (H):")
 print(f"  测量数据: {height_measurements} mm")
 print(f"  平均值: {mean_H:.3f} mm")
 print(f"  标准差 (s_H): {std_H:.3f} mm")
 print(f"  A类不确定度 (u_A(H)): {uA_H:.4f} mm")
-print(f"  B类不确定度 (u_B(H)) (基于 Δ_ins_L = {delta_ins_length:.3f} mm): {uB_H:.4f} mm")
+print(f"  B类不确定度 (u_B(H)) (基于 Δ_ins_L = {describe_limits(length_instrument, height_measurements)} mm): {uB_H:.4f} mm")
 print(f"  合成标准不确定度 (u_c(H)): {uc_H:.4f} mm")
 print(f"  扩展不确定度 (U_H, k=1): {U_H:.3f} mm")
 print(f"  测量结果: H = ({mean_H:.3f} ± {U_H:.3f}) mm (k=1)\\n")
 
 # 5. 质量 (m)
-print(f"使用的质量包含因子 k_mass = {k_mass}\\n")
-uB_m = delta_ins_mass / np.sqrt(3)
+uB_m = float(mass_instrument.type_b(mass_measurement))
+if np.isnan(uB_m):
+    sys.exit(f"错误：质量 {mass_measurement} g 超出{mass_instrument.name}的检定量程，请检查数据或 仪器检定.csv。")
+k_mass = float(mass_instrument.coverage(mass_measurement))  # 仅用于质量
+print(f"使用的质量包含因子 k_mass = {k_mass:g}\\n")
 uA_m = 0.0 
 uc_m = np.sqrt(uA_m**2 + uB_m**2)
 U_m = k_mass * uc_m # 仅质量使用特定的k值
 print(f"质量 (m):")
 print(f"  测量值: {mass_measurement:.2f} g")
 print(f"  A类不确定度 (u_A(m)): {uA_m:.4f} g (假设为0，除非有重复称量数据)")
-print(f"  B类不确定度 (u_B(m)) (基于 Δ_ins_m = {delta_ins_mass:.3f} g): {uB_m:.4f} g")
+print(f"  B类不确定度 (u_B(m)) (基于 Δ_ins_m = {describe_limits(mass_instrument, mass_measurement)} g): {uB_m:.4f} g")
 print(f"  合成标准不确定度 (u_c(m)): {uc_m:.4f} g")
-print(f"  扩展不确定度 (U_m, k={k_mass}): {U_m:.3f} g")
-print(f"  测量结果: m = ({mass_measurement:.2f} ± {U_m:.3f}) g (k={k_mass})\\n")
+print(f"  扩展不确定度 (U_m, k={k_mass:g}): {U_m:.3f} g")
+m_rounded, U_m_rounded, num_decimals_m = round_to_uncertainty(mass_measurement, U_m)
+print(f"  测量结果: m = ({m_rounded:.{num_decimals_m}f} ± {U_m_rounded:.{num_decimals_m}f}) g (k={k_mass:g})\\n")
 
 # 6. 体积 (V) 和其不确定度
 # V = π/4 * (D² * H - d² * h_cavity)
@@ -145,10 +164,8 @@ if V_calculated > 0:
     print(f"  计算体积: {V_calculated:.2f} mm³")
     print(f"  体积的合成标准不确定度 (u_c(V)): {uc_V:.2f} mm³")
     print(f"  体积的扩展不确定度 (U_V, k=1): {U_V:.2f} mm³")
-    num_decimals_V = 2 
-    if U_V < 1 : num_decimals_V = 3
-    if U_V < 0.1 : num_decimals_V = 4
-    print(f"  测量结果: V = ({V_calculated:.{num_decimals_V}f} ± {U_V:.{num_decimals_V}f}) mm³ (k=1)\\n")
+    V_rounded, U_V_rounded, num_decimals_V = round_to_uncertainty(V_calculated, U_V)
+    print(f"  测量结果: V = ({V_rounded:.{num_decimals_V}f} ± {U_V_rounded:.{num_decimals_V}f}) mm³ (k=1)\\n")
 else:
     print("  计算体积为零或负，请检查输入数据 (尤其是内径和外径的相对大小以及凹槽深度)。\\n")
 
@@ -171,14 +188,8 @@ if V_calculated > 0:
         U_rho_g_cm3 = U_rho_g_mm3 * 1000
         
         print(f"密度 (ρ):")
-        # 计算用于 g/cm³ 报告的小数位数
-        num_decimals_gcm3 = 2  # 默认2位小数, e.g., 2.70
-        if U_rho_g_cm3 < 0.1:
-            num_decimals_gcm3 = 3
-        if U_rho_g_cm3 < 0.01:
-            num_decimals_gcm3 = 4
-        if U_rho_g_cm3 < 0.001:
-            num_decimals_gcm3 = 5
+        # 不确定度保留1-2位有效数字，密度保留到与其末位相同的数位
+        rho_rounded, U_rho_rounded, num_decimals_gcm3 = round_to_uncertainty(rho_calculated_g_cm3, U_rho_g_cm3)
 
         # 标准不确定度通常可以比扩展不确定度多一位有效数字，这里我们让它比最终报告多一位小数
         num_decimals_uc_gcm3 = num_decimals_gcm3 + 1
@@ -187,7 +198,7 @@ if V_calculated > 0:
         print(f"  密度的合成标准不确定度 (u_c(ρ)): {uc_rho_g_cm3:.{num_decimals_uc_gcm3}f} g/cm³")
         print(f"  密度的扩展不确定度 (U_ρ, k=1): {U_rho_g_cm3:.{num_decimals_gcm3}f} g/cm³")
         
-        print(f"  测量结果: ρ = ({rho_calculated_g_cm3:.{num_decimals_gcm3}f} ± {U_rho_g_cm3:.{num_decimals_gcm3}f}) g/cm³ (k=1)")
+        print(f"  测量结果: ρ = ({rho_rounded:.{num_decimals_gcm3}f} ± {U_rho_rounded:.{num_decimals_gcm3}f}) g/cm³ (k=1)")
 
     else:
         print("质量为零，无法计算密度。")
@@ -1,17 +1,34 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy import stats
 from scipy.interpolate import CubicSpline # 导入 CubicSpline
 
+from 绘图降采样 import downsample_minmax
+
 # 解决matplotlib中文显示问题
 plt.rcParams['font.sans-serif'] = ['SimHei']  # 指定默认字体为黑体
 plt.rcParams['axes.unicode_minus'] = False  # 解决保存图像是负号'-'显示为方块的问题
 
 # --- 请在这里输入您的实验数据 ---
-# 电流数据 (单位: mA)，请按照电压从0V到5V，每隔0.5V的顺序输入11个电流值
-# 例如: current_mA = [0.1, 0.5, 1.2, ...]
-current_mA_input = [0.443, 0.470, 0.545, 0.582, 0.658, 0.816, 0.899, 0.963, 0.997, 1.099, 1.224]  # <--- 在这里填写您的11个电流数据
-current_mA = np.array(current_mA_input) # 转换为numpy array，后续直接使用current_mA
+# 电压数据 (单位: V) 和对应的电流数据 (单位: mA)，两者一一对应，点数和电压间隔不限
+# 例如: voltage_V_input = [0, 0.5, 1.0, ...], current_mA_input = [0.1, 0.5, 1.2, ...]
+voltage_V_input = [0, 0.5, 1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0, 4.5, 5.0]  # <--- 在这里填写电压数据
+current_mA_input = [0.443, 0.470, 0.545, 0.582, 0.658, 0.816, 0.899, 0.963, 0.997, 1.099, 1.224]  # <--- 在这里填写电流数据
+voltage = np.array(voltage_V_input, dtype=float)
+current_mA = np.array(current_mA_input, dtype=float) # 转换为numpy array，后续直接使用current_mA
+
+# 每个电流值的标准不确定度 (mA)，与电流数据一一对应；
+# 填 None 时各点等权拟合 (电流的相对误差各点相同，即 u(lnI) 相同)，u(lnI) 由拟合残差的离散估计。
+# 注意: 只按电流表最后一位 (如 0.001 mA) 给 u(I) 会远小于数据的实际离散，约化 χ² 会达到上千
+u_current_mA_input = None
+
+# 自动选取 ln(I)-U 呈直线 (指数关系) 的电压区间 (长扫描、含饱和段的数据建议打开)；
+# False 时使用全部有效数据点
+auto_select_region = False
+min_region_points = 5         # 自动选取的区间至少包含的点数
+chi2_tolerance = 2.0          # 区间的约化 χ² 不超过最佳区间的这个倍数时，取点数最多的区间
+
+# 绘图时最多使用的数据点数 (来自记录仪的密集扫描会先降采样再绘图，拟合仍使用全部数据)
+max_plot_points = 2000
 
 # 实验时的环境温度 (单位: 开尔文 K)
 # 例如: T = 298.15  (对应 25°C)
@@ -23,22 +40,39 @@ q = 1.602e-19  # 基本电荷 (C)
 k = 1.38e-23   # 玻尔兹曼常数 (J/K)
 
 # 检查数据完整性
-if len(current_mA) != 11:
-    print("错误：电流数据应为11个点！请检查输入。")
+if len(current_mA) != len(voltage):
+    print(f"错误：电压数据 ({len(voltage)} 个) 与电流数据 ({len(current_mA)} 个) 个数不一致！请检查输入。")
+    exit()
+if len(current_mA) < 2:
+    print("错误：至少需要2个数据点！请检查输入。")
     exit()
+scatter_based_u = u_current_mA_input is None
+if scatter_based_u:
+    u_current_mA = np.full(len(current_mA), np.nan)  # 由拟合残差估计，见下文
+else:
+    u_current_mA = np.array(u_current_mA_input, dtype=float)
+    if len(u_current_mA) != len(current_mA) or np.any(u_current_mA <= 0):
+        print("错误：电流不确定度应与电流数据一一对应且均大于0！请检查输入。")
+        exit()
 # if T is None or T <= 0:  <- 温度校验被移除
 #     print("错误：请输入有效的实验温度 (K)！")
 #     exit()
 
-# 电压数据 (V)
-voltage = np.arange(0, 5.1, 0.5)
+# 按电压从小到大排序 (样条插值要求电压递增)
+order = np.argsort(voltage, kind='stable')
+voltage, current_mA, u_current_mA = voltage[order], current_mA[order], u_current_mA[order]
 
 # 将电流从mA转换为A  <- 此步骤移除，直接使用mA单位
 # current_A = np.array(current_mA) / 1000.0
 
+# 最大功率点 (U*I 最大处) 在降采样后也必须保留
+idx_P_max = int(np.argmax(voltage * current_mA)) if len(current_mA) > 0 else 0
+plot_idx = downsample_minmax(len(current_mA), current_mA, max_plot_points, [idx_P_max])
+plot_style = 'o-' if len(current_mA) <= max_plot_points else '-' # 密集数据不画标记点
+
 # --- 绘制 I-U 曲线 ---
 fig1, ax1 = plt.subplots(figsize=(10, 6)) # 获取figure和axes对象
-ax1.plot(voltage, current_mA, 'o-', label='实验数据') # 使用 current_mA
+ax1.plot(voltage[plot_idx], current_mA[plot_idx], plot_style, label='实验数据') # 使用 current_mA
 ax1.set_xlabel('电压 U (V)')
 ax1.set_ylabel('电流 I (mA)') # Y轴单位改为mA
 ax1.set_title('太阳能电池伏安特性曲线 (I-U)')
@@ -76,10 +110,69 @@ plt.savefig('I_U_curve.png')
 print("I-U 曲线已保存为 I_U_curve.png")
 # plt.show() # 如果需要直接显示图像，取消此行注释
 
+# --- 辅助函数：加权直线拟合 ---
+def weighted_sums(x, y, w):
+    """
+    加权最小二乘的充分统计量的前缀和 (第 i 项为前 i 个点的累加)，
+    任意连续区间 [i, j) 的统计量为第 j 项减第 i 项，无需重新遍历数据。
+    """
+    terms = np.stack([w, w * x, w * y, w * x * x, w * x * y, w * y * y])
+    prefix = np.zeros((6, len(x) + 1))
+    np.cumsum(terms, axis=1, out=prefix[:, 1:])
+    return prefix
+
+def fit_from_sums(S, Sx, Sy, Sxx, Sxy, Syy, n):
+    """
+    由充分统计量计算加权直线拟合 y = slope * x + intercept (可对数组逐元素计算)。
+
+    Returns:
+        tuple: slope, intercept, u_slope, u_intercept, r_squared, chi2_red
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        delta = S * Sxx - Sx**2
+        slope = (S * Sxy - Sx * Sy) / delta
+        intercept = (Sxx * Sy - Sx * Sxy) / delta
+        u_slope = np.sqrt(S / delta)
+        u_intercept = np.sqrt(Sxx / delta)
+        # χ² = Σ w (y - slope*x - intercept)^2，展开后只用到充分统计量
+        chi2 = (Syy - 2 * slope * Sxy - 2 * intercept * Sy + slope**2 * Sxx
+                + 2 * slope * intercept * Sx + intercept**2 * S)
+        chi2 = np.maximum(chi2, 0.0)
+        r_squared = 1 - chi2 / (Syy - Sy**2 / S)
+        chi2_red = chi2 / (n - 2)
+    return slope, intercept, u_slope, u_intercept, r_squared, chi2_red
+
+def select_fit_region(prefix, n_points, min_points, tolerance, max_candidates=200, scatter_based=False):
+    """
+    在连续电压区间中选取 ln(I)-U 最接近直线的区间: 先求所有候选区间的最小约化 χ²，
+    再在约化 χ² 不超过 tolerance * max(最小值, 1) 的区间中取点数最多的一个。
+    scatter_based 为 True (等权拟合，u(lnI) 未知) 时约化 χ² 即残差方差，阈值取 tolerance * 最小值。
+    候选端点最多取 max_candidates 个，长扫描数据的计算量与点数无关。
+
+    Returns:
+        tuple: (start, stop)，区间为 [start, stop)
+    """
+    bounds = np.unique(np.linspace(0, n_points, min(max_candidates, n_points) + 1).astype(int))
+    starts, stops = np.meshgrid(bounds, bounds, indexing='ij')
+    starts, stops = starts.ravel(), stops.ravel()
+    keep = stops - starts >= max(min_points, 3)
+    starts, stops = starts[keep], stops[keep]
+    if len(starts) == 0:
+        return 0, n_points
+    sums = prefix[:, stops] - prefix[:, starts]
+    chi2_red = fit_from_sums(*sums, stops - starts)[5]
+    chi2_red = np.where(np.isnan(chi2_red), np.inf, chi2_red)
+    threshold = tolerance * (chi2_red.min() if scatter_based else max(chi2_red.min(), 1.0))
+    acceptable = np.flatnonzero(chi2_red <= threshold)
+    widths = (stops - starts)[acceptable]
+    best = acceptable[np.lexsort((chi2_red[acceptable], -widths))[0]]
+    return int(starts[best]), int(stops[best])
+
 # --- 计算 ln(I) 并处理电流为0或负值的情况 ---
 valid_indices = current_mA > 0 # 基于 current_mA
 voltage_fit = voltage[valid_indices]
 current_mA_fit = current_mA[valid_indices] # 使用 current_mA_fit
+u_current_mA_fit = u_current_mA[valid_indices]
 
 if len(current_mA_fit) < 2:
     print("\n警告：有效电流数据点不足 (小于2个)，无法进行ln(I)-U拟合。")
@@ -99,18 +192,46 @@ else:
     # 线性拟合: ln(I) = β*U + ln(Is) (根据用户公式)
     # 斜率 slope = β
     # 截距 intercept = ln(Is)
-    slope, intercept, r_value, p_value, std_err = stats.linregress(voltage_fit, ln_current)
-    r_squared = r_value**2
+    # u(lnI) = u(I) / I，权重取 1/u(lnI)^2，避免小电流点的 ln(I) 被过度重视；未给出 u(I) 时等权
+    weights = np.ones(len(current_mA_fit)) if scatter_based_u else (current_mA_fit / u_current_mA_fit)**2
+    prefix = weighted_sums(voltage_fit, ln_current, weights)
+    if auto_select_region and len(voltage_fit) > min_region_points:
+        region_start, region_stop = select_fit_region(prefix, len(voltage_fit), min_region_points, chi2_tolerance,
+                                                      scatter_based=scatter_based_u)
+    else:
+        region_start, region_stop = 0, len(voltage_fit)
+    n_region = region_stop - region_start
+    slope, intercept, u_slope, u_intercept, r_squared, chi2_red = fit_from_sums(
+        *(prefix[:, region_stop] - prefix[:, region_start]), n_region)
+    if scatter_based_u:
+        # 等权拟合: u(lnI) 取残差的离散 s = √(χ²/(n-2))，参数不确定度按 s 计算，约化 χ² 相应为1
+        u_ln_current = np.sqrt(chi2_red) if n_region > 2 else np.nan
+        u_slope *= u_ln_current
+        u_intercept *= u_ln_current
+        chi2_red = chi2_red / u_ln_current**2
+    # 约化 χ² 大于1说明数据点的实际离散大于给定的 u(I)，按 √χ²_red 放大参数的不确定度
+    elif n_region > 2 and chi2_red > 1:
+        u_slope *= np.sqrt(chi2_red)
+        u_intercept *= np.sqrt(chi2_red)
 
-    # 计算拟合直线上的点
-    ln_current_fit_line = slope * voltage_fit + intercept
+    # 计算拟合直线上的点 (只画拟合区间)
+    voltage_region = voltage_fit[region_start:region_stop]
+    ln_current_fit_line = slope * voltage_region + intercept
 
     fig2, ax2 = plt.subplots(figsize=(10, 6)) # 获取figure和axes对象
-    ax2.plot(voltage_fit, ln_current, 'o', label='实验数据 ln(I)') # 原始数据点
-    ax2.plot(voltage_fit, ln_current_fit_line, 'r-', label=f'线性拟合: y={slope:.4f}x + {intercept:.4f}\nR$^2$ = {r_squared:.4f}')
+    fit_plot_idx = downsample_minmax(len(ln_current), ln_current, max_plot_points)
+    if len(ln_current) <= max_plot_points:
+        ax2.plot(voltage_fit, ln_current, 'o', label='实验数据 ln(I)') # 原始数据点
+    else:
+        ax2.plot(voltage_fit[fit_plot_idx], ln_current[fit_plot_idx], '-', label='实验数据 ln(I)')
+    # 拟合直线只需两个端点
+    ax2.plot(voltage_region[[0, -1]], ln_current_fit_line[[0, -1]], 'r-', label=f'加权线性拟合: y={slope:.4f}x + {intercept:.4f}\nR$^2$ = {r_squared:.4f}')
+    if n_region < len(voltage_fit):
+        ax2.axvspan(voltage_region[0], voltage_region[-1], color='orange', alpha=0.15, label='拟合区间')
 
     # --- 添加通过数据点的平滑连接曲线 (样条插值) ---
-    if len(voltage_fit) >= 2: # 确保至少有两个点可以进行插值
+    # 数据点本身已经足够密集时不再叠加样条曲线
+    if 2 <= len(voltage_fit) <= 50: # 确保至少有两个点可以进行插值
         # 创建样条插值函数
         cs = CubicSpline(voltage_fit, ln_current)
         # 生成更密集的电压点用于绘制平滑曲线
@@ -151,12 +272,18 @@ else:
     #     # beta_eff = q / (slope * k)    # 旧计算公式，不依赖T
     
     Is = np.exp(intercept) # Is = e^(intercept)，单位现在是 mA
+    u_Is = Is * u_intercept # u(Is) = Is * u(ln Is)
 
     print("\n拟合结果 (基于用户提供公式 lnI = βU + lnIs)：")
+    print(f"拟合区间: U = {voltage_region[0]:.3f} V ~ {voltage_region[-1]:.3f} V ({n_region}/{len(voltage_fit)} 个有效点)")
     print(f"线性拟合方程: ln(I) = {slope:.4f} * U + {intercept:.4f}")
-    print(f"相关系数平方 (R^2): {r_squared:.4f}")
-    print(f"计算得到的反向饱和电流 Is: {Is:.4e} mA") # Is 单位改为 mA
+    print(f"相关系数平方 (加权 R^2): {r_squared:.4f}")
+    if scatter_based_u:
+        print(f"u(lnI) 由残差估计: {u_ln_current:.4f} (即 u(I)/I ≈ {u_ln_current * 100:.1f}%)，约化卡方为1")
+    else:
+        print(f"约化卡方 χ²/(n-2): {chi2_red:.3f}")
+    print(f"计算得到的反向饱和电流 Is: ({Is:.4e} ± {u_Is:.1e}) mA") # Is 单位改为 mA
     # print(f"计算得到的有效 β (β*T): {beta_eff:.4f} K") # 旧输出
-    print(f"计算得到的常数 β (斜率): {beta_formula:.4f} V^-1") # beta 单位不变
+    print(f"计算得到的常数 β (斜率): ({beta_formula:.4f} ± {u_slope:.4f}) V^-1") # beta 单位不变
 
 print("\n--- 分析完成 ---")
@@ -0,0 +1,35 @@
+import numpy as np
+
+# 太阳能电池两个脚本 (伏安特性制图.py、负载特性.py) 共用的绘图降采样函数。
+# 与脚本放在同一文件夹中; 构建报告.py 运行学生目录下的脚本时，学生目录中没有本文件也会使用仓库中的这一份。
+
+
+# --- 辅助函数 ---
+def downsample_minmax(n_points, y_values, max_points, keep_indices=()):
+    """
+    最值分箱降采样: 把数据按顺序分成 max_points/2 个箱，每箱保留最小值和最大值所在的点，
+    曲线的包络 (以及尖峰) 在图上与原始数据一致，绘图点数与原始点数无关。
+
+    Args:
+        n_points (int): 原始数据点数。
+        y_values (np.ndarray): 用于选取最值的纵坐标数据。
+        max_points (int): 降采样后最多保留的点数 (不含 keep_indices)。
+        keep_indices (iterable): 必须保留的点的下标 (如最大功率点)。
+
+    Returns:
+        np.ndarray: 按原顺序排列的保留点下标。
+    """
+    if n_points <= max_points:
+        return np.arange(n_points)
+    n_bins = max(max_points // 2, 1)
+    bin_size = int(np.ceil(n_points / n_bins))
+    padded = np.full(n_bins * bin_size, np.nan)
+    padded[:n_points] = y_values
+    bins = padded.reshape(n_bins, bin_size)
+    offsets = np.arange(n_bins) * bin_size
+    valid = offsets < n_points  # 点数较少时末尾可能出现空箱
+    bins, offsets = bins[valid], offsets[valid]
+    idx_min = offsets + np.nanargmin(bins, axis=1)
+    idx_max = offsets + np.nanargmax(bins, axis=1)
+    keep = np.asarray(list(keep_indices), dtype=int)
+    return np.unique(np.concatenate([idx_min, idx_max, [0, n_points - 1], keep]))
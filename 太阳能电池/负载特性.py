@@ -2,6 +2,8 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
+from 绘图降采样 import downsample_minmax
+
 # 解决matplotlib中文显示问题
 plt.rcParams['font.sans-serif'] = ['SimHei']  # 指定默认字体为黑体
 plt.rcParams['axes.unicode_minus'] = False  # 解决保存图像是负号'-'显示为方块的问题
@@ -16,6 +18,9 @@ U_V = np.array([0.063, 0.854, 1.6, 2.28, 2.85, 3.27, 3.57, 3.81, 3.98, 4.1, 4.2,
 # 电流 I (mA)
 I_mA = np.array([8, 7.9, 7.7, 7.3, 6.9, 6.4, 5.8, 5.3, 4.9, 4.5, 4, 3.7, 3.5, 3.2, 3.1, 2.9, 2.2, 1.5, 1.2, 0.5])
 
+# 绘图时最多使用的数据点数 (来自记录仪的密集扫描会先降采样再绘图，计算仍使用全部数据)
+max_plot_points = 2000
+
 # --- 数据检查 ---
 if not (len(R_ohm) == len(U_V) == len(I_mA)):
     print("错误：输入的电阻、电压、电流数据长度不一致！请检查数据。")
@@ -25,9 +30,18 @@ if not (len(R_ohm) == len(U_V) == len(I_mA)):
 # P = U * I (电压单位V，电流单位mA，则功率单位mW)
 P_mW = U_V * I_mA
 
+# 最大功率点在降采样后也必须保留
+if len(P_mW) > 0:
+    idx_P_max = int(np.argmax(P_mW))
+    plot_idx = downsample_minmax(len(P_mW), P_mW, max_plot_points, [idx_P_max])
+    plot_idx_IU = downsample_minmax(len(I_mA), I_mA, max_plot_points, [idx_P_max])
+else:
+    plot_idx = plot_idx_IU = np.arange(0)
+plot_style = 'o-' if len(P_mW) <= max_plot_points else '-' # 密集数据不画标记点
+
 # --- 绘制 I-U 曲线 ---
 fig1, ax1 = plt.subplots(figsize=(10, 6))
-ax1.plot(U_V, I_mA, 'o-', label='实验数据')
+ax1.plot(U_V[plot_idx_IU], I_mA[plot_idx_IU], plot_style, label='实验数据')
 ax1.set_xlabel('电压 U (V)')
 ax1.set_ylabel('电流 I (mA)')
 ax1.set_title('太阳能电池板负载特性 (I-U曲线)')
@@ -50,7 +64,7 @@ print("I-U 曲线已保存为 load_I_U_curve.png")
 
 # --- 绘制 P-R 依赖关系曲线 ---
 fig2, ax2 = plt.subplots(figsize=(10, 6))
-ax2.plot(R_ohm, P_mW, 'o-', label='实验数据')
+ax2.plot(R_ohm[plot_idx], P_mW[plot_idx], plot_style, label='实验数据')
 ax2.set_xlabel('电阻 R (Ω)')
 ax2.set_ylabel('功率 P (mW)')
 ax2.set_title('太阳能电池板负载特性 (P-R曲线)')
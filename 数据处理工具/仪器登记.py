@@ -0,0 +1,146 @@
+import csv
+import os
+import time
+from functools import lru_cache
+
+import numpy as np
+
+# 仪器登记表: 从检定证书整理出的分段仪器误差限 (仪器检定.csv)，一次性载入为按量程排序的数组，
+# 之后整批读数的B类不确定度由 np.searchsorted 查表得到，不需要逐个读数的 Python 判断。
+#
+# 仪器检定.csv 每行是某台仪器一个量程段的检定结果:
+#   instrument       仪器代号 (程序中使用)
+#   name, unit       仪器名称和读数单位
+#   range_min/max    该段量程 (读数落在 (range_min, range_max] 内使用该段，第一段包含 range_min)
+#   delta_ins        仪器误差限 Δ_ins
+#   distribution     误差分布: uniform (u = Δ/√3)、triangular (u = Δ/√6)、normal (u = Δ/k)
+#   coverage_factor  报告扩展不确定度时使用的包含因子 (正态分布时也是 Δ 对应的包含因子)
+# 请按所用仪器的检定证书修改该文件。
+
+CALIBRATION_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "仪器检定.csv")
+
+DIVISORS = {"uniform": np.sqrt(3), "triangular": np.sqrt(6)}
+
+
+class Instrument:
+    """一台仪器的分段检定数据，各数组按量程上限升序排列"""
+
+    def __init__(self, key, name, unit, rows):
+        rows = sorted(rows, key=lambda r: float(r["range_max"]))
+        self.key = key
+        self.name = name
+        self.unit = unit
+        self.range_min = np.array([float(r["range_min"]) for r in rows])
+        self.range_max = np.array([float(r["range_max"]) for r in rows])
+        self.delta_ins = np.array([float(r["delta_ins"]) for r in rows])
+        self.coverage_factor = np.array([float(r["coverage_factor"]) for r in rows])
+        divisors = []
+        for r in rows:
+            distribution = r["distribution"].strip()
+            if distribution == "normal":
+                divisors.append(float(r["coverage_factor"]))
+            elif distribution in DIVISORS:
+                divisors.append(DIVISORS[distribution])
+            else:
+                raise ValueError(f"仪器 {key} 的误差分布 '{distribution}' 无法识别")
+        self.divisor = np.array(divisors)
+        if np.any(self.range_min[1:] < self.range_max[:-1]):
+            raise ValueError(f"仪器 {key} 的量程段有重叠，请检查检定表")
+        self.contiguous = bool(np.all(self.range_min[1:] == self.range_max[:-1]))
+
+    def segment(self, readings):
+        """
+        返回每个读数所在量程段的下标，超出量程的读数为段数 (即查表数组末尾的 NaN 哨兵)。
+
+        Args:
+            readings (array_like): 任意形状的读数 (取绝对值后查表)。
+        """
+        x = np.abs(np.asarray(readings, dtype=float))
+        n = len(self.range_max)
+        idx = np.searchsorted(self.range_max, x, side="left")
+        if self.contiguous:
+            out_of_range = x < self.range_min[0]
+        else:
+            # 量程段之间有空档时，还要检查读数是否大于所在段的下限
+            idx_safe = np.minimum(idx, n - 1)
+            out_of_range = (x < self.range_min[idx_safe]) | ((x == self.range_min[idx_safe]) & (idx_safe > 0))
+        return np.where(out_of_range, n, idx)
+
+    def _lookup(self, table, readings):
+        # 末尾追加 NaN 作为超出量程时的查表结果，避免再做一次条件选择
+        return np.append(table, np.nan)[self.segment(readings)]
+
+    def limits(self, readings):
+        """每个读数对应的仪器误差限 Δ_ins，超出量程为 NaN"""
+        return self._lookup(self.delta_ins, readings)
+
+    def type_b(self, readings):
+        """每个读数的B类标准不确定度 u_B = Δ_ins / (分布因子)，超出量程为 NaN"""
+        return self._lookup(self.delta_ins / self.divisor, readings)
+
+    def coverage(self, readings):
+        """每个读数对应的包含因子"""
+        return self._lookup(self.coverage_factor, readings)
+
+    def type_b_difference(self, reading_1, reading_2):
+        """
+        由两次读数之差得到的长度 (如 Dk = |X' - X|) 的B类不确定度:
+        u = sqrt(u_B(X)^2 + u_B(X')^2)，两次读数相同量程段时即 Δ_ins * sqrt(2/3)。
+        """
+        return np.sqrt(self.type_b(reading_1)**2 + self.type_b(reading_2)**2)
+
+
+@lru_cache(maxsize=None)
+def load_registry(path=CALIBRATION_PATH):
+    """
+    读取检定表并建立仪器登记表 (同一路径只读取一次)。
+
+    Returns:
+        dict: 仪器代号 -> Instrument
+    """
+    grouped = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            grouped.setdefault(row["instrument"].strip(), []).append(row)
+    return {key: Instrument(key, rows[0]["name"], rows[0]["unit"], rows) for key, rows in grouped.items()}
+
+
+def get_instrument(key, path=CALIBRATION_PATH):
+    """按代号取出仪器，代号不存在时抛出 KeyError 并列出可用的仪器"""
+    registry = load_registry(path)
+    if key not in registry:
+        raise KeyError(f"检定表中没有仪器 '{key}'，可用的仪器: {', '.join(registry)}")
+    return registry[key]
+
+
+# --- 示例: 各实验脚本中读数的B类不确定度 ---
+if __name__ == "__main__":
+    registry = load_registry()
+    print("--- 仪器登记表 ---")
+    for inst in registry.values():
+        for lo, hi, delta, k in zip(inst.range_min, inst.range_max, inst.delta_ins, inst.coverage_factor):
+            print(f"  {inst.name:<16} ({lo:g}, {hi:g}] {inst.unit}: Δ_ins = {delta:g} {inst.unit}, k = {k:g}")
+
+    microscope = get_instrument("reading_microscope")
+    newton_groups = np.array([(19.672, 21.961, 18.038, 23.551), (19.688, 21.975, 18.040, 23.500),
+                              (19.712, 21.978, 18.052, 23.568), (19.712, 21.962, 18.038, 23.510),
+                              (19.722, 22.012, 18.061, 23.588)])
+    uB_D1 = microscope.type_b_difference(newton_groups[:, 0], newton_groups[:, 1])
+    print(f"\n牛顿环 D1 的B类不确定度 uB(Dk_instr): {uB_D1[0]:.4f} mm "
+          f"(Δ_ins √(2/3) = {microscope.limits(newton_groups[0, 0]) * np.sqrt(2 / 3):.4f} mm)")
+
+    caliper = get_instrument("vernier_caliper")
+    lengths = np.array([25.30, 14.72, 22.10, 33.20, 180.0])
+    print(f"游标卡尺读数 {lengths} mm 的 Δ_ins: {caliper.limits(lengths)} mm")
+
+    balance = get_instrument("physical_balance")
+    masses = np.array([10.3, 20.6, 9.15, 35.75, 150.0])
+    print(f"物理天平读数 {masses} g 的 u_B: {np.round(balance.type_b(masses), 4)} g, k = {balance.coverage(masses)}")
+
+    # 整批读数的查表速度
+    readings = np.random.default_rng(0).uniform(0, 300, 10_000_000)
+    start = time.perf_counter()
+    u_B = caliper.type_b(readings)
+    elapsed = time.perf_counter() - start
+    print(f"\n{readings.size:,} 个游标卡尺读数查表用时 {elapsed * 1000:.0f} ms "
+          f"({elapsed / readings.size * 1e9:.1f} ns/读数)")
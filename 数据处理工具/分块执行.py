@@ -0,0 +1,143 @@
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+import 合成数据
+import 实验公式
+
+# 按内存预算分块执行批量计算:
+# - 根据每组数据的字节数和内存预算自动确定块大小；
+# - 输入可以是内存数组或 np.load(..., mmap_mode="r") 打开的 .npy 文件 (整个存档不必读入内存)；
+# - 每块输入先复制到预先分配、各块复用的 float64 缓冲区，原始读数可以用 float32 紧凑存储，
+#   计算仍在 float64 下进行；
+# - 结果写入预先分配的输出数组 (也可以是 .npy 内存映射文件)；
+# - 用 tracemalloc 记录执行期间的峰值内存 (NumPy 的数组分配会被 tracemalloc 统计)。
+
+# --- 常量定义 ---
+INTERMEDIATE_FACTOR = 8   # 计算函数内部临时数组约为输入大小的倍数 (实验公式.py 中的函数一般不超过8倍)
+
+
+# --- 辅助函数 ---
+def plan_chunk_size(inputs, memory_budget_mb, intermediate_factor=INTERMEDIATE_FACTOR):
+    """
+    根据内存预算确定每块的数据组数。
+
+    Args:
+        inputs (dict): 参数名 -> 数组，第0维是数据组。
+        memory_budget_mb (float): 计算过程可以使用的内存 (MB)。
+        intermediate_factor (float): 临时数组相对 float64 输入的倍数。
+
+    Returns:
+        int: 每块的数据组数 (至少为1)
+    """
+    values_per_set = sum(int(np.prod(np.shape(a)[1:], dtype=np.int64)) for a in inputs.values())
+    # float64 缓冲区本身 + 计算中的临时数组
+    bytes_per_set = max(values_per_set, 1) * 8 * (1 + intermediate_factor)
+    return max(1, int(memory_budget_mb * 1024 * 1024 // bytes_per_set))
+
+
+def to_compact(inputs):
+    """原始读数转为 float32 存储 (读数显微镜、游标卡尺读数的有效位数远小于 float32 精度)"""
+    return {k: np.asarray(v, dtype=np.float32) for k, v in inputs.items()}
+
+
+def open_outputs(directory, n_sets, names, dtype=np.float64):
+    """在 directory 下为每个结果创建 .npy 内存映射文件，返回可直接作为 out 传入的 dict"""
+    os.makedirs(directory, exist_ok=True)
+    return {name: np.lib.format.open_memmap(os.path.join(directory, f"{name}.npy"), mode="w+",
+                                            dtype=dtype, shape=(n_sets,))
+            for name in names}
+
+
+def run_chunked(func, inputs, memory_budget_mb=256, out=None, params=None,
+                intermediate_factor=INTERMEDIATE_FACTOR, on_chunk=None):
+    """
+    按内存预算分块调用 func，结果写入预先分配的输出数组。
+
+    Args:
+        func (callable): 实验公式.py 中的函数，接受带批量维的数组，返回 dict。
+        inputs (dict): 参数名 -> 数组 (第0维是数据组，可以是 float32 或内存映射)。
+        memory_budget_mb (float): 计算过程可以使用的内存 (MB)。
+        out (dict): 可选，结果名 -> 预先分配的输出数组 (如 open_outputs 的返回值)；
+                    未给出时在第一块计算后按结果形状分配。
+        params (dict): 可选，传给 func 的非批量参数 (如 lambda_nm)。
+        on_chunk (callable): 可选，每块完成后调用 on_chunk(start, stop)。
+
+    Returns:
+        tuple: out (dict), stats (dict: n_sets, chunk_size, n_chunks, seconds, peak_mb)
+    """
+    if not inputs:
+        raise ValueError("inputs 不能为空")
+    n_sets = len(next(iter(inputs.values())))
+    if any(len(a) != n_sets for a in inputs.values()):
+        raise ValueError("各输入数组的数据组数不一致")
+    params = params or {}
+    chunk_size = min(plan_chunk_size(inputs, memory_budget_mb, intermediate_factor), max(n_sets, 1))
+
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    start_time = time.perf_counter()
+
+    # 各块复用的 float64 输入缓冲区
+    staging = {k: np.empty((chunk_size,) + np.shape(a)[1:], dtype=np.float64) for k, a in inputs.items()}
+    n_chunks = 0
+    for start in range(0, n_sets, chunk_size):
+        stop = min(start + chunk_size, n_sets)
+        m = stop - start
+        batch = {}
+        for k, a in inputs.items():
+            np.copyto(staging[k][:m], a[start:stop], casting="same_kind")
+            batch[k] = staging[k][:m]
+        result = func(**batch, **params)
+        if out is None:
+            out = {k: np.empty((n_sets,) + np.shape(v)[1:], dtype=np.result_type(v, np.float64))
+                   for k, v in result.items()}
+        for k, buf in out.items():
+            buf[start:stop] = result[k]
+        del result, batch
+        n_chunks += 1
+        if on_chunk is not None:
+            on_chunk(start, stop)
+
+    elapsed = time.perf_counter() - start_time
+    _, peak = tracemalloc.get_traced_memory()
+    if started_tracing:
+        tracemalloc.stop()
+    stats = {"n_sets": n_sets, "chunk_size": chunk_size, "n_chunks": n_chunks,
+             "seconds": elapsed, "peak_mb": (peak - baseline) / 1024 / 1024}
+    return out, stats
+
+
+def write_synthetic_newton_rings(path, n_sets, block=200_000, seed=0):
+    """分块生成牛顿环读数 (合成数据.newton_rings) 并写入 float32 的 .npy 文件 (生成过程本身也不占用大量内存)"""
+    rng = np.random.default_rng(seed)
+    data = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(n_sets, 5, 4))
+    for start in range(0, n_sets, block):
+        stop = min(start + block, n_sets)
+        data[start:stop] = 合成数据.newton_rings(stop - start, seed=rng)[0]["groups"]
+    data.flush()
+    del data
+
+
+# --- 示例: 数据组数增加时峰值内存保持不变 ---
+if __name__ == "__main__":
+    memory_budget_mb = 64
+    print(f"--- 分块执行 (内存预算 {memory_budget_mb} MB，读数以 float32 存储在磁盘上) ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_sets in (100_000, 500_000, 2_000_000):
+            path = os.path.join(tmp, f"newton_{n_sets}.npy")
+            write_synthetic_newton_rings(path, n_sets)
+            groups = np.load(path, mmap_mode="r")
+            out = open_outputs(os.path.join(tmp, f"out_{n_sets}"), n_sets, ["R", "u_R"])
+            out, stats = run_chunked(实验公式.newton_ring, {"groups": groups}, memory_budget_mb, out=out)
+            print(f"  {n_sets:>9,} 组: 块大小 {stats['chunk_size']:,}, {stats['n_chunks']} 块, "
+                  f"用时 {stats['seconds']:.2f} s, 峰值内存 {stats['peak_mb']:.1f} MB, "
+                  f"R 平均值 {float(np.mean(out['R'])):.2f} mm")
+            del groups, out
+    print("\n计算完成！")
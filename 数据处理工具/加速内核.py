@@ -0,0 +1,205 @@
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # 未安装 numba 时自动退回纯 NumPy 实现
+    numba = None
+
+# 统计与拟合的核心计算，面向"大量小数组"的批处理:
+# 每组数据只有 5-7 个重复测量或十几个拟合点，逐组调用 np.mean/np.std/np.polyfit 时
+# 时间几乎全花在 Python 和 NumPy 的调用开销上。这里把多组长度不一的数据拼成一个一维数组
+# values 和一个下标数组 offsets (第 i 组为 values[offsets[i]:offsets[i+1]])，一次处理整批。
+#
+# 安装了 numba 时使用 JIT 编译的融合循环 (并行遍历各组)，否则使用 np.add.reduceat 实现。
+# 两种实现结果一致，可分别通过 *_numpy / *_numba 调用做对比。
+
+BACKEND = "numba" if numba is not None else "numpy"
+
+
+# --- 辅助函数 ---
+def pack_ragged(datasets):
+    """
+    把若干组长度不一的数据拼成 (values, offsets)。
+
+    Args:
+        datasets (list): 每个元素是一组测量数据 (list 或 np.ndarray)。
+
+    Returns:
+        tuple: values (float64 一维数组), offsets (int64，长度为组数 + 1)
+    """
+    lengths = np.fromiter((len(d) for d in datasets), dtype=np.int64, count=len(datasets))
+    offsets = np.zeros(len(datasets) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    values = np.concatenate([np.asarray(d, dtype=float) for d in datasets]) if datasets else np.zeros(0)
+    return values, offsets
+
+
+def _segment_sums(values, offsets):
+    """各组的和，空组为0 (np.add.reduceat 对空组会返回下一个元素，需要单独处理)"""
+    counts = np.diff(offsets)
+    if len(values) == 0:
+        return np.zeros(len(counts))
+    sums = np.add.reduceat(values, np.minimum(offsets[:-1], len(values) - 1))
+    return np.where(counts > 0, sums, 0.0)
+
+
+# --- 纯 NumPy 实现 ---
+def type_a_stats_numpy(values, offsets):
+    """
+    各组的平均值、样本标准差和A类不确定度 (与 铝件.py 中 calculate_dimension_stats 的规则相同)。
+
+    Returns:
+        tuple: mean, std_dev, u_A (空组的 mean 为 NaN；单次测量的 std_dev、u_A 为0)
+    """
+    counts = np.diff(offsets)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = _segment_sums(values, offsets) / counts
+        centered = values - np.repeat(mean, counts)
+        ss = _segment_sums(centered * centered, offsets)
+        std_dev = np.where(counts > 1, np.sqrt(ss / (counts - 1)), 0.0)
+        u_A = np.where(counts > 1, std_dev / np.sqrt(counts), 0.0)
+    return mean, std_dev, u_A
+
+
+def linear_fit_numpy(x, y, offsets):
+    """
+    各组的最小二乘直线拟合 y = slope * x + intercept (与 np.polyfit(x, y, 1) 一致)。
+
+    Returns:
+        tuple: slope, intercept, r_squared (点数不足2的组为 NaN)
+    """
+    counts = np.diff(offsets)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_x = _segment_sums(x, offsets) / counts
+        mean_y = _segment_sums(y, offsets) / counts
+        dx = x - np.repeat(mean_x, counts)
+        dy = y - np.repeat(mean_y, counts)
+        s_xx = _segment_sums(dx * dx, offsets)
+        s_xy = _segment_sums(dx * dy, offsets)
+        s_yy = _segment_sums(dy * dy, offsets)
+        slope = np.where(counts > 1, s_xy / s_xx, np.nan)
+        intercept = mean_y - slope * mean_x
+        r_squared = s_xy**2 / (s_xx * s_yy)
+    return slope, intercept, r_squared
+
+
+def welford_update_numpy(count, mean, m2, values, offsets):
+    """
+    用一批新数据更新各组的 Welford 累加器 (count, mean, m2)，原地修改并返回。
+    新数据按组合并 (Chan 的并行合并公式)，适合分块读入的长序列。
+    样本方差 = m2 / (count - 1)。
+    """
+    n_b = np.diff(offsets).astype(float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_b = np.where(n_b > 0, _segment_sums(values, offsets) / n_b, 0.0)
+        centered = values - np.repeat(mean_b, n_b.astype(np.int64))
+        m2_b = _segment_sums(centered * centered, offsets)
+        total = count + n_b
+        delta = mean_b - mean
+        has_data = total > 0
+        mean += np.where(has_data, delta * n_b / np.where(has_data, total, 1.0), 0.0)
+        m2 += m2_b + np.where(has_data, delta**2 * count * n_b / np.where(has_data, total, 1.0), 0.0)
+    count += n_b
+    return count, mean, m2
+
+
+# --- numba 实现 ---
+if numba is not None:
+    @numba.njit(parallel=True, cache=True)
+    def _type_a_stats_kernel(values, offsets, mean, std_dev, u_A):
+        for i in numba.prange(len(offsets) - 1):
+            start, stop = offsets[i], offsets[i + 1]
+            n = stop - start
+            m = 0.0
+            s = 0.0
+            for j in range(start, stop):  # Welford 单遍计算
+                k = j - start + 1
+                delta = values[j] - m
+                m += delta / k
+                s += delta * (values[j] - m)
+            mean[i] = m if n > 0 else np.nan
+            if n > 1:
+                std_dev[i] = np.sqrt(s / (n - 1))
+                u_A[i] = std_dev[i] / np.sqrt(n)
+            else:
+                std_dev[i] = 0.0
+                u_A[i] = 0.0
+
+    @numba.njit(parallel=True, cache=True)
+    def _linear_fit_kernel(x, y, offsets, slope, intercept, r_squared):
+        for i in numba.prange(len(offsets) - 1):
+            start, stop = offsets[i], offsets[i + 1]
+            n = stop - start
+            if n < 2:
+                slope[i] = np.nan
+                intercept[i] = np.nan
+                r_squared[i] = np.nan
+                continue
+            mx = 0.0
+            my = 0.0
+            for j in range(start, stop):
+                mx += x[j]
+                my += y[j]
+            mx /= n
+            my /= n
+            s_xx = 0.0
+            s_xy = 0.0
+            s_yy = 0.0
+            for j in range(start, stop):
+                dx = x[j] - mx
+                dy = y[j] - my
+                s_xx += dx * dx
+                s_xy += dx * dy
+                s_yy += dy * dy
+            slope[i] = s_xy / s_xx
+            intercept[i] = my - slope[i] * mx
+            r_squared[i] = s_xy * s_xy / (s_xx * s_yy)
+
+    @numba.njit(parallel=True, cache=True)
+    def _welford_update_kernel(count, mean, m2, values, offsets):
+        for i in numba.prange(len(offsets) - 1):
+            c = count[i]
+            m = mean[i]
+            s = m2[i]
+            for j in range(offsets[i], offsets[i + 1]):
+                c += 1.0
+                delta = values[j] - m
+                m += delta / c
+                s += delta * (values[j] - m)
+            count[i] = c
+            mean[i] = m
+            m2[i] = s
+
+    def type_a_stats_numba(values, offsets):
+        """type_a_stats_numpy 的 JIT 版本"""
+        values = np.ascontiguousarray(values, dtype=np.float64)
+        offsets = np.ascontiguousarray(offsets, dtype=np.int64)
+        n_sets = len(offsets) - 1
+        mean, std_dev, u_A = np.empty(n_sets), np.empty(n_sets), np.empty(n_sets)
+        _type_a_stats_kernel(values, offsets, mean, std_dev, u_A)
+        return mean, std_dev, u_A
+
+    def linear_fit_numba(x, y, offsets):
+        """linear_fit_numpy 的 JIT 版本"""
+        x = np.ascontiguousarray(x, dtype=np.float64)
+        y = np.ascontiguousarray(y, dtype=np.float64)
+        offsets = np.ascontiguousarray(offsets, dtype=np.int64)
+        n_sets = len(offsets) - 1
+        slope, intercept, r_squared = np.empty(n_sets), np.empty(n_sets), np.empty(n_sets)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            _linear_fit_kernel(x, y, offsets, slope, intercept, r_squared)
+        return slope, intercept, r_squared
+
+    def welford_update_numba(count, mean, m2, values, offsets):
+        """welford_update_numpy 的 JIT 版本 (count、mean、m2 须为 float64 数组)"""
+        _welford_update_kernel(count, mean, m2, np.ascontiguousarray(values, dtype=np.float64),
+                               np.ascontiguousarray(offsets, dtype=np.int64))
+        return count, mean, m2
+
+    type_a_stats = type_a_stats_numba
+    linear_fit = linear_fit_numba
+    welford_update = welford_update_numba
+else:
+    type_a_stats = type_a_stats_numpy
+    linear_fit = linear_fit_numpy
+    welford_update = welford_update_numpy
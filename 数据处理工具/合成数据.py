@@ -0,0 +1,263 @@
+import time
+
+import numpy as np
+
+import 仪器登记
+import 实验公式
+import 水密度
+
+# 已知真值的合成实验数据 (每个实验一个生成函数，整批向量化生成，可用随机种子复现):
+#   先由给定的真值 (R、λ、γ、Is、β ...) 按物理模型算出各读数的理想值，再模拟读数过程:
+#   读数 = 理想值 + 随机误差 (正态分布，标准差 noise) + 仪器误差 (±delta_ins 内均匀分布)，最后按分度值取整。
+#   delta_ins_* 默认为 None: 按理想值所在量程段从 仪器检定.csv 查出 (与 实验公式.py 计算B类不确定度时一致)，
+#   inputs 中也保持 None，由 实验公式.py 按读数查表；给出数值时两边都使用该值。
+# 每个生成函数返回 (inputs, truth):
+#   inputs 的键与 实验公式.py 中对应函数的参数名相同，可以直接 实验公式.newton_ring(**inputs)；
+#   truth 的键与该函数结果中的键相同 (如 R、D、rho、gamma)，每组数据一个真值。
+# 参数 seed 可以是整数，也可以是 np.random.Generator (分块生成时沿用同一个生成器)。
+# 真值参数既可以是常数，也可以是形状 (n_sets,) 的数组 (每组数据不同的真值)。
+
+# --- 常量定义 ---
+SEED = 0
+
+
+# --- 辅助函数 ---
+def _read(rng, true, noise=0.0, delta_ins=0.0, resolution=0.0, instrument=None):
+    """
+    模拟仪器读数: 理想值 + 随机误差 + 仪器误差 (均匀分布)，按分度值取整。
+    delta_ins 为 None 时按 instrument (仪器检定.csv 中的代号) 逐个查出理想值所在量程段的 Δ_ins。
+    """
+    reading = np.array(true, dtype=float)
+    if delta_ins is None:
+        delta_ins = 仪器登记.get_instrument(instrument).limits(reading)
+    if noise:
+        reading += noise * rng.standard_normal(reading.shape)
+    if np.any(delta_ins):
+        reading += rng.uniform(-1.0, 1.0, reading.shape) * delta_ins
+    if resolution:
+        reading = np.round(reading / resolution) * resolution
+    return reading
+
+
+def _per_set(value, n_sets):
+    """常数或形状 (n_sets,) 的真值参数 -> 形状 (n_sets,) 的数组"""
+    return np.broadcast_to(np.asarray(value, dtype=float), (n_sets,))
+
+
+# --- 光的干涉 ---
+def newton_rings(n_sets, R_mm=1065.0, lambda_nm=实验公式.LAMBDA_NM, n_groups=5, m_ring=11, n_ring=1,
+                 contact_offset_mm2=2.7, center_mm=20.8, center_spread_mm=0.03,
+                 noise_mm=0.003, delta_ins_mm=None, resolution_mm=0.001, seed=SEED):
+    """
+    牛顿环读数 (X1, X1', X11, X11')。第 k 个暗环直径 D_k² = 4kRλ + contact_offset_mm2
+    (接触点处的形变或灰尘使各环直径平方多出一个常数，逐差法求 R 时消去)。
+
+    Returns:
+        tuple: inputs {groups (n_sets, n_groups, 4), lambda_nm, delta_ins_mm, m_ring, n_ring}, truth {R}
+    """
+    rng = np.random.default_rng(seed)
+    R = _per_set(R_mm, n_sets)[:, None]
+    lambda_mm = lambda_nm * 1e-6
+    center = center_mm + center_spread_mm * rng.standard_normal((n_sets, n_groups))
+    D_n = np.sqrt(4 * n_ring * R * lambda_mm + contact_offset_mm2)
+    D_m = np.sqrt(4 * m_ring * R * lambda_mm + contact_offset_mm2)
+    ideal = np.stack([center - D_n / 2, center + D_n / 2, center - D_m / 2, center + D_m / 2], axis=-1)
+    groups = _read(rng, ideal, noise_mm, delta_ins_mm, resolution_mm, 实验公式.MICROSCOPE)
+    inputs = {"groups": groups, "lambda_nm": lambda_nm, "delta_ins_mm": delta_ins_mm,
+              "m_ring": m_ring, "n_ring": n_ring}
+    return inputs, {"R": _per_set(R_mm, n_sets)}
+
+
+def wedge(n_sets, D_mm=0.034, L_mm=32.95, lambda_nm=实验公式.LAMBDA_NM, k_fringes=10, n_groups=5,
+          noise_mm=0.01, delta_ins_mm=None, resolution_mm=0.001, seed=SEED):
+    """
+    劈尖干涉读数 (X_initial, X_final, L_initial, L_final)。k 条暗纹的宽度 x = kλL / (2D)。
+
+    Returns:
+        tuple: inputs {groups (n_sets, n_groups, 4), lambda_nm, k_fringes, delta_ins_mm}, truth {D, theta}
+    """
+    rng = np.random.default_rng(seed)
+    D = _per_set(D_mm, n_sets)
+    L = _per_set(L_mm, n_sets)
+    x = k_fringes * lambda_nm * 1e-6 * L / (2 * D)
+    x_start = rng.uniform(8.0, 25.0, (n_sets, n_groups))      # 每组从不同位置开始数暗纹
+    L_start = rng.uniform(2.4, 2.5, (n_sets, n_groups))
+    ideal = np.stack([x_start, x_start + x[:, None], L_start, L_start + L[:, None]], axis=-1)
+    groups = _read(rng, ideal, noise_mm, delta_ins_mm, resolution_mm, 实验公式.MICROSCOPE)
+    inputs = {"groups": groups, "lambda_nm": lambda_nm, "k_fringes": k_fringes, "delta_ins_mm": delta_ins_mm}
+    return inputs, {"D": D, "theta": D / L}
+
+
+# --- 力学基本量 ---
+def aluminium_part(n_sets, outer_diameter_mm=25.31, inner_diameter_mm=14.71, depth_mm=22.08,
+                   height_mm=33.17, rho_g_cm3=2.70, n_repeats=7, noise_mm=0.03,
+                   delta_ins_length=None, resolution_mm=0.02,
+                   noise_mass_g=0.02, delta_ins_mass=None, resolution_mass_g=0.01, seed=SEED):
+    """
+    铝件各尺寸的重复测量和质量。noise_mm 包括工件本身不规则 (不同位置测得的尺寸不同) 和读数的随机误差。
+
+    Returns:
+        tuple: inputs {outer_diameter, inner_diameter, depth, height (n_sets, n_repeats), mass (n_sets,),
+                       delta_ins_length, delta_ins_mass}, truth {V, rho}
+    """
+    rng = np.random.default_rng(seed)
+    dims = [_per_set(v, n_sets) for v in (outer_diameter_mm, inner_diameter_mm, depth_mm, height_mm)]
+    D, d, h, H = dims
+    V = (np.pi / 4) * (D**2 * H - d**2 * h)
+    rho = _per_set(rho_g_cm3, n_sets)
+    readings = [_read(rng, np.repeat(v[:, None], n_repeats, axis=1), noise_mm, delta_ins_length, resolution_mm,
+                      实验公式.CALIPER)
+                for v in dims]
+    mass = _read(rng, rho * V / 1000, noise_mass_g, delta_ins_mass, resolution_mass_g, 实验公式.BALANCE)
+    inputs = {"outer_diameter": readings[0], "inner_diameter": readings[1], "depth": readings[2],
+              "height": readings[3], "mass": mass,
+              "delta_ins_length": delta_ins_length, "delta_ins_mass": delta_ins_mass}
+    return inputs, {"V": V, "rho": rho}
+
+
+def buoyancy(n_sets, rho_obj_g_cm3=0.898, m_a_g=10.3, sinker_in_water_g=10.3, water_temperature_C=22.0,
+             noise_mass_g=0.01, delta_ins_mass=None, resolution_mass_g=0.01,
+             noise_temperature_C=0.1, delta_ins_temperature_C=0.5, resolution_temperature_C=0.1, seed=SEED):
+    """
+    流体静力称衡法的三次称量 (物体比水轻，用坠子使其浸没):
+        m_a   = 物体在空气中的质量
+        m_asw = m_a + 坠子在水中的视质量 (物体在空气中)
+        m_osw = m_asw - ρ_water V_obj (物体也浸入水中)
+    水温读数用于查水的密度 (真实水密度按真实水温计算)。
+
+    Returns:
+        tuple: inputs {m_a, m_asw, m_osw, water_temperature_C, u_water_temperature_C, delta_ins_mass},
+               truth {rho_obj, V_obj}
+    """
+    rng = np.random.default_rng(seed)
+    rho_obj = _per_set(rho_obj_g_cm3, n_sets)
+    m_a = _per_set(m_a_g, n_sets)
+    t_water = _per_set(water_temperature_C, n_sets)
+    V_obj = m_a / rho_obj
+    m_asw = m_a + sinker_in_water_g
+    m_osw = m_asw - 水密度.water_density(t_water) * V_obj
+    inputs = {"m_a": _read(rng, m_a, noise_mass_g, delta_ins_mass, resolution_mass_g, 实验公式.BALANCE),
+              "m_asw": _read(rng, m_asw, noise_mass_g, delta_ins_mass, resolution_mass_g, 实验公式.BALANCE),
+              "m_osw": _read(rng, m_osw, noise_mass_g, delta_ins_mass, resolution_mass_g, 实验公式.BALANCE),
+              "water_temperature_C": _read(rng, t_water, noise_temperature_C, delta_ins_temperature_C,
+                                           resolution_temperature_C),
+              "u_water_temperature_C": delta_ins_temperature_C / np.sqrt(3),
+              "delta_ins_mass": delta_ins_mass}
+    return inputs, {"rho_obj": rho_obj, "V_obj": V_obj}
+
+
+# --- 太阳能电池 ---
+def solar_cell_iv(n_sets, Is_mA=0.46, beta=0.20, voltage_V=np.linspace(0, 5, 11), shockley=False,
+                  relative_noise=0.005, delta_ins_current_mA=None,
+                  resolution_mA=0.001, seed=SEED):
+    """
+    I-U 曲线。默认 I = Is exp(βU)，即 伏安特性制图.py 拟合的模型；
+    shockley=True 时用二极管方程 I = Is (exp(βU) - 1)，低电压段偏离直线 (用于检验拟合区间的自动选取)。
+
+    Returns:
+        tuple: inputs {voltage (n_points,), current_mA (n_sets, n_points)}, truth {beta, Is}
+    """
+    rng = np.random.default_rng(seed)
+    Is = _per_set(Is_mA, n_sets)[:, None]
+    b = _per_set(beta, n_sets)[:, None]
+    voltage = np.asarray(voltage_V, dtype=float)
+    ideal = Is * (np.exp(b * voltage) - (1.0 if shockley else 0.0))
+    current = ideal * (1 + relative_noise * rng.standard_normal(ideal.shape))
+    current = _read(rng, current, 0.0, delta_ins_current_mA, resolution_mA, 实验公式.MILLIAMMETER)
+    return {"voltage": voltage, "current_mA": current}, {"beta": b[:, 0], "Is": Is[:, 0]}
+
+
+# --- 热机 ---
+def heat_engine(n_sets, gamma=1.40, m=0.0485, A=0.00082958, P=实验公式.P_ATM, b_mm=-4.8,
+                h_mm=(10, 20, 30, 40, 50, 60), noise_T_ms=0.5, resolution_T_ms=0.01, seed=SEED):
+    """
+    h-T² 数据: 斜率 K = γAP / (4π²m)，h = K T² + b。各高度 h 为刻度值 (无误差)，
+    周期 T 由光电门计时 (随机误差 noise_T_ms，按计时器分度值取整)，再平方得到 T²。
+
+    Returns:
+        tuple: inputs {h_mm (n_sets, n_points), T2_ms2 (n_sets, n_points), m, A, P}, truth {gamma, K_m_s2}
+    """
+    rng = np.random.default_rng(seed)
+    gamma = _per_set(gamma, n_sets)
+    K_m_s2 = gamma * A * P / (4 * np.pi**2 * m)
+    h = np.broadcast_to(np.asarray(h_mm, dtype=float), (n_sets, len(h_mm)))
+    T_ms = np.sqrt((h - b_mm) / (K_m_s2[:, None] / 1000.0))
+    T_ms = _read(rng, T_ms, noise_T_ms, 0.0, resolution_T_ms)
+    inputs = {"h_mm": h, "T2_ms2": T_ms**2, "m": m, "A": A, "P": P}
+    return inputs, {"gamma": gamma, "K_m_s2": K_m_s2}
+
+
+# --- 转动惯量 ---
+def photogate_alphas(n_sets, alpha, n_repeats=6, k_pair=(2, 8), omega0_range=(0.5, 1.5),
+                     jitter_ms=0.02, resolution_ms=0.01, seed=SEED):
+    """
+    光电门测角加速度: 转盘每转过 π 计时一次，θ = ω0 t + αt²/2。
+    取第 k_m、k_n 次计时 (θ = k_m π、k_n π)，α = 2π (k_n t_m - k_m t_n) / (t_n² t_m - t_m² t_n)。
+    每次释放的初角速度 ω0 (rad/s) 在 omega0_range 内随机，计时有抖动 jitter_ms 并按 resolution_ms 取整。
+
+    Returns:
+        np.ndarray: 形状 (n_sets, n_repeats) 的角加速度 (rad/s²)
+    """
+    rng = np.random.default_rng(seed)
+    alpha = _per_set(alpha, n_sets)[:, None, None]
+    omega0 = rng.uniform(*omega0_range, (n_sets, n_repeats, 1))
+    k = np.asarray(k_pair, dtype=float)
+    t = (np.sqrt(omega0**2 + 2 * alpha * k * np.pi) - omega0) / alpha
+    t = _read(rng, t * 1000.0, jitter_ms, 0.0, resolution_ms) / 1000.0
+    t_m, t_n = t[..., 0], t[..., 1]
+    k_m, k_n = k_pair
+    return 2 * np.pi * (k_n * t_m - k_m * t_n) / (t_n**2 * t_m - t_m**2 * t_n)
+
+
+def rotational_inertia(n_sets, inertia_kg_m2=2.25e-3, mass_g=25.0, radius_mm=25.0, friction_torque=0.0,
+                       g=实验公式.G, n_repeats=6, seed=SEED, **photogate_options):
+    """
+    转动惯量实验: 由 I、砝码质量和塔轮半径得到角加速度 α = (mgr - τ_f) / (I + mr²)，
+    再由 photogate_alphas 模拟各次光电门测量，输入为各次 α 的平均值。
+
+    Returns:
+        tuple: inputs {mass_g, radius_mm, avg_angular_accel, g}, truth {moment_of_inertia, alpha}
+    """
+    inertia = _per_set(inertia_kg_m2, n_sets)
+    m_kg, r_m = mass_g / 1000.0, radius_mm / 1000.0
+    alpha = (m_kg * g * r_m - friction_torque) / (inertia + m_kg * r_m**2)
+    alphas = photogate_alphas(n_sets, alpha, n_repeats, seed=seed, **photogate_options)
+    inputs = {"mass_g": mass_g, "radius_mm": radius_mm, "avg_angular_accel": alphas.mean(axis=-1), "g": g}
+    return inputs, {"moment_of_inertia": inertia, "alpha": alpha}
+
+
+# 实验名 -> (生成函数, 实验公式.py 中的计算函数, 结果键, 不确定度键 (没有时为 None))
+GENERATORS = {
+    "newton_ring": (newton_rings, 实验公式.newton_ring, "R", "u_R"),
+    "wedge": (wedge, 实验公式.wedge, "D", "u_D"),
+    "aluminium_density": (aluminium_part, 实验公式.aluminium_density, "rho", "u_rho"),
+    "irregular_density": (buoyancy, 实验公式.irregular_density, "rho_obj", "uc_rho_obj"),
+    "solar_cell_fit": (solar_cell_iv, 实验公式.solar_cell_fit, "beta", "u_beta"),
+    "gamma": (heat_engine, 实验公式.gamma_ratio, "gamma", "u_gamma"),
+    "moment_of_inertia": (rotational_inertia, 实验公式.moment_of_inertia, "moment_of_inertia", None),
+}
+
+
+# --- 示例: 各实验生成数据、用 实验公式.py 计算，与真值比较 ---
+if __name__ == "__main__":
+    n_check = 200_000
+    n_speed = 1_000_000
+    print(f"{'实验':<20} {'生成速度 (组/s)':>16} {'真值':>12} {'计算结果平均':>14} {'相对偏差':>10} {'|误差|<2u 的比例':>16}")
+    for name, (generator, formula, key, u_key) in GENERATORS.items():
+        start = time.perf_counter()
+        generator(n_speed, seed=1)
+        rate = n_speed / (time.perf_counter() - start)
+
+        inputs, truth = generator(n_check, seed=2)
+        result = formula(**inputs)
+        estimate, true = result[key], truth[key]
+        bias = np.mean(estimate) / np.mean(true) - 1
+        coverage = f"{np.mean(np.abs(estimate - true) < 2 * result[u_key]):.1%}" if u_key else "-"
+        print(f"{name:<20} {rate:>16,.0f} {np.mean(true):>12.5g} {np.mean(estimate):>14.5g} "
+              f"{bias:>+10.2e} {coverage:>16}")
+
+    print("注: γ 略偏小是因为误差在 T² (自变量) 上，最小二乘斜率系统偏小；只有5-11个点时 t 分布使 2u 区间的覆盖率低于95%。")
+
+    # 同一种子生成的数据完全相同
+    same = np.array_equal(newton_rings(1000, seed=7)[0]["groups"], newton_rings(1000, seed=7)[0]["groups"])
+    print(f"\n相同种子两次生成的数据{'相同' if same else '不同'}")
@@ -0,0 +1,86 @@
+import time
+
+import numpy as np
+
+import 加速内核
+
+# --- 用户输入区 ---
+n_stat_sets = 200_000   # A类不确定度: 数据组数 (每组 5-7 个重复测量，与牛顿环、铝件等实验相同)
+n_fit_sets = 50_000     # 直线拟合: 数据组数 (每组 6-11 个点，与 计算斜率.py、伏安特性制图.py 相同)
+n_loop_sets = 5_000     # 逐组 Python 循环只测这么多组，再按比例换算 (否则太慢)
+repeats = 3             # 每种方法重复次数，取最短时间
+# --- END 用户输入区 ---
+
+
+def best_time(func, *args):
+    """重复运行取最短时间 (s)"""
+    best = float("inf")
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def loop_type_a_stats(datasets):
+    """逐组计算 (与 铝件.py 的 calculate_dimension_stats 写法相同)"""
+    out = []
+    for d in datasets:
+        mean_val = np.mean(d)
+        std_dev = np.std(d, ddof=1)
+        out.append((mean_val, std_dev, std_dev / np.sqrt(len(d))))
+    return out
+
+
+def loop_linear_fit(x_sets, y_sets):
+    """逐组 np.polyfit (与 计算斜率.py 写法相同)"""
+    return [np.polyfit(x, y, 1) for x, y in zip(x_sets, y_sets)]
+
+
+def report(name, n_sets, seconds, baseline):
+    print(f"  {name:<22} {seconds * 1000:9.1f} ms   {seconds / n_sets * 1e9:8.0f} ns/组   {baseline / seconds:7.1f}x")
+
+
+rng = np.random.default_rng(0)
+print(f"加速后端: {加速内核.BACKEND}")
+
+# --- 1. A类不确定度 ---
+lengths = rng.integers(5, 8, n_stat_sets)
+datasets = [25.3 + 0.03 * rng.standard_normal(n) for n in lengths]
+values, offsets = 加速内核.pack_ragged(datasets)
+
+t_loop, _ = best_time(loop_type_a_stats, datasets[:n_loop_sets])
+t_loop *= n_stat_sets / n_loop_sets
+t_numpy, res_numpy = best_time(加速内核.type_a_stats_numpy, values, offsets)
+print(f"\n1. A类不确定度: {n_stat_sets:,} 组，每组 5-7 个数据")
+report("逐组 np.mean/np.std", n_stat_sets, t_loop, t_loop)
+report("NumPy reduceat", n_stat_sets, t_numpy, t_loop)
+if 加速内核.numba is not None:
+    加速内核.type_a_stats_numba(values[:100], offsets[:10])  # 预先编译，不计入时间
+    t_numba, res_numba = best_time(加速内核.type_a_stats_numba, values, offsets)
+    report("numba JIT", n_stat_sets, t_numba, t_loop)
+    print(f"  两种实现 u_A 的最大差异: {np.max(np.abs(res_numba[2] - res_numpy[2])):.2e}")
+
+# --- 2. 直线拟合 ---
+fit_lengths = rng.integers(6, 12, n_fit_sets)
+x_sets = [np.sort(rng.uniform(300, 1300, n)) for n in fit_lengths]
+y_sets = [0.053 * x - 4.8 + rng.standard_normal(len(x)) for x in x_sets]
+x_flat, fit_offsets = 加速内核.pack_ragged(x_sets)
+y_flat, _ = 加速内核.pack_ragged(y_sets)
+
+t_loop, res_loop = best_time(loop_linear_fit, x_sets[:n_loop_sets], y_sets[:n_loop_sets])
+t_loop *= n_fit_sets / n_loop_sets
+t_numpy, res_numpy = best_time(加速内核.linear_fit_numpy, x_flat, y_flat, fit_offsets)
+print(f"\n2. 直线拟合: {n_fit_sets:,} 组，每组 6-11 个点")
+report("逐组 np.polyfit", n_fit_sets, t_loop, t_loop)
+report("NumPy reduceat", n_fit_sets, t_numpy, t_loop)
+slope_loop = np.array([c[0] for c in res_loop])
+print(f"  与 np.polyfit 斜率的最大差异: {np.max(np.abs(res_numpy[0][:n_loop_sets] - slope_loop)):.2e}")
+if 加速内核.numba is not None:
+    加速内核.linear_fit_numba(x_flat[:100], y_flat[:100], fit_offsets[:10])
+    t_numba, res_numba = best_time(加速内核.linear_fit_numba, x_flat, y_flat, fit_offsets)
+    report("numba JIT", n_fit_sets, t_numba, t_loop)
+    print(f"  两种实现斜率的最大差异: {np.max(np.abs(res_numba[0] - res_numpy[0])):.2e}")
+
+print("\n基准测试完成！")
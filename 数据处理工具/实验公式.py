@@ -0,0 +1,411 @@
+import numpy as np
+
+import 仪器登记
+import 水密度
+
+# 各实验的计算公式 (与各实验文件夹下脚本中的公式一致)，全部按 NumPy 数组向量化:
+# 输入的最后一维 (或最后两维) 是一组实验数据，前面的维度是任意多组数据，一次调用即可处理整批。
+# 结果以 dict 返回，键名与原脚本中的变量名对应。
+# B类不确定度默认按每个读数从 仪器登记.py 的检定表查出 (所在量程段的 Δ_ins 和误差分布)，超出检定量程的读数使结果为 NaN；
+# 仍可传入 delta_ins_* (常数或按数据组给出的数组) 覆盖查表，此时按均匀分布 u_B = Δ/√3。
+# 同一台仪器的误差在一组重复读数之间是同一来源 (完全相关)，平均值的 u_B 取各读数 u_B 的平均，不随次数减小；
+# 各读数在同一量程段时就是该段的 u_B，与原脚本相同。
+
+# --- 常量定义 (与原脚本默认值相同) ---
+LAMBDA_NM = 589.3         # 钠黄光平均波长 (nm)
+RHO_WATER = 0.997795      # 水在22°C的密度 (g/cm³)
+G = 9.8                   # 重力加速度 (m/s²)
+P_ATM = 101300            # 大气压强 (Pa)
+
+# 各实验读数所用的仪器 (仪器检定.csv 中的代号)
+MICROSCOPE = "reading_microscope"
+CALIPER = "vernier_caliper"
+BALANCE = "physical_balance"
+MILLIAMMETER = "milliammeter"
+
+# 各实验的仪器误差限参数对应哪台仪器的哪些读数 (批量评分按此检查读数是否超出检定量程)
+INSTRUMENT_READINGS = {
+    "newton_ring": {"delta_ins_mm": (MICROSCOPE, ("groups",))},
+    "wedge": {"delta_ins_mm": (MICROSCOPE, ("groups",))},
+    "aluminium_density": {"delta_ins_length": (CALIPER, ("outer_diameter", "inner_diameter", "depth", "height")),
+                          "delta_ins_mass": (BALANCE, ("mass",))},
+    "irregular_density": {"delta_ins_mass": (BALANCE, ("m_a", "m_asw", "m_osw"))},
+}
+
+
+# --- 辅助计算函数 ---
+def out_of_range(function_name, params, batch_shape=()):
+    """
+    找出有读数超出仪器检定量程的数据组 (这些数据组的查表结果为 NaN)。
+
+    params 中已经给出 delta_ins_* 的读数不查表，也就不检查；没有登记仪器的实验全部为 False。
+
+    Args:
+        function_name (str): 本文件中的函数名，如 "newton_ring"。
+        params (dict): 该函数的参数 (读数数组的前几维为数据组)。
+        batch_shape (tuple): 数据组的形状，如一批提交时为 (提交数,)。
+
+    Returns:
+        np.ndarray: 形状为 batch_shape 的布尔数组
+    """
+    bad = np.zeros(batch_shape, dtype=bool)
+    for param, (instrument, reading_keys) in INSTRUMENT_READINGS.get(function_name, {}).items():
+        if param in params:
+            continue
+        inst = 仪器登记.get_instrument(instrument)
+        for key in reading_keys:
+            limits = inst.limits(params[key]).reshape(tuple(batch_shape) + (-1,))
+            bad |= np.isnan(limits).any(axis=-1)
+    return bad
+
+
+def reading_type_b(instrument, readings, delta_ins=None):
+    """
+    每个读数的B类标准不确定度。
+
+    Args:
+        instrument (str): 仪器代号，按 仪器登记.get_instrument 查出读数所在量程段的 Δ_ins 和误差分布。
+        readings (array_like): 任意形状的读数。
+        delta_ins (float or array_like): 可选，给出时不查表，u_B = Δ/√3 (可与 readings 的前几维广播)。
+
+    Returns:
+        np.ndarray: 与 readings 同形状的 u_B，超出检定量程的读数为 NaN
+    """
+    readings = np.asarray(readings, dtype=float)
+    if delta_ins is None:
+        return 仪器登记.get_instrument(instrument).type_b(readings)
+    u_b = np.asarray(delta_ins, dtype=float) / np.sqrt(3)
+    u_b = u_b.reshape(u_b.shape + (1,) * (readings.ndim - u_b.ndim)) if u_b.ndim else u_b
+    return np.broadcast_to(u_b, readings.shape)
+
+
+def type_a_stats(values, axis=-1):
+    """
+    沿 axis 计算平均值、样本标准差和A类不确定度 (平均值的标准误差)。
+
+    Args:
+        values (array_like): 测量数据，axis 所在维为重复测量。
+        axis (int): 重复测量所在的维度。
+
+    Returns:
+        tuple: mean, std_dev, u_A (单次测量时 std_dev 和 u_A 为0)
+    """
+    values = np.asarray(values, dtype=float)
+    n = values.shape[axis]
+    mean = values.mean(axis=axis)
+    if n < 2:
+        zeros = np.zeros_like(mean)
+        return mean, zeros, zeros
+    std_dev = values.std(axis=axis, ddof=1)
+    return mean, std_dev, std_dev / np.sqrt(n)
+
+
+def linear_fit(x, y, mask=None):
+    """
+    沿最后一维做最小二乘直线拟合 y = slope * x + intercept (与 np.polyfit(x, y, 1) 一致)。
+
+    Args:
+        x, y (array_like): 形状可广播的数据，最后一维是一条曲线上的点。
+        mask (array_like): 可选，False 的点不参与拟合 (如电流非正的点)。
+
+    Returns:
+        tuple: slope, intercept, r_squared, n (参与拟合的点数)
+    """
+    x, y = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+    w = np.ones_like(x) if mask is None else np.broadcast_to(mask, x.shape).astype(float)
+    x = np.where(w > 0, x, 0.0)
+    y = np.where(w > 0, y, 0.0)
+    n = w.sum(axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_x = (w * x).sum(axis=-1) / n
+        mean_y = (w * y).sum(axis=-1) / n
+        dx = (x - mean_x[..., None]) * w
+        dy = (y - mean_y[..., None]) * w
+        s_xx = (dx * dx).sum(axis=-1)
+        s_xy = (dx * dy).sum(axis=-1)
+        s_yy = (dy * dy).sum(axis=-1)
+        slope = s_xy / s_xx
+        intercept = mean_y - slope * mean_x
+        r_squared = s_xy**2 / (s_xx * s_yy)
+    return slope, intercept, r_squared, n
+
+
+def combined_uncertainty(u_a, u_b):
+    """合成标准不确定度 u = sqrt(u_A^2 + u_B^2)"""
+    return np.sqrt(np.square(u_a) + np.square(u_b))
+
+
+# --- 光的干涉 ---
+def newton_ring(groups, lambda_nm=LAMBDA_NM, delta_ins_mm=None, m_ring=11, n_ring=1):
+    """
+    牛顿环曲率半径 R = (D_m^2 - D_n^2) / (4 (m-n) λ)，对应 光的干涉/牛顿环.py。
+
+    Args:
+        groups (array_like): 形状 (..., N, 4)，每组为 (X1, X1', X11, X11') 单位 mm。
+        lambda_nm (float): 波长 (nm)。
+        delta_ins_mm (float or array_like): 可选，仪器允许误差极限 (mm)，默认按读数从检定表查出。
+        m_ring, n_ring (int): 远环和近环序号。
+
+    Returns:
+        dict: mean_D1, mean_D11, u_total_mean_D1, u_total_mean_D11, R, u_R (单位 mm)
+    """
+    groups = np.asarray(groups, dtype=float)
+    lambda_mm = lambda_nm * 1e-6
+    D1 = np.abs(groups[..., 1] - groups[..., 0])
+    D11 = np.abs(groups[..., 3] - groups[..., 2])
+    mean_D1, _, uA_D1 = type_a_stats(D1)
+    mean_D11, _, uA_D11 = type_a_stats(D11)
+    # Dk = |X' - X| 由两次读数相减: u_B(Dk) = sqrt(u_B(X)^2 + u_B(X')^2)
+    u_X = reading_type_b(MICROSCOPE, groups, delta_ins_mm)
+    uB_D1 = np.hypot(u_X[..., 0], u_X[..., 1]).mean(axis=-1)
+    uB_D11 = np.hypot(u_X[..., 2], u_X[..., 3]).mean(axis=-1)
+    u_D1 = combined_uncertainty(uA_D1, uB_D1)
+    u_D11 = combined_uncertainty(uA_D11, uB_D11)
+    R = (mean_D11**2 - mean_D1**2) / (4 * (m_ring - n_ring) * lambda_mm)
+    u_R = np.sqrt((mean_D11 * u_D11)**2 + (mean_D1 * u_D1)**2) / (2 * (m_ring - n_ring) * lambda_mm)
+    return {"mean_D1": mean_D1, "mean_D11": mean_D11,
+            "u_total_mean_D1": u_D1, "u_total_mean_D11": u_D11, "R": R, "u_R": u_R}
+
+
+def wedge(groups, lambda_nm=LAMBDA_NM, k_fringes=10, delta_ins_mm=None):
+    """
+    劈尖干涉: 玻璃丝直径 D = L λ k / (2x) 及劈尖夹角 θ = D / L (rad)，对应 光的干涉/劈尖干涉.py。
+
+    Args:
+        groups (array_like): 形状 (..., N, 4)，每组为 (X_initial, X_final, L_initial, L_final) 单位 mm。
+        delta_ins_mm (float or array_like): 可选，仪器允许误差极限 (mm)，默认按读数从检定表查出。
+
+    Returns:
+        dict: mean_x, mean_L, u_total_mean_x, u_total_mean_L, D, u_D (mm), theta, u_theta (rad)
+    """
+    groups = np.asarray(groups, dtype=float)
+    lambda_mm = lambda_nm * 1e-6
+    x = np.abs(groups[..., 1] - groups[..., 0])
+    L = np.abs(groups[..., 3] - groups[..., 2])
+    mean_x, _, uA_x = type_a_stats(x)
+    mean_L, _, uA_L = type_a_stats(L)
+    u_X = reading_type_b(MICROSCOPE, groups, delta_ins_mm)
+    uB_x = np.hypot(u_X[..., 0], u_X[..., 1]).mean(axis=-1)
+    uB_L = np.hypot(u_X[..., 2], u_X[..., 3]).mean(axis=-1)
+    u_x = combined_uncertainty(uA_x, uB_x)
+    u_L = combined_uncertainty(uA_L, uB_L)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        D = mean_L * lambda_mm * k_fringes / (2 * mean_x)
+        u_D = np.abs(D) * np.sqrt((u_L / mean_L)**2 + (u_x / mean_x)**2)
+        theta = lambda_mm * k_fringes / (2 * mean_x)
+        u_theta = theta * u_x / mean_x
+    return {"mean_x": mean_x, "mean_L": mean_L, "u_total_mean_x": u_x, "u_total_mean_L": u_L,
+            "D": D, "u_D": u_D, "theta": theta, "u_theta": u_theta}
+
+
+# --- 力学基本量 ---
+def aluminium_density(outer_diameter, inner_diameter, depth, height, mass,
+                      delta_ins_length=None, delta_ins_mass=None):
+    """
+    铝件体积 V = π/4 (D^2 H - d^2 h) 与密度 ρ = m / V，对应 力学基本量/铝件.py。
+
+    Args:
+        outer_diameter, inner_diameter, depth, height (array_like): 形状 (..., n) 的重复测量 (mm)。
+        mass (array_like): 形状 (...) 的质量 (g)。
+        delta_ins_length, delta_ins_mass (float or array_like): 可选，游标卡尺和天平的仪器误差限，默认按读数查表。
+
+    Returns:
+        dict: V, u_V (mm³), rho, u_rho (g/cm³)
+    """
+    def stats_with_type_b(readings):
+        mean, _, u_A = type_a_stats(readings)
+        u_B = reading_type_b(CALIPER, readings, delta_ins_length).mean(axis=-1)
+        return mean, combined_uncertainty(u_A, u_B)
+
+    D, uc_D = stats_with_type_b(outer_diameter)
+    d, uc_d = stats_with_type_b(inner_diameter)
+    h, uc_h = stats_with_type_b(depth)
+    H, uc_H = stats_with_type_b(height)
+    V = (np.pi / 4) * (D**2 * H - d**2 * h)
+    u_V = np.sqrt(((np.pi / 2) * D * H * uc_D)**2 + ((np.pi / 4) * D**2 * uc_H)**2
+                  + ((np.pi / 2) * d * h * uc_d)**2 + ((np.pi / 4) * d**2 * uc_h)**2)
+    mass = np.asarray(mass, dtype=float)
+    uc_m = reading_type_b(BALANCE, mass, delta_ins_mass)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rho = mass / V * 1000
+        u_rho = rho * np.sqrt((uc_m / mass)**2 + (u_V / V)**2)
+    return {"V": V, "u_V": u_V, "rho": rho, "u_rho": u_rho}
+
+
+def irregular_density(m_a, m_asw, m_osw, rho_water=RHO_WATER, delta_ins_mass=None,
+                      water_temperature_C=None, u_water_temperature_C=0.0):
+    """
+    流体静力称衡法: ρ = m_a ρ_water / (m_asw - m_osw)，对应 力学基本量/不规则物理.py。
+
+    Args:
+        m_a, m_asw, m_osw (array_like): 各数据组的三次称量 (g)。
+        rho_water (float or array_like): 水的密度 (g/cm³)，给出 water_temperature_C 时不使用。
+        delta_ins_mass (float or array_like): 可选，天平的仪器误差限 (g)，默认按三次称量各自查表。
+        water_temperature_C (array_like): 可选，各数据组的水温 (°C)，整批由 水密度.py 的表一次查出。
+        u_water_temperature_C (float or array_like): 水温的标准不确定度 (°C)，计入 u(ρ_water)。
+
+    Returns:
+        dict: rho_water, u_rho_water, m_dw (g), V_obj (cm³), rho_obj, uc_rho_obj (g/cm³)
+    """
+    if water_temperature_C is not None:
+        rho_water = 水密度.water_density(water_temperature_C)
+        u_rho_water = 水密度.water_density_uncertainty(water_temperature_C, u_water_temperature_C)
+    else:
+        rho_water = np.asarray(rho_water, dtype=float)
+        u_rho_water = np.zeros_like(rho_water)
+    m_a = np.asarray(m_a, dtype=float)
+    m_dw = np.asarray(m_asw, dtype=float) - np.asarray(m_osw, dtype=float)
+    uc_m_a = reading_type_b(BALANCE, m_a, delta_ins_mass)
+    uc_m_dw = np.hypot(reading_type_b(BALANCE, m_asw, delta_ins_mass), reading_type_b(BALANCE, m_osw, delta_ins_mass))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        V_obj = m_dw / rho_water
+        rho_obj = m_a / V_obj
+        uc_rho_obj = rho_obj * np.sqrt((uc_m_a / m_a)**2 + (uc_m_dw / m_dw)**2 + (u_rho_water / rho_water)**2)
+    return {"rho_water": rho_water, "u_rho_water": u_rho_water, "m_dw": m_dw, "V_obj": V_obj,
+            "rho_obj": rho_obj, "uc_rho_obj": uc_rho_obj}
+
+
+# --- 太阳能电池 ---
+def _log_fit_terms(voltage, current_mA, u_current_mA):
+    """
+    ln(I)-U 加权拟合的6个充分统计量 (S, Sx, Sy, Sxx, Sxy, Syy) 在最后一维上的和，以及有效点数。
+    权重 w = (I / u(I))^2 = 1 / u(lnI)^2；没有给出 u(I) 时各点等权 (w = 1)。电流非正的点权重为0。
+    """
+    current_mA = np.asarray(current_mA, dtype=float)
+    voltage, current_mA = np.broadcast_arrays(np.asarray(voltage, dtype=float), current_mA)
+    valid = current_mA > 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ln_current = np.where(valid, np.log(np.where(valid, current_mA, 1.0)), 0.0)
+        if u_current_mA is None:
+            w = valid.astype(float)
+        else:
+            w = np.where(valid, (current_mA / np.asarray(u_current_mA, dtype=float))**2, 0.0)
+    x = np.where(valid, voltage, 0.0)
+    wx, wy = w * x, w * ln_current
+    sums = np.stack([w.sum(axis=-1), wx.sum(axis=-1), wy.sum(axis=-1),
+                     (wx * x).sum(axis=-1), (wx * ln_current).sum(axis=-1), (wy * ln_current).sum(axis=-1)])
+    return sums, valid.sum(axis=-1)
+
+
+def _log_fit_result(sums, n_valid, scatter_based=False):
+    """
+    由充分统计量得到 β、Is 及其不确定度 (与 伏安特性制图.py 相同):
+    给出 u(I) 时约化 χ² 大于1按 √χ²_red 放大；scatter_based 为 True (等权拟合，没有给出 u(I)) 时
+    u(lnI) 由残差的离散 s = √(χ²/(n-2)) 估计，参数不确定度按 s 计算，χ²_red 相应为1。
+    """
+    S, Sx, Sy, Sxx, Sxy, Syy = sums
+    with np.errstate(invalid="ignore", divide="ignore"):
+        delta = S * Sxx - Sx**2
+        slope = (S * Sxy - Sx * Sy) / delta
+        intercept = (Sxx * Sy - Sx * Sxy) / delta
+        chi2 = np.maximum(Syy - 2 * slope * Sxy - 2 * intercept * Sy + slope**2 * Sxx
+                          + 2 * slope * intercept * Sx + intercept**2 * S, 0.0)
+        chi2_red = chi2 / (n_valid - 2)
+        r_squared = 1 - chi2 / (Syy - Sy**2 / S)
+        if scatter_based:
+            scale = np.where(n_valid > 2, np.sqrt(chi2_red), np.nan)
+            chi2_red = chi2_red / scale**2
+        else:
+            scale = np.where((n_valid > 2) & (chi2_red > 1), np.sqrt(chi2_red), 1.0)
+        u_beta = np.sqrt(S / delta) * scale
+        u_ln_Is = np.sqrt(Sxx / delta) * scale
+    Is = np.exp(intercept)
+    return {"beta": slope, "u_beta": u_beta, "Is": Is, "u_Is": Is * u_ln_Is,
+            "r_squared": r_squared, "chi2_red": chi2_red, "n_valid": n_valid}
+
+
+def solar_cell_fit(voltage, current_mA, u_current_mA=None):
+    """
+    ln(I) = βU + ln(Is) 的加权直线拟合，对应 太阳能电池/伏安特性制图.py (电流非正的点不参与拟合)。
+    电压点数和间隔任意。
+
+    Args:
+        voltage (array_like): 形状 (..., n) 的电压 (V)。
+        current_mA (array_like): 形状 (..., n) 的电流 (mA)。
+        u_current_mA (array_like): 可选，可广播到 (..., n) 的电流标准不确定度 (mA)。
+                                   不给出时各点等权拟合 (相当于 u(I)/I 各点相同)，
+                                   u(lnI) 由拟合残差估计，此时 chi2_red 为1。
+
+    Returns:
+        dict: beta (V^-1), u_beta, Is (mA), u_Is, r_squared, chi2_red, n_valid
+    """
+    return _log_fit_result(*_log_fit_terms(voltage, current_mA, u_current_mA), u_current_mA is None)
+
+
+class SolarCellFitAccumulator:
+    """
+    分段读入的长扫描 (或一批曲线) 的 ln(I)-U 加权拟合:
+    每次 add 一段数据只累加充分统计量，内存与扫描长度无关，最后 result() 得到与
+    solar_cell_fit 对整条曲线拟合相同的结果。
+
+    例:
+        acc = SolarCellFitAccumulator(n_curves)
+        for U_block, I_block in blocks:     # 形状 (n_curves, 块长度)
+            acc.add(U_block, I_block)
+        fit = acc.result()
+    """
+
+    def __init__(self, shape=()):
+        """shape: 曲线批量的形状 (单条曲线为 ())"""
+        shape = (shape,) if isinstance(shape, (int, np.integer)) else tuple(shape)
+        self.sums = np.zeros((6,) + shape)
+        self.n_valid = np.zeros(self.sums.shape[1:], dtype=np.int64)
+        self.scatter_based = True
+
+    def add(self, voltage, current_mA, u_current_mA=None):
+        """累加一段数据，参数含义同 solar_cell_fit (最后一维是本段的点，各段都给出或都不给出 u(I))"""
+        sums, n_valid = _log_fit_terms(voltage, current_mA, u_current_mA)
+        self.scatter_based = self.scatter_based and u_current_mA is None
+        self.sums += sums
+        self.n_valid += n_valid
+        return self
+
+    def result(self):
+        """目前已累加数据的拟合结果，键名同 solar_cell_fit"""
+        return _log_fit_result(self.sums, self.n_valid, self.scatter_based)
+
+
+# --- 热机 ---
+def gamma_ratio(h_mm, T2_ms2, m, A, P=P_ATM, u_P=0.0, u_m=0.0, u_A=0.0):
+    """
+    比热容比 γ = 4π² m K / (A P)，K 为 h-T² 直线斜率，对应 热机/计算斜率.py。
+
+    Args:
+        h_mm (array_like): 形状 (..., n) 的高度 (mm)。
+        T2_ms2 (array_like): 形状 (..., n) 的周期平方 (ms²)。
+        m (float or array_like): 振动物体质量 (kg)。
+        A (float or array_like): 活塞面积 (m²)。
+        P (float or array_like): 大气压强 (Pa)，可按数据组给出 (如由 气压对齐.py 按实验时间查出)。
+        u_P, u_m, u_A (float or array_like): 可选，P、m、A 的标准不确定度。
+
+    Returns:
+        dict: K_mm_ms2, b_mm, K_m_s2, u_K_m_s2, gamma, u_gamma
+    """
+    K_mm_ms2, b_mm, r_squared, n = linear_fit(T2_ms2, h_mm)
+    K_m_s2 = K_mm_ms2 * 1000.0
+    m, A, P = np.asarray(m), np.asarray(A), np.asarray(P)
+    gamma = 4 * np.pi**2 * m * K_m_s2 / (A * P)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # 斜率的标准不确定度 u(K) = |K| sqrt((1/R² - 1) / (n - 2))
+        u_K_m_s2 = np.abs(K_m_s2) * np.sqrt((1 / r_squared - 1) / (n - 2))
+        u_gamma = np.abs(gamma) * np.sqrt((u_K_m_s2 / K_m_s2)**2 + (np.asarray(u_P) / P)**2
+                                          + (np.asarray(u_m) / m)**2 + (np.asarray(u_A) / A)**2)
+    return {"K_mm_ms2": K_mm_ms2, "b_mm": b_mm, "K_m_s2": K_m_s2, "u_K_m_s2": u_K_m_s2,
+            "gamma": gamma, "u_gamma": u_gamma}
+
+
+# --- 转动惯量 ---
+def moment_of_inertia(mass_g, radius_mm, avg_angular_accel, g=G):
+    """
+    驱动力矩 τ = m(g - αr)r 与总转动惯量 I = τ/α，对应 转动惯量/求转动惯量.py。
+
+    Returns:
+        dict: torque (N·m), moment_of_inertia (kg·m²), valid (αr < g 时模型适用)
+    """
+    mass_kg = np.asarray(mass_g, dtype=float) / 1000.0
+    radius_m = np.asarray(radius_mm, dtype=float) / 1000.0
+    alpha = np.asarray(avg_angular_accel, dtype=float)
+    torque = mass_kg * (g - alpha * radius_m) * radius_m
+    with np.errstate(invalid="ignore", divide="ignore"):
+        inertia = torque / alpha
+    return {"torque": torque, "moment_of_inertia": inertia, "valid": alpha * radius_m < g}
@@ -0,0 +1,270 @@
+import csv
+import datetime
+import json
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import 实验公式
+from 结果存档 import ResultArchive
+
+# --- 用户输入区 ---
+# 提交数据文件 (JSON Lines)，每行一份提交:
+# {"student": "2023001", "experiment": "newton_ring",
+#  "data": {"groups": [[19.672, 21.961, 18.038, 23.551], ...]},
+#  "claimed": {"R": "1062", "u_R": "7"}}
+# data 中的参数名与 实验公式.py 中对应函数的参数名相同；仪器误差限 (delta_ins_*) 不写时按读数从
+# 仪器检定.csv 查表 (见 仪器登记.py)，写在 data 中则使用提交给出的值；
+# claimed 中的数值请写成字符串 (保留报告中的末尾零)，以便检查有效数字。
+# 可选字段 "date" (YYYY-MM-DD) 和 "instrument" 会随重算结果一起写入结果存档。
+submissions_path = "提交数据.jsonl"
+output_dir = "评分结果"
+archive_path = "结果存档.sqlite"  # 重算结果写入的存档 (见 结果存档.py)，填 None 则不写入
+
+tolerance_k = 1.0          # 数值允许偏差 = tolerance_k * 计算得到的不确定度 (+ 报告末位的半个单位)
+u_rel_tolerance = 0.3      # 不确定度本身允许的相对偏差
+rel_tolerance_no_u = 0.01  # 没有不确定度的量 (如转动惯量实验的 τ、I) 允许的相对偏差
+chunk_size = 2000          # 每个进程一次处理的提交数
+max_workers = os.cpu_count() or 4
+# --- END 用户输入区 ---
+
+# 每个实验需要核对的量: (数值键, 不确定度键或 None)，键名与 实验公式.py 的返回值一致
+CHECKS = {
+    "newton_ring": [("R", "u_R")],
+    "wedge": [("D", "u_D"), ("theta", "u_theta")],
+    "aluminium_density": [("V", "u_V"), ("rho", "u_rho")],
+    "irregular_density": [("rho_obj", "uc_rho_obj")],
+    "solar_cell_fit": [("beta", "u_beta"), ("Is", "u_Is")],
+    "gamma": [("gamma", "u_gamma")],
+    "moment_of_inertia": [("torque", None), ("moment_of_inertia", None)],
+}
+
+FUNCTIONS = {
+    "newton_ring": 实验公式.newton_ring,
+    "wedge": 实验公式.wedge,
+    "aluminium_density": 实验公式.aluminium_density,
+    "irregular_density": 实验公式.irregular_density,
+    "solar_cell_fit": 实验公式.solar_cell_fit,
+    "gamma": 实验公式.gamma_ratio,
+    "moment_of_inertia": 实验公式.moment_of_inertia,
+}
+
+
+# --- 辅助函数 ---
+def parse_reported(text):
+    """
+    解析报告中的数值字符串。
+
+    Args:
+        text (str or float): 如 "1062"、"0.0340"、"4.41e-01"。
+
+    Returns:
+        tuple: value, ulp (末位有效数字的单位), sig_figs (有效数字位数)；无法解析时 value 为 NaN
+    """
+    text = str(text).strip().lower()
+    mantissa, _, exponent = text.partition("e")
+    try:
+        value = float(text)
+        exp = int(exponent) if exponent else 0
+    except ValueError:
+        return float("nan"), float("nan"), 0
+    digits = mantissa.lstrip("+-")
+    int_part, _, frac_part = digits.partition(".")
+    ulp = 10.0 ** (exp - len(frac_part))
+    significant = (int_part + frac_part).lstrip("0")
+    if not frac_part:
+        # 没有小数点时整数末尾的零视为有效数字 (如 "1060" 按4位计)
+        sig_figs = len(significant)
+    else:
+        sig_figs = len(significant) if significant else 1
+    return value, ulp, sig_figs
+
+
+def parse_column(claims, key):
+    """解析一批提交中同一个量的报告值，未报告的位置为 NaN"""
+    parsed = [parse_reported(c[key]) if key in c else (np.nan, np.nan, 0) for c in claims]
+    values, ulps, sig_figs = (np.array(col, dtype=float) for col in zip(*parsed))
+    return values, ulps, sig_figs
+
+
+def stack_params(submissions):
+    """把形状相同的一批提交的参数堆叠成带批量维的数组"""
+    keys = submissions[0]["data"].keys()
+    return {k: np.array([s["data"][k] for s in submissions], dtype=float) for k in keys}
+
+
+def shape_signature(submission):
+    """按实验和参数形状分组，同组可以一次向量化计算"""
+    data = submission["data"]
+    return (submission["experiment"],
+            tuple(sorted((k, np.shape(v)) for k, v in data.items())))
+
+
+def grade_group(experiment, submissions):
+    """
+    对同一实验、参数形状相同的一批提交重新计算并核对报告值 (在 worker 进程中运行)。
+
+    Returns:
+        tuple: rows (每个核对项一行 (student, experiment, quantity, claimed, computed, u, status)),
+               records (写入结果存档的重算结果，格式同 ResultArchive.insert_many)
+    """
+    rows, records = [], []
+    today = datetime.date.today().isoformat()
+    try:
+        params = stack_params(submissions)
+        # B类不确定度由 实验公式.py 按各读数从检定表 (仪器登记.py) 查出，提交中给出 delta_ins_* 时以提交为准；
+        # 超出检定量程的读数查不到误差限，这些提交单独报告
+        out_of_range = 实验公式.out_of_range(FUNCTIONS[experiment].__name__, params, (len(submissions),))
+        if out_of_range.any():
+            rows = [(submissions[i].get("student", ""), experiment, "", "", "", "", "数据错误: 读数超出仪器检定量程")
+                    for i in np.flatnonzero(out_of_range)]
+            keep = ~out_of_range
+            submissions = [s for s, k in zip(submissions, keep) if k]
+            if not submissions:
+                return rows, []
+            params = {k: v[keep] for k, v in params.items()}
+        result = FUNCTIONS[experiment](**params)
+    except (TypeError, ValueError, IndexError, KeyError) as e:
+        return rows + [(s.get("student", ""), experiment, "", "", "", "", f"数据错误: {e}") for s in submissions], []
+
+    claims = [s.get("claimed", {}) for s in submissions]
+    students = [s.get("student", "") for s in submissions]
+    for value_key, u_key in CHECKS[experiment]:
+        computed = np.broadcast_to(result[value_key], (len(submissions),)).astype(float)
+        claimed, ulp, _ = parse_column(claims, value_key)
+        reported = ~np.isnan(claimed)
+        half_ulp = np.where(reported, 0.5 * ulp, 0.0)
+
+        if u_key is not None:
+            u = np.broadcast_to(result[u_key], (len(submissions),)).astype(float)
+            value_ok = np.abs(claimed - computed) <= tolerance_k * u + half_ulp
+            u_claimed, u_ulp, u_sig = parse_column(claims, u_key)
+            u_reported = ~np.isnan(u_claimed)
+            u_ok = np.abs(u_claimed - u) <= u_rel_tolerance * u + 0.5 * np.where(u_reported, u_ulp, 0.0)
+            # 有效数字规则: 不确定度取1-2位，数值末位与不确定度末位对齐
+            both = reported & u_reported
+            u_sig_ok = (u_sig >= 1) & (u_sig <= 2)
+            aligned = np.isclose(ulp, u_ulp, rtol=1e-9)
+        else:
+            u = np.full(len(submissions), np.nan)
+            value_ok = np.abs(claimed - computed) <= rel_tolerance_no_u * np.abs(computed) + half_ulp
+
+        for i in np.flatnonzero(np.isfinite(computed)):
+            records.append((experiment, value_key, float(computed[i]), None if np.isnan(u[i]) else float(u[i]),
+                            None, students[i], submissions[i].get("instrument"),
+                            submissions[i].get("date") or today, "批量评分"))
+
+        for i in np.flatnonzero(reported):
+            status = "通过" if value_ok[i] else "数值不符"
+            rows.append((students[i], experiment, value_key, claims[i][value_key],
+                         f"{computed[i]:.6g}", "" if np.isnan(u[i]) else f"{u[i]:.3g}", status))
+        if u_key is None:
+            continue
+        for i in np.flatnonzero(u_reported):
+            status = "通过" if u_ok[i] else "不确定度不符"
+            rows.append((students[i], experiment, u_key, claims[i][u_key], f"{u[i]:.3g}", "", status))
+        for i in np.flatnonzero(both & ~(u_sig_ok & aligned)):
+            reason = "不确定度应取1-2位有效数字" if not u_sig_ok[i] else "数值末位应与不确定度末位对齐"
+            rows.append((students[i], experiment, value_key,
+                         f"{claims[i][value_key]} ± {claims[i][u_key]}", "", "", f"有效数字: {reason}"))
+    return rows, records
+
+
+def grade_all(submissions, pool):
+    """按实验和形状分组后拆块，交给进程池并行评分，返回 (rows, records)"""
+    groups = defaultdict(list)
+    for submission in submissions:
+        if submission.get("experiment") not in FUNCTIONS:
+            continue
+        groups[shape_signature(submission)].append(submission)
+
+    futures = []
+    for (experiment, _), members in groups.items():
+        for start in range(0, len(members), chunk_size):
+            futures.append(pool.submit(grade_group, experiment, members[start:start + chunk_size]))
+    rows, records = [], []
+    for future in futures:
+        group_rows, group_records = future.result()
+        rows += group_rows
+        records += group_records
+    unknown = [s for s in submissions if s.get("experiment") not in FUNCTIONS]
+    rows += [(s.get("student", ""), s.get("experiment", ""), "", "", "", "", "未知实验") for s in unknown]
+    return rows, records
+
+
+def write_reports(rows):
+    """写出评分明细 (CSV) 和每位学生的差异汇总"""
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, "评分明细.csv"), "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        writer.writerow(["学号", "实验", "物理量", "报告值", "重算值", "不确定度", "结论"])
+        writer.writerows(rows)
+
+    per_student = defaultdict(list)
+    for row in rows:
+        per_student[row[0]].append(row)
+    with open(os.path.join(output_dir, "评分汇总.txt"), "w", encoding="utf-8") as f:
+        for student in sorted(per_student):
+            items = per_student[student]
+            problems = [r for r in items if r[6] != "通过"]
+            f.write(f"{student}: 核对 {len(items)} 项，问题 {len(problems)} 项\n")
+            for _, experiment, quantity, claimed, computed, u, status in problems:
+                detail = f"报告 {claimed}" + (f"，重算 {computed}" if computed else "") + (f" ± {u}" if u else "")
+                f.write(f"  [{experiment}] {quantity}: {status} ({detail})\n")
+    return per_student
+
+
+def example_submissions():
+    """没有提交数据文件时使用的示例 (取自各实验脚本中的示例数据)"""
+    newton = [[19.672, 21.961, 18.038, 23.551], [19.688, 21.975, 18.040, 23.500],
+              [19.712, 21.978, 18.052, 23.568], [19.712, 21.962, 18.038, 23.510],
+              [19.722, 22.012, 18.061, 23.588]]
+    return [
+        {"student": "示例01", "experiment": "newton_ring", "data": {"groups": newton},
+         "claimed": {"R": "1062", "u_R": "7"}},
+        {"student": "示例02", "experiment": "newton_ring", "data": {"groups": newton},
+         "claimed": {"R": "1075.35", "u_R": "6.691"}},
+        {"student": "示例01", "experiment": "irregular_density",
+         "data": {"m_a": 10.3, "m_asw": 20.6, "m_osw": 9.15},
+         "claimed": {"rho_obj": "0.898", "uc_rho_obj": "0.004"}},
+        {"student": "示例02", "experiment": "moment_of_inertia",
+         "data": {"mass_g": 25, "radius_mm": 25, "avg_angular_accel": 2.70786},
+         "claimed": {"moment_of_inertia": "2.25e-3"}},
+    ]
+
+
+def load_submissions(path):
+    """读取 JSON Lines 提交文件，跳过空行"""
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# --- 主要评分逻辑 ---
+if __name__ == "__main__":
+    if os.path.isfile(submissions_path):
+        submissions = load_submissions(submissions_path)
+    else:
+        print(f"未找到 {submissions_path}，使用示例提交数据。")
+        submissions = example_submissions()
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        rows, records = grade_all(submissions, pool)
+    elapsed = time.perf_counter() - start
+    per_student = write_reports(rows)
+    if archive_path is not None:
+        archive = ResultArchive(archive_path)
+        archive.insert_many(records)
+        archive.close()
+
+    n_problems = sum(1 for r in rows if r[6] != "通过")
+    print(f"--- 批量评分结果 ---")
+    print(f"提交数: {len(submissions)}, 学生数: {len(per_student)}, 核对项: {len(rows)}, 问题项: {n_problems}")
+    print(f"评分用时: {elapsed:.2f} s")
+    print(f"明细已保存到 {os.path.join(output_dir, '评分明细.csv')}")
+    print(f"每位学生的差异汇总已保存到 {os.path.join(output_dir, '评分汇总.txt')}")
+    if archive_path is not None:
+        print(f"{len(records)} 条重算结果已写入 {archive_path}")
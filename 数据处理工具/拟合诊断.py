@@ -0,0 +1,215 @@
+import time
+from functools import lru_cache
+
+import numpy as np
+from scipy import stats
+
+import 合成数据
+import 实验公式
+
+# 直线拟合 y = slope * x + intercept 的残差诊断 (可加权，整批数据一次计算):
+#   - 残差、杠杆值 h_i (帽子矩阵对角元)、标准化残差、学生化残差 (去掉第 i 点后的 s 估计)；
+#   - Cook 距离 D_i；
+#   - 去掉第 i 点后的斜率和截距 (留一法)。
+# 直线拟合的帽子矩阵有解析式 h_i = w_i (1/S + (x_i - x̄)² / Sxx)，留一法的结果也可以由
+# 完整拟合的残差和 h_i 直接写出，不需要重新拟合 n 次，计算量与拟合本身同阶。
+# 输入的最后一维是一条直线上的点，前面的维度是任意多组数据 (与 实验公式.py 相同)。
+# 加权拟合 (如 ln(I)-U，w = 1/u(lnI)²) 传入 w 即可；w = 0 或 mask 为 False 的点不参与拟合，其诊断量为 NaN。
+# 自动标记:
+#   - 离群点: 学生化残差超过 t(n-p-1) 分布的 Bonferroni 修正分位数 (每组数据误报率约 OUTLIER_ALPHA)；
+#   - 强影响点: Cook 距离超过无异常数据时 max_i D_i 的上侧 COOK_ALPHA 分位数 (每组数据误报率约 COOK_ALPHA)，
+#     与离群点检验一样按实际点数 n 取阈值。常用的 D_i > 1 规则不随 n 变化: 6 点时正常数据组约 40% 被标出，
+#     而 F(p, n-p) 的分位数在点数少时 D_i 根本达不到。max_i D_i 的分布没有简单的解析式，
+#     由等间距设计 (实验中自变量通常等间隔取值) 下的正态残差模拟得到，每个 n 只算一次。
+#     热机/计算斜率.py 的逐点诊断使用同一规则。
+
+# --- 常量定义 ---
+N_PARAMS = 2              # 直线拟合的参数个数 (斜率、截距)
+LEVERAGE_FACTOR = 2.0     # h_i > LEVERAGE_FACTOR * p / n 视为高杠杆点
+OUTLIER_ALPHA = 0.05      # 离群点检验的显著性水平 (每组数据整体，按点数做 Bonferroni 修正)
+COOK_ALPHA = 0.05         # 强影响点的误报率 (每组数据整体)
+COOK_SIMULATIONS = 20_000 # 模拟 max_i D_i 零分布的数据组数
+
+
+# --- 辅助计算函数 ---
+@lru_cache(maxsize=None)
+def cook_threshold_for(n, alpha=COOK_ALPHA):
+    """
+    n 个点的直线拟合中，无异常数据时 max_i D_i 的上侧 alpha 分位数。
+
+    以等间距自变量、独立正态残差模拟 (固定随机种子，结果可复现)；n <= p + 1 时返回 NaN (不标记)。
+    """
+    if n <= N_PARAMS + 1:
+        return np.nan
+    rng = np.random.default_rng(n)
+    x = np.linspace(0.0, 1.0, n)
+    dx = x - x.mean()
+    leverage = 1 / n + dx**2 / np.sum(dx**2)
+    y = rng.standard_normal((COOK_SIMULATIONS, n))
+    residuals = y - y.mean(axis=-1, keepdims=True) - np.outer(y @ dx / np.sum(dx**2), dx)
+    s2 = np.sum(residuals**2, axis=-1, keepdims=True) / (n - N_PARAMS)
+    cooks_d = residuals**2 * leverage / (N_PARAMS * s2 * (1 - leverage)**2)
+    return float(np.quantile(cooks_d.max(axis=-1), 1 - alpha))
+
+
+def fit_diagnostics(x, y, w=None, mask=None, cook_threshold=None):
+    """
+    加权最小二乘直线拟合及逐点诊断。
+
+    Args:
+        x, y (array_like): 形状可广播的数据，最后一维是一条直线上的点。
+        w (array_like): 可选，各点权重 (如 1/u(y)²)，默认等权 (与 np.polyfit 相同)。
+        mask (array_like): 可选，False 的点不参与拟合。
+        cook_threshold (float or array_like): Cook 距离的阈值，默认按每组的点数取 cook_threshold_for(n)。
+
+    Returns:
+        dict:
+            逐组: slope, intercept, r_squared, n, s (残差标准差), n_outliers, n_influential
+            逐点: residuals, leverage, std_residuals, student_residuals, cooks_d,
+                  loo_slope, loo_intercept (去掉该点后的拟合), high_leverage, outlier, influential
+    """
+    x, y = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+    w = np.ones_like(x) if w is None else np.broadcast_to(np.asarray(w, dtype=float), x.shape)
+    if mask is not None:
+        w = np.where(np.broadcast_to(mask, x.shape), w, 0.0)
+    used = w > 0
+    x = np.where(used, x, 0.0)
+    y = np.where(used, y, 0.0)
+    n = used.sum(axis=-1)
+    p = N_PARAMS
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        S = w.sum(axis=-1)
+        mean_x = (w * x).sum(axis=-1) / S
+        mean_y = (w * y).sum(axis=-1) / S
+        dx = np.where(used, x - mean_x[..., None], 0.0)
+        dy = np.where(used, y - mean_y[..., None], 0.0)
+        s_xx = (w * dx * dx).sum(axis=-1)
+        s_xy = (w * dx * dy).sum(axis=-1)
+        s_yy = (w * dy * dy).sum(axis=-1)
+        slope = s_xy / s_xx
+        intercept = mean_y - slope * mean_x
+        r_squared = s_xy**2 / (s_xx * s_yy)
+
+        residuals = np.where(used, y - (slope[..., None] * x + intercept[..., None]), np.nan)
+        leverage = np.where(used, w * (1 / S[..., None] + dx**2 / s_xx[..., None]), np.nan)
+        one_minus_h = 1 - leverage
+        e_w2 = w * residuals**2                                       # 加权残差平方
+        sse = np.nansum(e_w2, axis=-1)
+        s2 = sse / (n - p)
+        std_residuals = residuals * np.sqrt(w / (s2[..., None] * one_minus_h))
+        # 去掉第 i 点后的残差方差: ((n-p) s² - w e²/(1-h)) / (n-p-1)
+        s2_loo = np.maximum(sse[..., None] - e_w2 / one_minus_h, 0.0) / (n - p - 1)[..., None]
+        student_residuals = residuals * np.sqrt(w / (s2_loo * one_minus_h))
+        cooks_d = std_residuals**2 * leverage / (p * one_minus_h)
+
+        # 留一法: β_(i) = β - (XᵀWX)⁻¹ x_i w_i e_i / (1 - h_i)
+        step = w * residuals / one_minus_h
+        loo_slope = slope[..., None] - dx / s_xx[..., None] * step
+        loo_intercept = intercept[..., None] - (1 / S[..., None] - mean_x[..., None] * dx / s_xx[..., None]) * step
+
+        # 分位数只按不同的点数各算一次
+        n_unique, n_index = np.unique(n, return_inverse=True)
+        t_crit = stats.t.ppf(1 - OUTLIER_ALPHA / (2 * n_unique), n_unique - p - 1)[n_index].reshape(n.shape)
+        if cook_threshold is None:
+            cook_threshold = np.array([cook_threshold_for(int(k)) for k in n_unique])[n_index].reshape(n.shape)
+        high_leverage = leverage > LEVERAGE_FACTOR * p / n[..., None]
+        outlier = np.abs(student_residuals) > np.asarray(t_crit)[..., None]
+        influential = cooks_d > np.asarray(cook_threshold)[..., None]
+
+    return {"slope": slope, "intercept": intercept, "r_squared": r_squared, "n": n, "s": np.sqrt(s2),
+            "residuals": residuals, "leverage": leverage, "std_residuals": std_residuals,
+            "student_residuals": student_residuals, "cooks_d": cooks_d,
+            "loo_slope": loo_slope, "loo_intercept": loo_intercept,
+            "high_leverage": high_leverage, "outlier": outlier, "influential": influential,
+            "n_outliers": outlier.sum(axis=-1), "n_influential": influential.sum(axis=-1)}
+
+
+def solar_cell_diagnostics(voltage, current_mA, u_current_mA=None):
+    """
+    ln(I)-U 加权拟合的逐点诊断，权重与 实验公式.solar_cell_fit 相同
+    (w = (I/u(I))²，没有给出 u(I) 时等权，电流非正的点不参与)。
+    """
+    current_mA = np.asarray(current_mA, dtype=float)
+    valid = current_mA > 0
+    ln_current = np.log(np.where(valid, current_mA, 1.0))
+    if u_current_mA is None:
+        w = valid.astype(float)
+    else:
+        w = np.where(valid, (current_mA / np.asarray(u_current_mA, dtype=float))**2, 0.0)
+    return fit_diagnostics(voltage, ln_current, w=w)
+
+
+def report(x, y, diag, x_name="x", y_name="y"):
+    """打印一组数据的诊断表，标出需要检查的点"""
+    print(f"拟合: {y_name} = {diag['slope']:.6g} {x_name} + {diag['intercept']:.6g}, "
+          f"R² = {diag['r_squared']:.5f}, n = {diag['n']}")
+    print(f"{'点':>3} {x_name:>10} {y_name:>10} {'残差':>9} {'杠杆值':>7} {'学生化残差':>9} "
+          f"{'Cook距离':>8} {'去掉后斜率':>12}  标记")
+    for i in range(len(x)):
+        flags = [name for key, name in (("influential", "强影响"), ("outlier", "离群"),
+                                        ("high_leverage", "高杠杆")) if diag[key][i]]
+        print(f"{i + 1:>3} {x[i]:>10.4g} {y[i]:>10.4g} {diag['residuals'][i]:>9.3g} "
+              f"{diag['leverage'][i]:>7.3f} {diag['student_residuals'][i]:>9.2f} "
+              f"{diag['cooks_d'][i]:>8.3f} {diag['loo_slope'][i]:>12.6g}  {' '.join(flags)}")
+
+
+# --- 示例: 热机 h-T² 示例数据，以及整批数据的诊断开销 ---
+if __name__ == "__main__":
+    h_data_mm = np.array([10, 20, 30, 40, 50, 60], dtype=float)
+    T2_data_ms2 = np.array([334.89, 470.89, 660.49, 745.29, 1024, 1274.49])
+    print("--- 热机/计算斜率.py 示例数据 ---")
+    report(T2_data_ms2, h_data_mm, fit_diagnostics(T2_data_ms2, h_data_mm), "T²", "h")
+
+    # 核对: 解析式与逐点重新拟合的结果相同
+    diag = fit_diagnostics(T2_data_ms2, h_data_mm)
+    refit = [np.polyfit(np.delete(T2_data_ms2, i), np.delete(h_data_mm, i), 1) for i in range(6)]
+    print(f"\n留一法斜率与逐点重新拟合的最大差: "
+          f"{np.max(np.abs(diag['loo_slope'] - [c[0] for c in refit])):.2e}")
+
+    # 太阳能电池/伏安特性制图.py 示例数据: 未给出 u(I) 时等权拟合，u(lnI) 由残差的离散 s 估计
+    voltage = np.arange(0, 5.01, 0.5)
+    current_mA = np.array([0.443, 0.470, 0.545, 0.582, 0.658, 0.816, 0.899, 0.963, 0.997, 1.099, 1.224])
+    solar = solar_cell_diagnostics(voltage, current_mA)
+    print(f"\n--- 太阳能电池/伏安特性制图.py 示例数据 (由残差估计 u(lnI) = {solar['s']:.4f}) ---")
+    report(voltage, np.log(current_mA), solar, "U", "ln(I)")
+
+    # 核对: 已知相对噪声的合成 I-U 曲线 (不加仪器误差和取整)，残差估计的 u(lnI) 应回到该噪声水平，
+    # β 落在 ±u(β) 内的比例应接近 t(n-2) 分布的 68% 区间覆盖率
+    relative_noise = 0.01
+    inputs, truth = 合成数据.solar_cell_iv(20_000, relative_noise=relative_noise, delta_ins_current_mA=0.0,
+                                           resolution_mA=0.0, seed=3)
+    synthetic = solar_cell_diagnostics(inputs["voltage"], inputs["current_mA"])
+    fit = 实验公式.solar_cell_fit(inputs["voltage"], inputs["current_mA"])
+    u_lnI = np.sqrt(np.mean(synthetic["s"]**2))
+    covered = np.mean(np.abs(fit["beta"] - truth["beta"]) < fit["u_beta"])
+    expected = 2 * stats.t.cdf(1, len(voltage) - 2) - 1
+    assert abs(u_lnI / relative_noise - 1) < 0.02, f"u(lnI) 估计 {u_lnI:.5f}，与合成噪声 {relative_noise} 不符"
+    assert abs(covered - expected) < 0.02, f"β 的 ±u(β) 覆盖率 {covered:.1%}，应约为 {expected:.1%}"
+    print(f"合成数据 (相对噪声 {relative_noise})，20,000 条曲线: 残差估计的 u(lnI) 均方根 {u_lnI:.5f}，"
+          f"β 落在 ±u(β) 内 {covered:.1%} (t({len(voltage) - 2}) 分布 {expected:.1%})")
+
+    # 一批 h-T² 数据，其中 1% 的数据组混入一个读错的点
+    rng = np.random.default_rng(0)
+    n_sets, n_points = 200_000, 6
+    h = np.broadcast_to(h_data_mm, (n_sets, n_points))
+    T2 = (h - 2.0) / 0.0478 + rng.normal(0, 15, (n_sets, n_points))
+    bad_sets = rng.random(n_sets) < 0.01
+    bad_points = rng.integers(0, n_points, n_sets)
+    T2[bad_sets, bad_points[bad_sets]] += rng.choice([-1, 1], bad_sets.sum()) * 150
+
+    start = time.perf_counter()
+    实验公式.linear_fit(T2, h)
+    t_fit = time.perf_counter() - start
+    start = time.perf_counter()
+    batch = fit_diagnostics(T2, h)
+    t_diag = time.perf_counter() - start
+    print(f"\n--- {n_sets:,} 组 × {n_points} 点，其中 {bad_sets.mean():.1%} 的数据组混入一个读错的点 ---")
+    print(f"只拟合 {t_fit:.3f} s，拟合+诊断 {t_diag:.3f} s (含 n = {n_points} 的 Cook 阈值模拟)")
+    print(f"强影响点阈值 D > {cook_threshold_for(n_points):.3f} (目标误报率 {COOK_ALPHA:.0%})，"
+          f"固定阈值 D > 1 时正常数据组被误标 {(batch['cooks_d'] > 1).any(axis=-1)[~bad_sets].mean():.1%}")
+    for key, name in (("outlier", "离群点"), ("influential", "强影响点")):
+        flagged = batch[key].any(axis=-1)
+        print(f"{name}: 读错的点被标出 {batch[key][bad_sets, bad_points[bad_sets]].mean():.1%}，"
+              f"正常数据组被误标 {flagged[~bad_sets].mean():.1%}")
+
@@ -0,0 +1,210 @@
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+import 分块执行
+import 实验公式
+
+# 长时间批量重算的断点续算:
+# - 结果写入工作目录下的 .npy 内存映射文件 (每个结果一个文件，第 i 行对应第 i 组数据)；
+# - 每完成一块，先把该块结果刷到磁盘，再向日志 (只追加的文本文件) 写一行 "start stop first_id last_id"；
+# - 重新运行时读日志得到已完成的区间，只计算其余部分。
+# 日志中的一行只有在对应结果落盘之后才会写入，中途崩溃最多重算最后一块；
+# 写了一半的日志行 (没有换行符) 在读取时忽略。结果文件先以临时文件名创建，初始化完成后再改名，
+# 因此工作目录中不会出现只有一半文件头的 .npy。
+
+# --- 常量定义 ---
+JOURNAL_NAME = "已完成.journal"
+HEADER_PREFIX = "# "
+
+
+# --- 辅助函数 ---
+def _create_output(path, n_sets, dtype=np.float64):
+    """先写临时文件再改名，保证 path 要么不存在，要么是完整的 .npy"""
+    tmp_path = path + ".tmp"
+    array = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=dtype, shape=(n_sets,))
+    array[:] = np.nan
+    array.flush()
+    del array
+    os.replace(tmp_path, path)
+
+
+def open_work_dir(work_dir, n_sets, names):
+    """
+    打开 (或新建) 工作目录下的结果文件。
+
+    Returns:
+        dict: 结果名 -> 可读写的内存映射数组
+    """
+    os.makedirs(work_dir, exist_ok=True)
+    out = {}
+    for name in names:
+        path = os.path.join(work_dir, f"{name}.npy")
+        if not os.path.isfile(path):
+            _create_output(path, n_sets)
+        array = np.load(path, mmap_mode="r+")
+        if array.shape != (n_sets,):
+            raise ValueError(f"{path} 的形状 {array.shape} 与数据组数 {n_sets} 不一致，请换一个工作目录")
+        out[name] = array
+    return out
+
+
+def read_journal(path, n_sets):
+    """
+    读取日志，返回已完成数据组的 bool 数组。
+    日志头记录数据组数，与本次不一致时报错 (防止把别的数据集的结果当作已完成)。
+    """
+    done = np.zeros(n_sets, dtype=bool)
+    if not os.path.isfile(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    for line in lines:
+        if not line.endswith("\n"):  # 崩溃时写了一半的行
+            continue
+        if line.startswith(HEADER_PREFIX):
+            recorded = int(line[len(HEADER_PREFIX):].split()[0].split("=")[1])
+            if recorded != n_sets:
+                raise ValueError(f"日志记录的数据组数 {recorded} 与本次 {n_sets} 不一致，请换一个工作目录")
+            continue
+        fields = line.split("\t")
+        try:
+            start, stop = int(fields[0]), int(fields[1])
+        except (ValueError, IndexError):
+            continue
+        done[start:stop] = True
+    return done
+
+
+def pending_ranges(done):
+    """未完成数据组的连续区间 [(start, stop), ...]"""
+    edges = np.diff(np.concatenate([[0], (~done).astype(np.int8), [0]]))
+    return list(zip(np.flatnonzero(edges == 1).tolist(), np.flatnonzero(edges == -1).tolist()))
+
+
+class Journal:
+    """只追加的完成记录，每行对应一块已经落盘的结果"""
+
+    def __init__(self, path, n_sets, names, fsync=True):
+        self.path = path
+        self.fsync = fsync
+        is_new = not os.path.isfile(path)
+        self.file = open(path, "a", encoding="utf-8")
+        if is_new:
+            self.file.write(f"{HEADER_PREFIX}n_sets={n_sets} outputs={','.join(names)}\n")
+            self._sync()
+
+    def _sync(self):
+        self.file.flush()
+        if self.fsync:
+            os.fsync(self.file.fileno())
+
+    def record(self, start, stop, first_id="", last_id=""):
+        self.file.write(f"{start}\t{stop}\t{first_id}\t{last_id}\n")
+        self._sync()
+
+    def close(self):
+        self.file.close()
+
+
+def run_resumable(func, inputs, work_dir, names, ids=None, memory_budget_mb=256, params=None,
+                  on_chunk=None, fsync=True):
+    """
+    带断点续算的 分块执行.run_chunked: 跳过日志中已完成的数据组，其余按块计算并记录。
+
+    Args:
+        func (callable): 实验公式.py 中的函数。
+        inputs (dict): 参数名 -> 数组 (第0维是数据组，可以是内存映射)。
+        work_dir (str): 工作目录，存放结果 .npy 和日志。
+        names (list): 需要保存的结果名 (func 返回 dict 的键)。
+        ids (array_like): 可选，各数据组的编号，写入日志便于人工核对。
+        on_chunk (callable): 可选，每块结果记录到日志后调用 on_chunk(start, stop)。
+        fsync (bool): 每块记录后是否 fsync (断电也不丢记录)。
+
+    Returns:
+        tuple: out (dict: 结果名 -> 内存映射数组), stats (dict: n_sets, n_skipped, n_computed, n_chunks, seconds)
+    """
+    n_sets = len(next(iter(inputs.values())))
+    out = open_work_dir(work_dir, n_sets, names)
+    journal_path = os.path.join(work_dir, JOURNAL_NAME)
+    done = read_journal(journal_path, n_sets)
+    n_skipped = int(done.sum())
+
+    journal = Journal(journal_path, n_sets, names, fsync=fsync)
+    start_time = time.perf_counter()
+    n_chunks = 0
+    try:
+        for range_start, range_stop in pending_ranges(done):
+            sub_inputs = {k: a[range_start:range_stop] for k, a in inputs.items()}
+            sub_out = {k: out[k][range_start:range_stop] for k in names}
+
+            def commit(start, stop, base=range_start):
+                nonlocal n_chunks
+                a, b = base + start, base + stop
+                for array in out.values():
+                    array.flush()
+                journal.record(a, b, ids[a] if ids is not None else "", ids[b - 1] if ids is not None else "")
+                n_chunks += 1
+                if on_chunk is not None:
+                    on_chunk(a, b)
+
+            分块执行.run_chunked(func, sub_inputs, memory_budget_mb, out=sub_out, params=params, on_chunk=commit)
+    finally:
+        journal.close()
+
+    stats = {"n_sets": n_sets, "n_skipped": n_skipped, "n_computed": n_sets - n_skipped,
+             "n_chunks": n_chunks, "seconds": time.perf_counter() - start_time}
+    return out, stats
+
+
+# --- 示例: 中途崩溃后续算，结果与一次算完相同 ---
+if __name__ == "__main__":
+    n_sets = 2_000_000
+    memory_budget_mb = 16
+    crash_after_chunks = 7
+
+    class SimulatedCrash(Exception):
+        pass
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "newton.npy")
+        分块执行.write_synthetic_newton_rings(path, n_sets)
+        groups = np.load(path, mmap_mode="r")
+        inputs = {"groups": groups}
+        ids = np.char.add("NR-", np.arange(n_sets).astype(str))
+        work_dir = os.path.join(tmp, "续算")
+
+        print(f"--- 断点续算 ({n_sets:,} 组牛顿环数据，内存预算 {memory_budget_mb} MB) ---")
+
+        def crash(start, stop, counter=[0]):
+            counter[0] += 1
+            if counter[0] == crash_after_chunks:
+                raise SimulatedCrash()
+
+        try:
+            run_resumable(实验公式.newton_ring, inputs, work_dir, ["R", "u_R"], ids=ids,
+                          memory_budget_mb=memory_budget_mb, on_chunk=crash)
+        except SimulatedCrash:
+            done = read_journal(os.path.join(work_dir, JOURNAL_NAME), n_sets)
+            print(f"第一次运行在第 {crash_after_chunks} 块后中断，日志记录已完成 {done.sum():,} 组")
+
+        out, stats = run_resumable(实验公式.newton_ring, inputs, work_dir, ["R", "u_R"], ids=ids,
+                                   memory_budget_mb=memory_budget_mb)
+        print(f"续算: 跳过 {stats['n_skipped']:,} 组，计算 {stats['n_computed']:,} 组 "
+              f"({stats['n_chunks']} 块)，用时 {stats['seconds']:.2f} s")
+
+        reference, plain = 分块执行.run_chunked(实验公式.newton_ring, inputs, memory_budget_mb)
+        same = all(np.array_equal(out[k], reference[k]) for k in ("R", "u_R"))
+        print(f"与一次算完的结果{'完全相同' if same else '不一致'}")
+
+        shutil.rmtree(work_dir)
+        _, fresh = run_resumable(实验公式.newton_ring, inputs, work_dir, ["R", "u_R"], ids=ids,
+                                 memory_budget_mb=memory_budget_mb)
+        overhead = fresh["seconds"] - plain["seconds"]
+        print(f"日志开销: 不记录 {plain['seconds']:.2f} s，记录 {fresh['seconds']:.2f} s "
+              f"(约 {max(overhead, 0) / n_sets * 1e9:.0f} ns/组)")
+        del groups, out, reference
+    print("\n计算完成！")
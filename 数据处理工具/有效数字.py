@@ -0,0 +1,292 @@
+import time
+
+import numpy as np
+
+# 测量结果的有效数字修约与格式化 (整批数组一次处理):
+#   1. 不确定度保留1-2位有效数字: 首位数字 >= 3 时保留1位，否则保留2位 (如 0.23 -> 0.23，0.46 -> 0.5)；
+#   2. 测量值修约到与不确定度末位相同的数位；
+#   3. 修约按"四舍六入五凑偶" (np.round 的规则)，也可选择不确定度"只进不舍"。
+# 数值的绝对值很大或很小 (或不确定度末位在个位以上) 时用科学计数法，例如
+#   (1062 ± 7) mm，(0.0340 ± 0.0004) mm，(2.25 ± 0.04)×10⁻³ kg·m²。
+# 字符串由整数运算直接在 Unicode 码位数组上拼出，整批一起处理，不逐个元素写 if/elif。
+# 修约按十进制写出的数值进行: 0.95 在二进制中是 0.94999...，先把 x / 10^k 舍去二进制表示误差
+# (保留 ROUND_GUARD_DECIMALS 位小数) 再取整，结果与 decimal 模块按 "0.95" 修约相同 (0.95 -> 1.0)。
+# 各实验脚本 (牛顿环、劈尖干涉、铝件) 的结果修约也使用本文件的 round_to_uncertainty。
+
+# --- 常量定义 ---
+FIRST_DIGIT_ONE_SIG = 3   # 不确定度首位数字 >= 3 时只保留1位有效数字
+SCI_MIN_EXPONENT = -3     # 数量级 <= -3 时使用科学计数法
+SCI_MAX_EXPONENT = 5      # 数量级 >= 5 时使用科学计数法
+ROUND_GUARD_DECIMALS = 9  # x / 10^k 先保留的小数位数，用于消除二进制表示误差
+SUPERSCRIPT = str.maketrans("-0123456789", "⁻⁰¹²³⁴⁵⁶⁷⁸⁹")
+
+
+# --- 辅助函数 ---
+def _floor_log10(x):
+    """|x| 的数量级 (x 为0或 NaN 时返回0)"""
+    x = np.abs(np.asarray(x, dtype=float))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        e = np.floor(np.log10(np.where(x > 0, x, 1.0)))
+    # log10 在 10 的整数次幂附近可能差一位，用乘回去校正
+    e = np.where(x >= 10.0 ** (e + 1), e + 1, e)
+    e = np.where(x < 10.0 ** e, e - 1, e)
+    return np.where(np.isfinite(x) & (x > 0), e, 0).astype(np.int64)
+
+
+def uncertainty_exponent(u, round_up=False):
+    """
+    不确定度修约后末位的数量级 k (修约单位为 10^k)。
+
+    Args:
+        u (array_like): 不确定度 (正数)。
+        round_up (bool): 不确定度是否只进不舍。
+
+    Returns:
+        np.ndarray: k (int64)
+    """
+    u = np.abs(np.asarray(u, dtype=float))
+    e = _floor_log10(u)
+    first_digit = np.floor(u / 10.0**e + 1e-9)
+    k = np.where(first_digit >= FIRST_DIGIT_ONE_SIG, e, e - 1)
+    # 修约后进位到下一个数量级时 (如 0.096 -> 0.10)，末位相应上移
+    rounded = _round_to(u, k, round_up)
+    return np.where(rounded >= 10.0 ** (e + 1) * (1 - 1e-12), np.maximum(k, e), k)
+
+
+def _round_to(x, k, round_up=False):
+    k = np.asarray(k, dtype=float)
+    scale = 10.0 ** k
+    # 0.95 / 0.1 = 9.4999999999999982，先消除表示误差得到 9.5，再按四舍六入五凑偶取整
+    q = np.round(np.asarray(x, dtype=float) / scale, ROUND_GUARD_DECIMALS)
+    q = np.ceil(q) if round_up else np.round(q)
+    # k < 0 时除以 10^-k (精确的整数) 而不是乘 10^k，得到最接近十进制结果的浮点数 (3 × 0.1 = 0.30000000000000004)
+    return np.where(k < 0, q / 10.0 ** -k, q * scale)
+
+
+def round_result(value, u, round_up=False):
+    """
+    按不确定度修约测量值和不确定度。
+
+    Returns:
+        tuple: value_rounded, u_rounded, k (修约单位 10^k)
+    """
+    value = np.asarray(value, dtype=float)
+    u = np.abs(np.asarray(u, dtype=float))
+    k = uncertainty_exponent(u, round_up)
+    return _round_to(value, k), _round_to(u, k, round_up), k
+
+
+def round_to_uncertainty(value, u, round_up=False):
+    """
+    单个结果的 round_result，供实验脚本打印结果时使用。
+
+    Returns:
+        tuple: 修约后的测量值, 修约后的不确定度, 显示的小数位数
+               (value 或 u 为 NaN、u 为0时无法修约，原样返回并显示4位小数)
+    """
+    u = abs(u)
+    if not (np.isfinite(value) and np.isfinite(u)) or u == 0:
+        return value, u, 4
+    value_rounded, u_rounded, k = round_result(value, u, round_up)
+    return float(value_rounded), float(u_rounded), max(-int(k), 0)
+
+
+# 字符串直接在 Unicode 码位数组上拼出: 每个片段是 (码位矩阵, 各元素长度)，
+# 片段依次写到各元素当前的末尾，最后把整个矩阵视为定长 Unicode 字符串 (末尾的 0 码位会被 NumPy 去掉)。
+POW10 = 10 ** np.arange(19, dtype=np.int64)
+
+
+def _text_piece(text, shape):
+    """所有元素相同的文字片段"""
+    codes = np.array([ord(c) for c in text], dtype=np.uint32)
+    return np.broadcast_to(codes, shape + (len(text),)), np.full(shape, len(text), dtype=np.int64)
+
+
+def _lookup_piece(index, table):
+    """按下标从一张小表中取文字 (如 "×10⁻³")"""
+    width = max((len(t) for t in table), default=0)
+    codes = np.zeros((len(table), width), dtype=np.uint32)
+    for i, t in enumerate(table):
+        codes[i, :len(t)] = [ord(c) for c in t]
+    lengths = np.array([len(t) for t in table], dtype=np.int64)
+    return codes[index], lengths[index]
+
+
+def _number_piece(n, decimals):
+    """
+    整数 n 按 decimals 位小数写出 (即 n × 10^-decimals)，decimals < 0 时在末尾补零。
+
+    Returns:
+        tuple: codes (m, W) uint32, lengths (m,)
+    """
+    n, decimals = np.broadcast_arrays(np.asarray(n, dtype=np.int64), np.asarray(decimals, dtype=np.int64))
+    n, decimals = n.ravel(), decimals.ravel()
+    magnitude = np.abs(n) * POW10[np.maximum(-decimals, 0)]
+    decimals = np.maximum(decimals, 0)
+    negative = (n < 0).astype(np.int64)
+    n_digits = 1 + (magnitude[:, None] >= POW10[1:]).sum(axis=1)
+    n_digits = np.maximum(n_digits, decimals + 1)            # 0.0034 这类需要补前导零
+    has_point = (decimals > 0).astype(np.int64)
+    lengths = negative + n_digits + has_point
+    width = int(lengths.max(initial=1))
+
+    # 各位数字 (个位在第0列)，只需做 max(n_digits) 次整除
+    n_cols = int(n_digits.max(initial=1))
+    digits = np.empty((len(n), n_cols), dtype=np.uint32)
+    rest = magnitude.copy()
+    for j in range(n_cols):
+        rest, digits[:, j] = np.divmod(rest, 10)
+
+    # 第 p 个字符对应的数位 (power)，再一次性从 digits 中取出
+    p = np.arange(width)
+    q = p - negative[:, None]                                  # 数字部分 (含小数点) 中的位置
+    int_digits = (n_digits - decimals)[:, None]
+    digit_index = np.where(q > int_digits, q - 1, q)           # 跳过小数点
+    power = np.clip(n_digits[:, None] - 1 - digit_index, 0, n_cols - 1)
+    codes = np.take_along_axis(digits, power, axis=1) + ord("0")
+    codes[(has_point[:, None] > 0) & (q == int_digits)] = ord(".")
+    codes[q == -1] = ord("-")
+    codes[p >= lengths[:, None]] = 0
+    return codes, lengths
+
+
+def _compose(pieces, shape):
+    """依次拼接各片段，返回形状为 shape 的 Unicode 字符串数组"""
+    m = int(np.prod(shape, dtype=np.int64))
+    total = sum(codes.shape[-1] for codes, _ in pieces)
+    out = np.zeros((m, max(total, 1)), dtype=np.uint32)
+    rows = np.arange(m)[:, None]
+    offset = np.zeros(m, dtype=np.int64)
+    for codes, lengths in pieces:
+        codes = codes.reshape(m, -1)
+        width = codes.shape[1]
+        if width:
+            out[rows, offset[:, None] + np.arange(width)] = codes
+        offset += lengths.reshape(m)
+    return out.view(f"U{out.shape[1]}").reshape(shape)
+
+
+def _exponent_piece(use_sci, exponents):
+    """科学计数法时的 "×10⁻³"，否则为空"""
+    exponents = np.where(use_sci, exponents, 0).ravel()
+    unique, inverse = np.unique(exponents, return_inverse=True)
+    table = [f"×10{str(int(e)).translate(SUPERSCRIPT)}" for e in unique] + [""]
+    index = np.where(use_sci.ravel(), inverse.ravel(), len(table) - 1)
+    return _lookup_piece(index, table)
+
+
+def format_results(value, u, unit="", sci=None, round_up=False):
+    """
+    把 (测量值, 不确定度) 格式化为 "(数值 ± 不确定度) 单位"。
+
+    Args:
+        value, u (array_like): 形状可广播的测量值和不确定度。
+        unit (str): 单位。
+        sci (bool): True/False 强制使用/不使用科学计数法，None 时按数量级自动选择。
+        round_up (bool): 不确定度是否只进不舍。
+
+    Returns:
+        np.ndarray: 字符串数组 (不确定度为0、NaN 或测量值为 NaN 的元素为 "NaN")
+    """
+    value, u = np.broadcast_arrays(np.asarray(value, dtype=float), np.abs(np.asarray(u, dtype=float)))
+    shape = value.shape
+    valid = np.isfinite(value) & np.isfinite(u) & (u > 0)
+    v = np.where(valid, value, 0.0)
+    uu = np.where(valid, u, 1.0)
+    v_r, u_r, k = round_result(v, uu, round_up)
+
+    # 科学计数法的指数取测量值与不确定度中较大的数量级
+    exponent = np.maximum(_floor_log10(v_r), _floor_log10(u_r))
+    use_sci = (exponent <= SCI_MIN_EXPONENT) | (exponent >= SCI_MAX_EXPONENT) | (k > 0)
+    if sci is not None:
+        use_sci = np.full(shape, bool(sci))
+    shift = np.where(use_sci, exponent, 0)
+    decimals = shift - k
+
+    pieces = [_text_piece("(", shape),
+              _number_piece(np.round(v_r / 10.0**k), decimals),
+              _text_piece(" ± ", shape),
+              _number_piece(np.round(u_r / 10.0**k), decimals),
+              _text_piece(")", shape),
+              _exponent_piece(use_sci, shift)]
+    if unit:
+        pieces.append(_text_piece(" " + unit, shape))
+    return np.where(valid, _compose(pieces, shape), "NaN")
+
+
+def format_result(value, u, unit="", sci=None, round_up=False):
+    """单个结果的 format_results"""
+    return str(format_results(value, u, unit, sci, round_up)[()])
+
+
+def format_values(value, sig_figs=4, unit="", sci=None):
+    """
+    没有不确定度的量 (如 γ) 按有效数字位数格式化。
+
+    Returns:
+        np.ndarray: 字符串数组
+    """
+    value = np.asarray(value, dtype=float)
+    shape = value.shape
+    valid = np.isfinite(value)
+    v = np.where(valid, value, 0.0)
+    e = _floor_log10(v)
+    v_r = _round_to(v, e - (sig_figs - 1))
+    e = _floor_log10(v_r)  # 修约后可能进位 (如 9.9996 -> 10.00)
+    k = e - (sig_figs - 1)
+    use_sci = (e <= SCI_MIN_EXPONENT) | (e >= SCI_MAX_EXPONENT) | (k > 0)
+    if sci is not None:
+        use_sci = np.full(shape, bool(sci))
+    shift = np.where(use_sci, e, 0)
+    pieces = [_number_piece(np.round(v_r / 10.0**k), shift - k), _exponent_piece(use_sci, shift)]
+    if unit:
+        pieces.append(_text_piece(" " + unit, shape))
+    return np.where(valid, _compose(pieces, shape), "NaN")
+
+
+# --- 示例 ---
+if __name__ == "__main__":
+    examples = [
+        ("牛顿环 R", 1062.3455, 6.6915, "mm"),
+        ("劈尖 D", 0.034012, 0.000436, "mm"),
+        ("铝件 ρ", 2.76163, 0.01387, "g/cm³"),
+        ("太阳能电池 Is", 0.45881, 0.01854, "mA"),
+        ("太阳能电池 β", 0.19976, 0.01094, "V⁻¹"),
+        ("转动惯量 I", 2.2463e-3, 3.85e-5, "kg·m²"),
+        ("进位示例", 12.3449, 0.0996, "mm"),
+    ]
+    print("--- 有效数字修约 ---")
+    for name, value, u, unit in examples:
+        print(f"  {name:<12} {value!r:>12} ± {u!r:<10} -> {format_result(value, u, unit)}")
+    print(f"  {'比热容比 γ':<12} {1.2062649!r:>12}              -> {format_values(1.2062649, 4)[()]}")
+
+    # 修约边界 (正好是5的情况): 与 decimal 模块按十进制字符串修约 (四舍六入五凑偶) 的结果核对
+    from decimal import ROUND_HALF_EVEN, Decimal
+
+    def decimal_reference(value, u):
+        d_u = Decimal(repr(u))
+        e = d_u.adjusted()
+        k = e if int(d_u.scaleb(-e)) >= FIRST_DIGIT_ONE_SIG else e - 1
+        u_r = d_u.quantize(Decimal(1).scaleb(k), ROUND_HALF_EVEN)
+        if u_r.adjusted() > e:  # 进位到下一个数量级
+            k = max(k, e)
+            u_r = d_u.quantize(Decimal(1).scaleb(k), ROUND_HALF_EVEN)
+        return float(Decimal(repr(value)).quantize(Decimal(1).scaleb(k), ROUND_HALF_EVEN)), float(u_r)
+
+    edge_cases = [(12.345, 0.95), (3.1415, 0.25), (0.35, 0.3), (2.25, 0.35), (7.85, 0.15),
+                  (1062.35, 6.5), (0.0345, 0.00095), (12.3449, 0.0996), (0.45, 0.05)]
+    print("\n--- 修约边界核对 (与 decimal 修约比较) ---")
+    for value, u in edge_cases:
+        v_r, u_r, decimals = round_to_uncertainty(value, u)
+        expected = decimal_reference(value, u)
+        assert (v_r, u_r) == expected, f"{value} ± {u}: {(v_r, u_r)} != {expected}"
+        print(f"  {value!r:>8} ± {u!r:<8} -> {v_r:.{decimals}f} ± {u_r:.{decimals}f}   {format_result(value, u)}")
+
+    rng = np.random.default_rng(0)
+    n = 1_000_000
+    values = 10.0 ** rng.uniform(-5, 6, n) * rng.choice([-1, 1], n)
+    u = np.abs(values) * 10.0 ** rng.uniform(-4, -1, n)
+    start = time.perf_counter()
+    strings = format_results(values, u, "mm")
+    elapsed = time.perf_counter() - start
+    print(f"\n{n:,} 个结果格式化用时 {elapsed:.2f} s ({elapsed / n * 1e9:.0f} ns/个)，例: {strings[0]}, {strings[1]}")
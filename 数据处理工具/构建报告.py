@@ -0,0 +1,239 @@
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# --- 用户输入区 ---
+# 每个学生一个数据根目录，目录结构与本仓库相同 (各实验文件夹下放自己改过数据的脚本)
+# 某个学生目录下缺少的脚本会退回使用仓库中的示例脚本
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+student_roots = {
+    "示例": REPO_ROOT,
+    # "张三": "/path/to/张三的数据",
+}
+
+# 报告输出目录 (每个学生一个子目录)
+output_root = os.path.join(REPO_ROOT, "报告输出")
+
+# 实验节点: (报告小节标题, 脚本相对路径, 脚本生成的图片)
+experiments = [
+    ("牛顿环", "光的干涉/牛顿环.py", []),
+    ("劈尖干涉", "光的干涉/劈尖干涉.py", []),
+    ("铝件密度", "力学基本量/铝件.py", []),
+    ("不规则物体密度", "力学基本量/不规则物理.py", []),
+    ("太阳能电池伏安特性", "太阳能电池/伏安特性制图.py", ["I_U_curve.png", "lnI_U_curve.png"]),
+    ("太阳能电池负载特性", "太阳能电池/负载特性.py", ["load_I_U_curve.png", "load_P_R_curve.png"]),
+    ("比热容比", "热机/计算斜率.py", []),
+    ("角加速度A类不确定度", "转动惯量/求A类不确定度.py", []),
+    ("转动惯量", "转动惯量/求转动惯量.py", []),
+]
+
+# 实验脚本 import 的共用模块 (相对路径，同文件夹或 数据处理工具 中)，这些模块改动时对应节点也要重建
+script_dependencies = {
+    "光的干涉/牛顿环.py": ["数据处理工具/有效数字.py", "数据处理工具/仪器登记.py", "数据处理工具/仪器检定.csv"],
+    "光的干涉/劈尖干涉.py": ["数据处理工具/有效数字.py", "数据处理工具/仪器登记.py", "数据处理工具/仪器检定.csv"],
+    "力学基本量/铝件.py": ["数据处理工具/有效数字.py", "数据处理工具/仪器登记.py", "数据处理工具/仪器检定.csv"],
+    "力学基本量/不规则物理.py": ["数据处理工具/水密度.py", "数据处理工具/仪器登记.py", "数据处理工具/仪器检定.csv"],
+    "太阳能电池/伏安特性制图.py": ["太阳能电池/绘图降采样.py"],
+    "太阳能电池/负载特性.py": ["太阳能电池/绘图降采样.py"],
+    "热机/计算斜率.py": ["数据处理工具/拟合诊断.py", "数据处理工具/实验公式.py", "数据处理工具/合成数据.py",
+                      "数据处理工具/仪器登记.py", "数据处理工具/仪器检定.csv", "数据处理工具/水密度.py"],
+}
+
+max_workers = os.cpu_count() or 4  # 同时运行的实验脚本数
+make_pdf = True                    # 安装了 pandoc 时同时生成 PDF
+# --- END 用户输入区 ---
+
+CACHE_NAME = "构建缓存.json"
+
+
+# --- 辅助函数 ---
+def file_digest(path):
+    """计算文件内容的 SHA-256 (实验数据写在脚本里，脚本内容即该节点的输入)"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def resolve_script(student_root, rel_path):
+    """优先使用学生目录下的脚本，不存在时退回仓库示例脚本"""
+    candidate = os.path.join(student_root, rel_path)
+    if os.path.isfile(candidate):
+        return candidate
+    return os.path.join(REPO_ROOT, rel_path)
+
+
+def node_digest(student_root, rel_path):
+    """节点输入的摘要: 脚本本身，以及它 import 的共用模块 (学生目录中有同名模块时用学生的)"""
+    digest = file_digest(resolve_script(student_root, rel_path))
+    dependencies = script_dependencies.get(rel_path, [])
+    if not dependencies:
+        return digest
+    h = hashlib.sha256(digest.encode())
+    for dep in dependencies:
+        h.update(file_digest(resolve_script(student_root, dep)).encode())
+    return h.hexdigest()
+
+
+def load_cache(student_dir):
+    """读取上次构建记录，记录缺失或损坏时视为全部需要重建"""
+    path = os.path.join(student_dir, CACHE_NAME)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(student_dir, cache):
+    """先写临时文件再替换，避免中途中断留下损坏的缓存"""
+    path = os.path.join(student_dir, CACHE_NAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def node_is_fresh(node_dir, cached, digest, figures):
+    """节点输入未变且输出都在时无需重建"""
+    if not cached or cached.get("digest") != digest:
+        return False
+    if not os.path.isfile(os.path.join(node_dir, "output.txt")):
+        return False
+    return all(os.path.isfile(os.path.join(node_dir, fig)) for fig in figures)
+
+
+def node_search_path(rel_path):
+    """节点脚本的模块搜索路径 (脚本所在目录之后): 学生目录中缺少的共用模块再到仓库中对应的实验文件夹和 数据处理工具 查找"""
+    return [os.path.dirname(os.path.join(REPO_ROOT, rel_path)), os.path.join(REPO_ROOT, "数据处理工具")]
+
+
+def write_output(node_dir, text, returncode, stderr):
+    """把节点的输出写入 output.txt，运行失败时附上错误信息"""
+    if returncode != 0:
+        text += f"\n[脚本运行失败，返回码 {returncode}]\n{stderr}"
+    with open(os.path.join(node_dir, "output.txt"), "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def run_node(script_path, node_dir, rel_path):
+    """在节点自己的输出目录中运行实验脚本 (新开 Python 进程)，图片保存在该目录，输出写入 output.txt"""
+    os.makedirs(node_dir, exist_ok=True)
+    env = dict(os.environ, MPLBACKEND="Agg", PYTHONIOENCODING="utf-8")  # Agg 后端下 plt.show() 不会阻塞
+    # 脚本所在目录在 sys.path 最前面，其后是 node_search_path
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, node_search_path(rel_path) + [os.environ.get("PYTHONPATH")]))
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, script_path], cwd=node_dir, env=env,
+                          capture_output=True, text=True, encoding="utf-8")
+    elapsed = time.perf_counter() - start
+    write_output(node_dir, proc.stdout, proc.returncode, proc.stderr)
+    return proc.returncode, elapsed
+
+
+def render_report(student, student_dir):
+    """按实验顺序把各节点的输出和图片拼成 Markdown 报告"""
+    lines = [f"# 大学物理实验数据处理报告 ({student})", ""]
+    for title, rel_path, figures in experiments:
+        node_dir = os.path.join(student_dir, title)
+        lines.append(f"## {title}")
+        lines.append("")
+        lines.append(f"数据来源: `{rel_path}`")
+        lines.append("")
+        with open(os.path.join(node_dir, "output.txt"), "r", encoding="utf-8") as f:
+            output = f.read().rstrip()
+        lines.append("```")
+        lines.append(output)
+        lines.append("```")
+        lines.append("")
+        for fig in figures:
+            lines.append(f"![{fig}]({title}/{fig})")
+            lines.append("")
+    return "\n".join(lines)
+
+
+def submit_student(student, student_root, pool, runner=run_node, report_root=None):
+    """
+    提交一个学生中输入发生变化的节点，互不依赖的节点在线程池中并行运行。
+
+    runner 为节点的运行方式，默认每个节点新开 Python 进程 (run_node)；
+    监视运行.py 的常驻进程传入在本进程中运行的版本，省去每个节点约 1 s 的启动和导入时间。
+    """
+    student_dir = os.path.join(report_root or output_root, student)
+    os.makedirs(student_dir, exist_ok=True)
+    cache = load_cache(student_dir)
+
+    futures = {}
+    for title, rel_path, figures in experiments:
+        script_path = resolve_script(student_root, rel_path)
+        digest = node_digest(student_root, rel_path)
+        node_dir = os.path.join(student_dir, title)
+        if node_is_fresh(node_dir, cache.get(title), digest, figures):
+            continue
+        futures[title] = (digest, pool.submit(runner, script_path, node_dir, rel_path))
+    return student_dir, cache, futures
+
+
+def finish_student(student, student_dir, cache, futures):
+    """等待该学生的节点完成，只有节点有变化时才重新生成报告；返回重新计算的节点数"""
+    for title, (digest, future) in futures.items():
+        returncode, elapsed = future.result()
+        status = "完成" if returncode == 0 else "失败"
+        print(f"  [{student}] {title}: 重新计算{status} ({elapsed:.2f} s)")
+        # 失败的节点不记录摘要，下次构建会再次尝试
+        cache[title] = {"digest": digest if returncode == 0 else None}
+
+    report_path = os.path.join(student_dir, "report.md")
+    if futures or not os.path.isfile(report_path):
+        report = render_report(student, student_dir)
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write(report)
+        print(f"  [{student}] 报告已更新: {report_path}")
+        if make_pdf:
+            build_pdf(student_dir, report_path)
+    else:
+        print(f"  [{student}] 所有节点均为最新，跳过。")
+
+    save_cache(student_dir, cache)
+    return len(futures)
+
+
+def build(roots, pool, runner=run_node, report_root=None):
+    """构建各学生的报告 (只重跑输入有变化的节点)，返回重新计算的节点总数"""
+    # 先提交所有学生的节点，使不同学生的计算也能并行
+    pending = [(student, *submit_student(student, root, pool, runner, report_root))
+               for student, root in roots.items()]
+    return sum(finish_student(student, student_dir, cache, futures)
+               for student, student_dir, cache, futures in pending)
+
+
+def build_pdf(student_dir, report_path):
+    """调用 pandoc 把 Markdown 报告转为 PDF (未安装 pandoc 时跳过)"""
+    pandoc = shutil.which("pandoc")
+    if pandoc is None:
+        print("  未找到 pandoc，仅生成 Markdown 报告。")
+        return
+    pdf_path = os.path.splitext(report_path)[0] + ".pdf"
+    proc = subprocess.run([pandoc, os.path.basename(report_path), "-o", os.path.basename(pdf_path),
+                           "--pdf-engine=xelatex", "-V", "CJKmainfont=SimSun"],
+                          cwd=student_dir, capture_output=True, text=True)
+    if proc.returncode == 0:
+        print(f"  PDF 已生成: {pdf_path}")
+    else:
+        print(f"  PDF 生成失败: {proc.stderr.strip()}")
+
+
+# --- 主要构建逻辑 ---
+if __name__ == "__main__":
+    if not student_roots:
+        print("错误：student_roots 为空，请至少填写一个学生的数据目录。")
+    else:
+        total_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            build(student_roots, pool)
+        print(f"\n构建完成，用时 {time.perf_counter() - total_start:.2f} s")
@@ -0,0 +1,184 @@
+import csv
+import json
+import os
+import time
+from collections import defaultdict
+
+import numpy as np
+
+import 实验公式
+
+# --- 用户输入区 ---
+# 气压计连续记录 (CSV)，表头为 time,P_Pa[,u_P_Pa]，time 为 ISO 8601 格式 (如 2026-03-02T09:15:00)
+pressure_log_path = "气压记录.csv"
+# 比热容比实验各次测量 (JSON Lines)，每行一次测量:
+# {"run": "A-01", "time": "2026-03-02T09:15:00", "h_mm": [...], "T2_ms2": [...]}
+# 可另外给出 "m"、"A" 覆盖下面的默认值
+runs_path = "热机测量.jsonl"
+output_path = "气压对齐结果.csv"
+
+delta_ins_P = 20.0        # 气压计仪器误差限 (Pa)，记录中没有 u_P_Pa 列或该格为空时 u(P) = Δ_ins / √3
+max_staleness_s = 900     # 实验时间与之前最近一次气压读数的间隔超过此值 (s) 时，视为没有气压数据
+m_default = 0.0485        # 振动物体质量 (kg)
+A_default = 0.00082958    # 活塞面积 (m²)
+u_m = 0.0                 # 质量的标准不确定度 (kg)
+u_A = 0.0                 # 面积的标准不确定度 (m²)
+# --- END 用户输入区 ---
+
+# 每次测量取实验时间之前最近的一次气压读数 (as-of 连接):
+# 气压记录按时间排序后，对所有测量时间一次 np.searchsorted 查出位置，复杂度 O((N + M) log N)。
+# u(P) 包括气压计本身的不确定度，以及该读数到下一次读数之间气压变化带来的不确定度 (按均匀分布 |ΔP|/√3)。
+
+
+# --- 辅助计算函数 ---
+def parse_times(values):
+    """ISO 8601 时间字符串 -> 毫秒时间戳 (int64)"""
+    return np.array(values, dtype="datetime64[ms]").astype(np.int64)
+
+
+def load_pressure_log(path):
+    """
+    读取气压记录，按时间排序。
+
+    Returns:
+        tuple: times (int64 毫秒), P (Pa), u_P (Pa)
+    """
+    with open(path, "r", newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        rows = list(reader)
+    times = parse_times([r["time"] for r in rows])
+    P = np.array([float(r["P_Pa"]) for r in rows])
+    # 没有 u_P_Pa 列或该格为空时，u(P) 按气压计仪器误差限计算
+    default_u_P = delta_ins_P / np.sqrt(3)
+    u_P = np.array([float(r["u_P_Pa"]) if (r.get("u_P_Pa") or "").strip() else default_u_P for r in rows])
+    return sort_log(times, P, u_P)
+
+
+def sort_log(times, P, u_P):
+    """气压记录按时间排序 (已排好序时不复制)"""
+    if len(times) > 1 and np.any(np.diff(times) < 0):
+        order = np.argsort(times, kind="stable")
+        return times[order], P[order], u_P[order]
+    return times, P, u_P
+
+
+def asof_join(log_times, run_times, max_staleness_ms):
+    """
+    对每个测量时间找出之前 (含同一时刻) 最近的一条气压记录。
+
+    Args:
+        log_times (np.ndarray): 已排序的气压记录时间 (毫秒)。
+        run_times (np.ndarray): 测量时间 (毫秒)，顺序任意。
+        max_staleness_ms (float): 允许的最大间隔 (毫秒)。
+
+    Returns:
+        tuple: index (记录下标，无匹配时为 -1), matched (bool 数组)
+    """
+    index = np.searchsorted(log_times, run_times, side="right") - 1
+    matched = index >= 0
+    matched[matched] = run_times[matched] - log_times[index[matched]] <= max_staleness_ms
+    return np.where(matched, index, -1), matched
+
+
+def attach_pressure(log_times, log_P, log_u_P, run_times, max_staleness_ms):
+    """
+    查出每次测量对应的 P 和 u(P)，没有匹配记录的测量为 NaN。
+
+    Returns:
+        tuple: P (Pa), u_P (Pa), log_index
+    """
+    if len(log_times) == 0:
+        missing = np.full(len(run_times), np.nan)
+        return missing, missing.copy(), np.full(len(run_times), -1)
+    index, matched = asof_join(log_times, run_times, max_staleness_ms)
+    safe = np.where(matched, index, 0)
+    next_index = np.minimum(safe + 1, len(log_P) - 1)
+    drift = np.abs(log_P[next_index] - log_P[safe]) / np.sqrt(3)
+    P = np.where(matched, log_P[safe], np.nan)
+    u_P = np.where(matched, np.sqrt(log_u_P[safe]**2 + drift**2), np.nan)
+    return P, u_P, index
+
+
+def compute_gamma(runs, P, u_P):
+    """按数据点数分组，每组一次调用 实验公式.gamma_ratio 向量化计算 γ 和 u(γ)"""
+    gamma = np.full(len(runs), np.nan)
+    u_gamma = np.full(len(runs), np.nan)
+    groups = defaultdict(list)
+    for i, run in enumerate(runs):
+        groups[len(run["h_mm"])].append(i)
+    for members in groups.values():
+        members = np.array(members)
+        subset = [runs[i] for i in members]
+        result = 实验公式.gamma_ratio(
+            np.array([r["h_mm"] for r in subset], dtype=float),
+            np.array([r["T2_ms2"] for r in subset], dtype=float),
+            np.array([r.get("m", m_default) for r in subset], dtype=float),
+            np.array([r.get("A", A_default) for r in subset], dtype=float),
+            P[members], u_P[members], u_m, u_A)
+        gamma[members] = result["gamma"]
+        u_gamma[members] = result["u_gamma"]
+    return gamma, u_gamma
+
+
+def example_data(n_runs=5000, hours=10, seed=0):
+    """没有输入文件时使用的示例: 每秒一次的气压记录和随机时间的测量 (h-T² 数据取自 计算斜率.py)"""
+    rng = np.random.default_rng(seed)
+    start = np.datetime64("2026-03-02T08:00:00", "ms").astype(np.int64)
+    log_times = start + np.arange(hours * 3600) * 1000
+    t_h = (log_times - start) / 3.6e6
+    log_P = 101300 + 250 * np.sin(2 * np.pi * t_h / 12) - 40 * t_h + 3 * rng.standard_normal(len(t_h))
+    log_u_P = np.full(len(log_times), delta_ins_P / np.sqrt(3))
+
+    h = np.array([10, 20, 30, 40, 50, 60], dtype=float)
+    T2 = np.array([334.89, 470.89, 660.49, 745.29, 1024, 1274.49])
+    run_times = np.sort(rng.integers(log_times[0] - 600_000, log_times[-1], n_runs))
+    runs = [{"run": f"示例-{i:05d}",
+             "time": str(np.datetime64(int(t), "ms")),
+             "h_mm": h.tolist(),
+             "T2_ms2": (T2 * (1 + 0.01 * rng.standard_normal(len(T2)))).tolist()}
+            for i, t in enumerate(run_times)]
+    return (log_times, log_P, log_u_P), runs
+
+
+def load_runs(path):
+    """读取 JSON Lines 测量文件，跳过空行"""
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# --- 主要计算逻辑 ---
+if __name__ == "__main__":
+    if os.path.isfile(pressure_log_path) and os.path.isfile(runs_path):
+        log_times, log_P, log_u_P = load_pressure_log(pressure_log_path)
+        runs = load_runs(runs_path)
+    else:
+        print(f"未找到 {pressure_log_path} 或 {runs_path}，使用示例数据。")
+        (log_times, log_P, log_u_P), runs = example_data()
+
+    start = time.perf_counter()
+    run_times = parse_times([r["time"] for r in runs])
+    P, u_P, log_index = attach_pressure(log_times, log_P, log_u_P, run_times, max_staleness_s * 1000)
+    gamma, u_gamma = compute_gamma(runs, P, u_P)
+    elapsed = time.perf_counter() - start
+
+    with open(output_path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        writer.writerow(["run", "time", "pressure_time", "P_Pa", "u_P_Pa", "gamma", "u_gamma"])
+        for run, i, p, up, g, ug in zip(runs, log_index, P, u_P, gamma, u_gamma):
+            pressure_time = str(np.datetime64(int(log_times[i]), "ms")) if i >= 0 else ""
+            writer.writerow([run.get("run", ""), run["time"], pressure_time,
+                             f"{p:.1f}", f"{up:.1f}", f"{g:.4f}", f"{ug:.4f}"])
+
+    matched = ~np.isnan(P)
+    fixed = compute_gamma(runs, np.full(len(runs), float(实验公式.P_ATM)), np.zeros(len(runs)))[0]
+    print("--- 气压对齐结果 ---")
+    print(f"气压记录: {len(log_times):,} 条，测量: {len(runs):,} 次，匹配到气压的测量: {matched.sum():,} 次")
+    if matched.any():
+        print(f"P 范围: {np.nanmin(P):.0f} ~ {np.nanmax(P):.0f} Pa，u(P) 中位数 {np.nanmedian(u_P):.1f} Pa")
+        print(f"γ 平均值: {np.nanmean(gamma):.4f}，u(γ) 中位数: {np.nanmedian(u_gamma):.4f}")
+        print(f"与固定 P = {实验公式.P_ATM} Pa 相比 γ 的最大相对变化: "
+              f"{np.nanmax(np.abs(gamma / fixed - 1)) * 100:.2f}%")
+    if not matched.all():
+        print(f"警告: {(~matched).sum()} 次测量在 {max_staleness_s} s 内没有气压读数，γ 记为 NaN。")
+    print(f"对齐与计算用时: {elapsed * 1000:.1f} ms")
+    print(f"结果已保存到 {output_path}")
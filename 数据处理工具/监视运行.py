@@ -0,0 +1,279 @@
+import contextlib
+import io
+import logging
+import os
+import runpy
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+# 先把各实验脚本用到的库全部导入，之后每次重新运行脚本都不再付出启动和导入的时间
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.font_manager  # noqa: F401
+import matplotlib.pyplot as plt
+import numpy as np
+import scipy.interpolate  # noqa: F401
+import scipy.stats  # noqa: F401
+
+import 构建报告
+from 构建报告 import REPO_ROOT, experiments, file_digest, resolve_script, script_dependencies
+
+# --- 用户输入区 ---
+poll_interval = 0.1     # 检查文件是否改动的间隔 (s)
+settle_time = 0.05      # 文件改动后等待编辑器写完的时间 (s)
+# 额外的数据文件 -> 受影响的脚本 (相对仓库根目录)，实验数据写在脚本里时不需要填写
+extra_dependencies = {
+    # "转动惯量/角加速度.csv": ["转动惯量/求A类不确定度.py"],
+}
+# --- END 用户输入区 ---
+
+# 监视模式: 在一个常驻进程中预先导入 numpy、matplotlib、scipy，轮询各实验脚本 (及额外数据文件) 的修改时间，
+# 某个文件改动且内容确实变化时，只在本进程中重新运行受影响的实验脚本 (runpy)。
+# build 模式按同样的方式增量构建 构建报告.py 的报告: 输入摘要、缓存和报告拼接都与 构建报告.py 相同，
+# 只是有变化的节点在本进程中运行 (run_node_in_process)，不再为每个节点新开 Python 进程。
+# 重新运行的粒度是整个脚本: 实验脚本是自上而下的顶层代码，没有可以单独缓存的中间步骤，
+# 改动哪一行都会从头运行该脚本 (只是不再付出启动和导入的时间)。各脚本的数据都写在开头的用户输入区，
+# 改数据本来就要重算其后的全部步骤；实测 (bench) 常驻进程中重新运行一次: 计算类脚本 1-55 ms，
+# 作图的太阳能电池脚本约 0.45 s，其中大部分是 savefig，只改作图代码时也要从头运行。
+# 用法:
+#   python 监视运行.py              监视 构建报告.py 中列出的全部实验
+#   python 监视运行.py build        监视各学生的数据，改动后立即增量重建报告
+#   python 监视运行.py bench        比较每次新开 Python 进程运行与常驻进程中运行的耗时
+#   python 监视运行.py bench-build  在临时目录中测量改动一个数据后重建报告的用时
+
+
+# --- 辅助函数 ---
+def watched_files():
+    """被监视的文件 -> 改动后需要重新运行的脚本列表 (绝对路径)"""
+    targets = {}
+    for _, rel_path, _ in experiments:
+        path = os.path.join(REPO_ROOT, rel_path)
+        targets.setdefault(path, []).append(path)
+    for rel_script, rel_modules in script_dependencies.items():
+        for rel_module in rel_modules:
+            targets.setdefault(os.path.join(REPO_ROOT, rel_module), []).append(os.path.join(REPO_ROOT, rel_script))
+    for rel_data, rel_scripts in extra_dependencies.items():
+        targets.setdefault(os.path.join(REPO_ROOT, rel_data), []).extend(
+            os.path.join(REPO_ROOT, s) for s in rel_scripts)
+    return targets
+
+
+def file_state(path):
+    """(修改时间, 大小)，文件不存在时为 None"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def run_script(path, quiet=False, work_dir=None, search_path=(), stdout=None, stderr=None):
+    """
+    在本进程中运行实验脚本 (工作目录默认切换到脚本所在目录，与直接运行时相同)。
+
+    Args:
+        path (str): 脚本的绝对路径。
+        quiet (bool): 丢弃脚本的输出。
+        work_dir (str): 可选，运行时的工作目录 (脚本保存的图片在这里)。
+        search_path (list): 可选，排在脚本所在目录之后的模块搜索路径 (相当于 PYTHONPATH)。
+        stdout, stderr: 可选，脚本的输出和错误信息写入的文件对象。
+
+    Returns:
+        tuple: (是否成功, 用时 s)，脚本以 sys.exit("错误信息") 或非零返回码退出时视为失败
+    """
+    cwd = os.getcwd()
+    matplotlib.rcdefaults()  # 上一个脚本改过的字体等设置不影响下一个
+    start = time.perf_counter()
+    ok = True
+    if quiet:
+        stdout = io.StringIO()
+    font_logger = logging.getLogger("matplotlib.font_manager")
+    font_level = font_logger.level
+    if quiet:
+        font_logger.setLevel(logging.ERROR)  # 缺少中文字体时每个字都会记一条日志
+    script_dir = os.path.dirname(path)
+    saved_path, saved_modules = list(sys.path), set(sys.modules)
+    sys.path[:0] = [script_dir, *search_path]  # 与直接运行时相同，脚本可以 import 同文件夹的共用模块
+    err = stderr or sys.stderr
+    try:
+        os.chdir(work_dir or script_dir)
+        with warnings.catch_warnings(), \
+                (contextlib.redirect_stdout(stdout) if stdout else contextlib.nullcontext()), \
+                (contextlib.redirect_stderr(stderr) if stderr else contextlib.nullcontext()):
+            warnings.simplefilter("ignore")  # 缺少中文字体、Agg 不能 show 等警告
+            runpy.run_path(path, run_name="__main__")
+    except SystemExit as exc:
+        # 脚本在输入有误时调用 exit() 或 sys.exit("错误信息")，与直接运行时一样打印信息
+        if isinstance(exc.code, str):
+            print(exc.code, file=err)
+        ok = exc.code in (None, 0)
+    except Exception:
+        ok = False
+        traceback.print_exc(file=err)
+    finally:
+        plt.close("all")
+        font_logger.setLevel(font_level)
+        os.chdir(cwd)
+        sys.path[:] = saved_path  # 脚本自己加入的路径 (如 数据处理工具) 也一并去掉
+        # 脚本导入的仓库内共用模块下次重新导入，改动后立即生效
+        for name in set(sys.modules) - saved_modules:
+            module_file = getattr(sys.modules[name], "__file__", None) or ""
+            if os.path.abspath(module_file).startswith(REPO_ROOT + os.sep):
+                del sys.modules[name]
+    return ok, time.perf_counter() - start
+
+
+def run_node_in_process(script_path, node_dir, rel_path):
+    """与 构建报告.run_node 相同的节点运行方式 (工作目录、模块搜索路径、output.txt)，但在本进程中运行"""
+    os.makedirs(node_dir, exist_ok=True)
+    out, err = io.StringIO(), io.StringIO()
+    ok, elapsed = run_script(script_path, work_dir=node_dir, search_path=构建报告.node_search_path(rel_path),
+                             stdout=out, stderr=err)
+    returncode = 0 if ok else 1
+    构建报告.write_output(node_dir, out.getvalue(), returncode, err.getvalue())
+    return returncode, elapsed
+
+
+def watch():
+    """轮询被监视的文件，内容变化时重新运行受影响的脚本"""
+    targets = watched_files()
+    states = {path: file_state(path) for path in targets}
+    digests = {path: file_digest(path) for path in targets if states[path] is not None}
+    print(f"正在监视 {len(targets)} 个文件 (Ctrl+C 退出)...")
+    while True:
+        time.sleep(poll_interval)
+        changed = [path for path in targets if file_state(path) != states[path]]
+        if not changed:
+            continue
+        time.sleep(settle_time)
+        to_run = []
+        for path in changed:
+            states[path] = file_state(path)
+            if states[path] is None:
+                continue
+            digest = file_digest(path)
+            if digest == digests.get(path):
+                continue  # 只是保存了一次，内容没有变化
+            digests[path] = digest
+            to_run += [s for s in targets[path] if s not in to_run]
+        for script in to_run:
+            print(f"\n=== {os.path.relpath(script, REPO_ROOT)} ({time.strftime('%H:%M:%S')}) ===")
+            ok, seconds = run_script(script)
+            print(f"=== {'完成' if ok else '出错'}，用时 {seconds * 1000:.0f} ms ===")
+
+
+def bench(repeats=3):
+    """每个实验脚本: 新开进程运行 vs 常驻进程中运行"""
+    env = dict(os.environ, MPLBACKEND="Agg")
+    print(f"{'实验':<12} {'新开进程':>10} {'常驻进程':>10}")
+    for title, rel_path, _ in experiments:
+        path = os.path.join(REPO_ROOT, rel_path)
+        cold = min(_timed_subprocess(path, env) for _ in range(repeats))
+        run_script(path, quiet=True)  # 第一次运行会编译字节码、加载字体缓存
+        warm = min(run_script(path, quiet=True)[1] for _ in range(repeats))
+        print(f"{title:<12} {cold * 1000:>8.0f} ms {warm * 1000:>8.0f} ms")
+
+
+def _timed_subprocess(path, env):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, path], cwd=os.path.dirname(path), env=env,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def student_files(roots):
+    """build 模式下监视的文件: 各学生实际使用的实验脚本和共用模块"""
+    files = set()
+    for root in roots.values():
+        for _, rel_path, _ in experiments:
+            files.add(resolve_script(root, rel_path))
+            files.update(resolve_script(root, dep) for dep in script_dependencies.get(rel_path, []))
+    return sorted(files)
+
+
+def rebuild(roots, report_root=None):
+    """在本进程中增量重建报告 (节点依次运行: 工作目录和标准输出是整个进程共用的)，返回 (重建节点数, 用时 s)"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        n_nodes = 构建报告.build(roots, pool, run_node_in_process, report_root)
+    return n_nodes, time.perf_counter() - start
+
+
+def watch_build():
+    """轮询各学生的数据，内容变化时增量重建报告"""
+    roots = 构建报告.student_roots
+    n_nodes, seconds = rebuild(roots)
+    print(f"初次构建: 重新计算 {n_nodes} 个节点，用时 {seconds:.2f} s")
+    files = student_files(roots)
+    states = {path: file_state(path) for path in files}
+    print(f"正在监视 {len(files)} 个文件 (Ctrl+C 退出)...")
+    while True:
+        time.sleep(poll_interval)
+        if all(file_state(path) == states[path] for path in files):
+            continue
+        time.sleep(settle_time)
+        states = {path: file_state(path) for path in files}
+        n_nodes, seconds = rebuild(roots)  # 内容没有变化的节点按摘要跳过
+        if n_nodes:
+            print(f"=== 重新计算 {n_nodes} 个节点，报告重建用时 {seconds * 1000:.0f} ms ===")
+
+
+def bench_build(repeats=5):
+    """在临时目录中复制一份学生数据，改动一个实验的一个读数，比较两种运行方式的报告重建用时"""
+    edits = [("光的干涉/牛顿环.py", "(19.672, 21.961,", "(19.671, 21.961,"),            # 只用 numpy
+             ("太阳能电池/伏安特性制图.py", "[0.443, 0.470,", "[0.444, 0.470,")]   # 用 matplotlib 画图
+    print(f"改动一个读数后重建报告 (共 {len(experiments)} 个节点，make_pdf={构建报告.make_pdf}):")
+    for rel_path, old_text, new_text in edits:
+        with tempfile.TemporaryDirectory() as tmp:
+            student_root, report_root = os.path.join(tmp, "数据"), os.path.join(tmp, "报告")
+            script = os.path.join(student_root, rel_path)
+            os.makedirs(os.path.dirname(script))
+            shutil.copy(os.path.join(REPO_ROOT, rel_path), script)
+            roots = {"测试": student_root}
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                rebuild(roots, report_root)  # 初次构建全部节点
+            with open(script, "r", encoding="utf-8") as f:
+                versions = [f.read()]
+            versions.append(versions[0].replace(old_text, new_text, 1))
+            n_edits = 0
+
+            def edit_and_rebuild(runner, edit=True):
+                nonlocal n_edits
+                n_edits += edit
+                with open(script, "w", encoding="utf-8") as f:
+                    f.write(versions[n_edits % 2])
+                with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), \
+                        ThreadPoolExecutor(max_workers=1) as pool:
+                    start = time.perf_counter()
+                    n_nodes = 构建报告.build(roots, pool, runner, report_root)
+                    return n_nodes, time.perf_counter() - start
+
+            print(f"  {rel_path}:")
+            for name, runner in (("新开进程", 构建报告.run_node), ("常驻进程", run_node_in_process)):
+                runs = [edit_and_rebuild(runner) for _ in range(repeats)]
+                times = [seconds for _, seconds in runs]
+                print(f"    {name}: 每次重新计算 {runs[-1][0]} 个节点，"
+                      f"最短 {min(times) * 1000:.0f} ms，中位数 {np.median(times) * 1000:.0f} ms")
+            _, unchanged = edit_and_rebuild(run_node_in_process, edit=False)
+            print(f"    输入没有变化时: {unchanged * 1000:.1f} ms (只计算摘要)")
+
+
+if __name__ == "__main__":
+    try:
+        mode = sys.argv[1] if len(sys.argv) > 1 else ""
+        if mode == "bench":
+            bench()
+        elif mode == "build":
+            watch_build()
+        elif mode == "bench-build":
+            bench_build()
+        else:
+            watch()
+    except KeyboardInterrupt:
+        pass
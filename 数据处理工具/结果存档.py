@@ -0,0 +1,443 @@
+import datetime
+import json
+import os
+import sqlite3
+import tempfile
+import time
+
+import numpy as np
+
+# 历次实验结果的本地存档:
+# - 明细存放在 SQLite 数据库 (一个文件，无需服务器)，对实验、日期、仪器、学生建索引，
+#   按学生或仪器查历史记录走索引；
+# - 统计查询 (分布、各仪器随时间的漂移、离群率) 使用从数据库导出的列式缓存: 数值列存为 .npy，
+#   文字列 (实验、物理量、仪器、学生) 编码成整数后同样存为 .npy，查询时以内存映射方式打开。
+#   缓存按 (实验, 物理量, 日期) 排序，某实验某物理量 (及日期范围) 的记录是一段连续切片，
+#   用 np.searchsorted 定位后再以 NumPy 和 np.bincount 统计，几百万条记录也只需几毫秒。
+# 缓存按数据库中最大的 id 判断是否过期，下次查询时只从数据库读取新记录。新记录排好序后写成一个
+# 小的"增量段" (同样按排序键有序的一组 .npy)，不改动主缓存，追加的代价只与新记录数成正比；
+# 查询时在主缓存和每个增量段中分别 searchsorted，再把各段的切片拼起来统计。
+# 增量段多于 MAX_SEGMENTS 个时先把各增量段合并成一个 (只涉及增量段中的记录)；增量段的记录
+# 总数超过主缓存的 MERGE_FRACTION 时才并入主缓存 (一次 O(N) 的合并，摊到每条新记录上是常数)，
+# 也可以调用 compact() 主动合并。实测 (示例，2,000,000 条记录): 追加一条约 20 ms，主要是读写
+# 编码表，与存档大小无关；并入主缓存 (np.insert 整列重写) 约 0.1 s，随记录数线性增长
+# (4,000,000 条约 0.2 s)，若每次追加都并入主缓存，每条新记录都要付出这一代价。
+# 各段文件名带编号，meta.json 记录当前有效的文件 (写完新文件后才替换 meta.json，再删除旧文件)，
+# 查询进程不会看到合并了一半的缓存。
+# 排序键 group = 实验编码 << QUANTITY_BITS | 物理量编码 与编码表的大小无关 (编码只增不改)，
+# 新增实验或物理量时原有记录的位置不变。
+
+# --- 常量定义 ---
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    experiment TEXT NOT NULL,
+    quantity TEXT NOT NULL,
+    value REAL NOT NULL,
+    uncertainty REAL,
+    unit TEXT,
+    student TEXT,
+    instrument TEXT,
+    measured_on TEXT NOT NULL,   -- YYYY-MM-DD
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_results_experiment ON results (experiment, quantity, measured_on);
+CREATE INDEX IF NOT EXISTS idx_results_date ON results (measured_on);
+CREATE INDEX IF NOT EXISTS idx_results_instrument ON results (instrument, measured_on);
+CREATE INDEX IF NOT EXISTS idx_results_student ON results (student, experiment);
+"""
+CODED_COLUMNS = ("experiment", "quantity", "instrument", "student")
+NUMERIC_COLUMNS = ("value", "uncertainty")
+EPOCH = datetime.date(1970, 1, 1)
+QUANTITY_BITS = 20        # group 中物理量编码所占的位数
+DAY_BITS = 24             # 排序键中日期 (加 DAY_OFFSET 后) 所占的位数
+DAY_OFFSET = 1 << 23      # 日期可以早于 1970 年
+CACHE_LAYOUT = 3          # 列式缓存格式版本，与 meta.json 中不同时重新导出
+MAX_SEGMENTS = 8          # 增量段多于此数时合并成一个增量段
+MERGE_FRACTION = 0.05     # 增量段记录总数超过主缓存的这一比例时并入主缓存
+CACHE_ARRAYS = CODED_COLUMNS + NUMERIC_COLUMNS + ("day", "group")
+
+
+# --- 辅助函数 ---
+def to_day(date_text):
+    """'YYYY-MM-DD' -> 距 1970-01-01 的天数"""
+    return (datetime.date.fromisoformat(date_text) - EPOCH).days
+
+
+def group_key(experiment_code, quantity_code):
+    """(实验, 物理量) 的编码 -> 列式缓存中的 group"""
+    return (np.asarray(experiment_code, dtype=np.int64) << QUANTITY_BITS) | np.asarray(quantity_code, dtype=np.int64)
+
+
+def _sort_key(group, day):
+    """列式缓存的排序键: 先按 group，再按日期"""
+    return (np.asarray(group, dtype=np.int64) << DAY_BITS) | (np.asarray(day, dtype=np.int64) + DAY_OFFSET)
+
+
+def _save_npy(path, array):
+    """先写临时文件再改名，查询进程不会读到写了一半的缓存"""
+    tmp_path = path + ".tmp.npy"
+    np.save(tmp_path, array)
+    os.replace(tmp_path, path)
+
+
+class ResultArchive:
+    """
+    结果存档。
+
+    例:
+        archive = ResultArchive("结果存档.sqlite")
+        archive.record("newton_ring", {"R": 1062.35}, {"R": 6.69}, student="2023001",
+                       instrument="reading_microscope#3", measured_on="2026-03-02", units={"R": "mm"})
+        archive.distribution("newton_ring", "R")
+    """
+
+    def __init__(self, path, cache_dir=None):
+        self.path = path
+        self.cache_dir = cache_dir or os.path.splitext(path)[0] + "_列缓存"
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")     # 写入时不阻塞其他进程的查询
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA cache_size=-131072")   # 128 MB 页缓存，批量写入时索引更新少读写磁盘
+        self.conn.executescript(SCHEMA)
+        self._columns = None
+
+    def close(self):
+        self.conn.close()
+
+    # --- 写入 ---
+    def insert_many(self, rows):
+        """
+        批量写入 (一个事务)。
+
+        Args:
+            rows (iterable): 每项为 (experiment, quantity, value, uncertainty, unit,
+                             student, instrument, measured_on, source)。
+
+        Returns:
+            int: 写入的记录数
+        """
+        with self.conn:
+            cursor = self.conn.executemany(
+                "INSERT INTO results (experiment, quantity, value, uncertainty, unit, student, instrument,"
+                " measured_on, source) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return cursor.rowcount
+
+    def record(self, experiment, values, uncertainties=None, student=None, instrument=None,
+               measured_on=None, units=None, source=None):
+        """写入一次实验的结果，values / uncertainties / units 为 物理量 -> 数值 的 dict"""
+        uncertainties = uncertainties or {}
+        units = units or {}
+        measured_on = measured_on or datetime.date.today().isoformat()
+        return self.insert_many(
+            (experiment, q, float(v), None if uncertainties.get(q) is None else float(uncertainties[q]),
+             units.get(q), student, instrument, measured_on, source)
+            for q, v in values.items())
+
+    # --- 按索引查询明细 ---
+    def history(self, student=None, instrument=None, experiment=None, limit=1000):
+        """按学生 / 仪器 / 实验查询明细 (走索引)"""
+        conditions, params = [], []
+        for column, value in (("student", student), ("instrument", instrument), ("experiment", experiment)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self.conn.execute(
+            f"SELECT experiment, quantity, value, uncertainty, unit, student, instrument, measured_on"
+            f" FROM results {where} ORDER BY measured_on LIMIT ?", params + [limit]).fetchall()
+
+    # --- 列式缓存 ---
+    def _load_meta(self):
+        meta_path = os.path.join(self.cache_dir, "meta.json")
+        if os.path.isfile(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("layout") == CACHE_LAYOUT:
+                return meta
+        return {"layout": CACHE_LAYOUT, "max_id": 0, "codes": {c: [] for c in CODED_COLUMNS},
+                "main": None, "segments": [], "next_file": 0}
+
+    def _load_part(self, part, mmap_mode="r"):
+        """读出一段缓存 (主缓存或增量段) 的各列"""
+        return {n: np.load(os.path.join(self.cache_dir, f"{part['file']}_{n}.npy"), mmap_mode=mmap_mode)
+                for n in CACHE_ARRAYS}
+
+    def _write_part(self, meta, arrays):
+        """把已排序的各列写成一段新的缓存文件，返回 meta 中记录该段的 dict"""
+        part = {"file": f"part{meta['next_file']}", "n_rows": len(arrays["group"])}
+        meta["next_file"] += 1
+        for n in CACHE_ARRAYS:
+            _save_npy(os.path.join(self.cache_dir, f"{part['file']}_{n}.npy"), arrays[n])
+        return part
+
+    def _save_meta(self, meta):
+        """替换 meta.json (新的各段文件此前已写完)，再删除不再使用的段文件"""
+        tmp_meta = os.path.join(self.cache_dir, "meta.json.tmp")
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            f.write(json.dumps(meta, ensure_ascii=False))   # 一次编码，比 json.dump 逐段写入快得多
+        os.replace(tmp_meta, os.path.join(self.cache_dir, "meta.json"))
+        live = {p["file"] for p in [meta["main"]] + meta["segments"] if p}
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".npy") and name.split("_", 1)[0] not in live:
+                os.remove(os.path.join(self.cache_dir, name))
+        self._columns = None
+
+    def _merge_segments(self, meta, into_main):
+        """各增量段合并成一段；into_main 时再按插入位置并入主缓存"""
+        segments = [self._load_part(p) for p in meta["segments"]]
+        merged = {n: np.concatenate([s[n] for s in segments]) for n in CACHE_ARRAYS}
+        order = np.argsort(_sort_key(merged["group"], merged["day"]), kind="stable")
+        merged = {n: a[order] for n, a in merged.items()}
+        if into_main and meta["main"]:
+            # 主缓存已排序: 只需查出各新记录的插入位置 (相同键的新记录排在原记录之后)
+            main = self._load_part(meta["main"])
+            positions = np.searchsorted(_sort_key(main["group"], main["day"]),
+                                        _sort_key(merged["group"], merged["day"]), side="right")
+            merged = {n: np.insert(main[n], positions, merged[n]) for n in CACHE_ARRAYS}
+            del main
+        if into_main:
+            meta["main"] = self._write_part(meta, merged)
+            meta["segments"] = []
+        else:
+            meta["segments"] = [self._write_part(meta, merged)]
+
+    def refresh_columns(self, batch_size=500_000):
+        """把数据库中比缓存新的记录写成一个增量段 (缓存不存在或格式过旧时全部导出为主缓存)"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        meta = self._load_meta()
+        (max_id,) = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM results").fetchone()
+        if max_id == meta["max_id"]:
+            return False
+        lookups = {c: dict(zip(meta["codes"][c], range(len(meta["codes"][c])))) for c in CODED_COLUMNS}
+
+        parts = {c: [] for c in CODED_COLUMNS + NUMERIC_COLUMNS + ("day",)}
+        cursor = self.conn.execute(
+            "SELECT id, experiment, quantity, instrument, student, value, uncertainty, measured_on"
+            " FROM results WHERE id > ? ORDER BY id", (meta["max_id"],))
+        day_cache = {}
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            columns = list(zip(*rows))
+            for j, c in enumerate(CODED_COLUMNS):
+                lookup = lookups[c]
+                parts[c].append(np.fromiter((lookup.setdefault(v or "", len(lookup)) for v in columns[1 + j]),
+                                            dtype=np.int32, count=len(rows)))
+            parts["value"].append(np.array(columns[5], dtype=float))
+            parts["uncertainty"].append(np.array([np.nan if u is None else u for u in columns[6]], dtype=float))
+            parts["day"].append(np.fromiter(
+                (day_cache[d] if d in day_cache else day_cache.setdefault(d, to_day(d)) for d in columns[7]),
+                dtype=np.int32, count=len(rows)))
+
+        # 新记录按 (实验, 物理量, 日期) 排序，使每个实验的每个物理量占一段连续区间
+        new = {name: np.concatenate(new_parts) for name, new_parts in parts.items()}
+        new["group"] = group_key(new["experiment"], new["quantity"])
+        order = np.argsort(_sort_key(new["group"], new["day"]), kind="stable")
+        new = {name: array[order] for name, array in new.items()}
+        if meta["main"] is None:
+            meta["main"] = self._write_part(meta, new)
+        else:
+            meta["segments"].append(self._write_part(meta, new))
+            n_main = meta["main"]["n_rows"]
+            if sum(p["n_rows"] for p in meta["segments"]) > MERGE_FRACTION * n_main:
+                self._merge_segments(meta, into_main=True)
+            elif len(meta["segments"]) > MAX_SEGMENTS:
+                self._merge_segments(meta, into_main=False)
+        meta["codes"] = {c: list(lookups[c]) for c in CODED_COLUMNS}   # dict 按插入顺序，即编码顺序
+        meta["max_id"] = max_id
+        self._save_meta(meta)
+        return True
+
+    def compact(self):
+        """把所有增量段并入主缓存 (例如在夜间或批量导入之后调用)"""
+        self.refresh_columns()
+        meta = self._load_meta()
+        if not meta["segments"]:
+            return False
+        self._merge_segments(meta, into_main=True)
+        self._save_meta(meta)
+        return True
+
+    def columns(self):
+        """以内存映射方式打开列式缓存 (必要时先刷新)，返回 (主缓存和各增量段的列 dict 列表, 编码表 dict)"""
+        if self.refresh_columns() or self._columns is None:
+            meta = self._load_meta()
+            parts = [self._load_part(p) for p in [meta["main"]] + meta["segments"] if p]
+            self._columns = (parts, meta["codes"])
+        return self._columns
+
+    def _select(self, experiment, quantity, names, since=None, until=None):
+        """
+        某实验某物理量 (及日期范围) 的记录: 在主缓存和各增量段中分别定位切片后拼接。
+
+        Returns:
+            tuple: ({列名: 数组}, 编码表)，只有一段有记录时数组是内存映射的切片，不复制
+        """
+        parts, codes = self.columns()
+        if experiment not in codes["experiment"] or quantity not in codes["quantity"]:
+            return {n: np.empty(0) for n in names}, codes
+        key = int(group_key(codes["experiment"].index(experiment), codes["quantity"].index(quantity)))
+        pieces = []
+        for cols in parts:
+            start = int(np.searchsorted(cols["group"], key, side="left"))
+            stop = int(np.searchsorted(cols["group"], key, side="right"))
+            days = cols["day"][start:stop]
+            if since is not None:
+                start, stop = start + int(np.searchsorted(days, to_day(since), side="left")), stop
+                days = cols["day"][start:stop]
+            if until is not None:
+                stop = start + int(np.searchsorted(days, to_day(until), side="right"))
+            if stop > start:
+                pieces.append({n: cols[n][start:stop] for n in names})
+        if len(pieces) == 1:
+            return pieces[0], codes
+        if not pieces:
+            return {n: np.empty(0) for n in names}, codes
+        return {n: np.concatenate([p[n] for p in pieces]) for n in names}, codes
+
+    # --- 统计查询 ---
+    def distribution(self, experiment, quantity, since=None, until=None, bins=40):
+        """
+        数值分布。
+
+        Returns:
+            dict: n, mean, std, percentiles (5/25/50/75/95), hist (计数), edges
+        """
+        cols, _ = self._select(experiment, quantity, ("value",), since, until)
+        values = cols["value"]
+        if len(values) == 0:
+            return {"n": 0}
+        hist, edges = np.histogram(values, bins=bins)
+        return {"n": len(values), "mean": float(values.mean()), "std": float(values.std(ddof=1)) if len(values) > 1 else 0.0,
+                "percentiles": dict(zip((5, 25, 50, 75, 95), np.percentile(values, [5, 25, 50, 75, 95]).tolist())),
+                "hist": hist, "edges": edges}
+
+    def instrument_drift(self, experiment, quantity, period_days=30, min_count=5):
+        """
+        各仪器按时间段 (默认30天) 的平均值，用于发现仪器随时间的漂移。
+
+        Returns:
+            dict: 仪器名 -> [(时间段起始日期, 平均值, 记录数), ...]
+        """
+        cols, codes = self._select(experiment, quantity, ("instrument", "day", "value"))
+        if len(cols["value"]) == 0:
+            return {}
+        instrument = cols["instrument"].astype(np.int64)
+        period = (cols["day"] // period_days).astype(np.int64)
+        first_period = period.min()
+        n_periods = period.max() - first_period + 1
+        key = instrument * n_periods + (period - first_period)
+        size = len(codes["instrument"]) * n_periods
+        counts = np.bincount(key, minlength=size)
+        sums = np.bincount(key, weights=cols["value"], minlength=size)
+        drift = {}
+        for k in np.flatnonzero(counts >= min_count):
+            name = codes["instrument"][k // n_periods]
+            start = EPOCH + datetime.timedelta(days=int((first_period + k % n_periods) * period_days))
+            drift.setdefault(name, []).append((start.isoformat(), sums[k] / counts[k], int(counts[k])))
+        return drift
+
+    def outlier_rate(self, experiment, quantity, k=3.0, by="instrument"):
+        """
+        离群率: |x - 中位数| > k · 1.4826 · MAD 的比例，按 by (instrument 或 student) 分组。
+
+        Returns:
+            tuple: overall_rate, {组名: (离群率, 记录数)}
+        """
+        cols, codes = self._select(experiment, quantity, ("value", by))
+        values = cols["value"]
+        if len(values) == 0:
+            return float("nan"), {}
+        median = np.median(values)
+        scale = 1.4826 * np.median(np.abs(values - median))
+        outlier = np.abs(values - median) > k * scale
+        group = cols[by]
+        counts = np.bincount(group, minlength=len(codes[by]))
+        hits = np.bincount(group, weights=outlier, minlength=len(codes[by]))
+        per_group = {codes[by][g]: (hits[g] / counts[g], int(counts[g])) for g in np.flatnonzero(counts)}
+        return float(outlier.mean()), per_group
+
+
+# --- 示例: 写入几百万条模拟的历年结果并计时查询 ---
+if __name__ == "__main__":
+    n_rows = 2_000_000
+    rng = np.random.default_rng(0)
+    experiments = [("newton_ring", "R", "mm", 1062.0, 7.0, "reading_microscope"),
+                   ("wedge", "D", "mm", 0.0340, 0.0004, "reading_microscope"),
+                   ("solar_cell_fit", "Is", "mA", 0.45, 0.02, "ammeter"),
+                   ("gamma", "gamma", "", 1.30, 0.08, "photogate"),
+                   ("moment_of_inertia", "moment_of_inertia", "kg·m²", 2.25e-3, 4e-5, "photogate")]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = ResultArchive(os.path.join(tmp, "结果存档.sqlite"))
+        # 各列先用 NumPy 生成，再逐行组合写入
+        which = rng.integers(0, len(experiments), n_rows)
+        instrument_no = rng.integers(1, 13, n_rows)
+        days = rng.integers(to_day("2021-09-01"), to_day("2026-07-01"), n_rows)
+        true = np.array([e[3] for e in experiments])[which]
+        u = np.array([e[4] for e in experiments])[which]
+        scale = np.where(rng.random(n_rows) < 0.01, 8.0, 1.0)  # 约1%的离群结果
+        # 7号读数显微镜逐年漂移，用来演示漂移查询
+        drifting = np.isin(which, [0, 1]) & (instrument_no == 7)
+        drift = np.where(drifting, 0.004 * true * (days - days.min()) / 365, 0.0)
+        values = true + drift + u * scale * rng.standard_normal(n_rows)
+        date_text = {d: (EPOCH + datetime.timedelta(days=int(d))).isoformat() for d in np.unique(days)}
+        names = [e[:3] for e in experiments]
+        kinds = [e[5] for e in experiments]
+        rows = ((*names[w], v, uu, f"S{i % 40000:05d}", f"{kinds[w]}#{k}", date_text[d], "示例")
+                for i, (w, v, uu, k, d) in enumerate(zip(which.tolist(), values.tolist(), u.tolist(),
+                                                         instrument_no.tolist(), days.tolist())))
+        start = time.perf_counter()
+        archive.insert_many((e, q, v, uu, unit, st, ins, d, src) for e, q, unit, v, uu, st, ins, d, src in rows)
+        print(f"--- 结果存档 ({n_rows:,} 条模拟记录) ---")
+        print(f"写入用时: {time.perf_counter() - start:.1f} s")
+        start = time.perf_counter()
+        archive.columns()
+        print(f"首次导出列式缓存: {time.perf_counter() - start:.1f} s")
+
+        def timed(label, func, *args, **kwargs):
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            print(f"{label}: {(time.perf_counter() - start) * 1000:.1f} ms")
+            return result
+
+        dist = timed("\n牛顿环 R 的分布", archive.distribution, "newton_ring", "R")
+        print(f"  n = {dist['n']:,}, 平均值 {dist['mean']:.2f} mm, 中位数 {dist['percentiles'][50]:.2f} mm")
+        dist = timed("本学期 (2026-02-20 起) 牛顿环 R 的分布", archive.distribution, "newton_ring", "R",
+                     since="2026-02-20")
+        print(f"  n = {dist['n']:,}, 平均值 {dist['mean']:.2f} mm")
+        drift = timed("各读数显微镜按学期的 R 平均值", archive.instrument_drift, "newton_ring", "R", period_days=182)
+        for name in ("reading_microscope#1", "reading_microscope#7"):
+            print(f"  {name}: " + ", ".join(f"{d[0][:7]} {d[1]:.1f}" for d in drift.get(name, [])))
+        rate, per_instrument = timed("太阳能电池 Is 的离群率", archive.outlier_rate, "solar_cell_fit", "Is")
+        print(f"  总体 {rate * 100:.2f}%，最高的仪器 "
+              f"{max(per_instrument, key=lambda g: per_instrument[g][0])}")
+        records = timed("\n按学生查历史记录 (索引)", archive.history, student="S01234")
+        print(f"  S01234 共 {len(records)} 条记录")
+        archive.record("newton_ring", {"R": 1062.35}, {"R": 6.69}, student="S01234",
+                       instrument="reading_microscope#3", measured_on="2026-03-02", units={"R": "mm"})
+        timed("写入一条新记录后重新查询 (写成增量段)", archive.distribution, "newton_ring", "R")
+
+        # 逐条追加: 每次只写一个小的增量段，多于 MAX_SEGMENTS 个时合并增量段，主缓存不动
+        append_ms, query_ms = [], []
+        for i in range(3 * MAX_SEGMENTS):
+            archive.record("newton_ring", {"R": 1060.0 + i}, {"R": 7.0}, student="S01234",
+                           instrument="reading_microscope#3", measured_on="2026-03-09", units={"R": "mm"})
+            start = time.perf_counter()
+            archive.refresh_columns()
+            append_ms.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            dist = archive.distribution("newton_ring", "R")
+            query_ms.append((time.perf_counter() - start) * 1000)
+        print(f"逐条追加 {len(append_ms)} 次: 更新缓存中位数 {np.median(append_ms):.1f} ms (最长 {max(append_ms):.1f} ms)，"
+              f"带增量段查询 R 的分布中位数 {np.median(query_ms):.1f} ms，"
+              f"当前 {len(archive._load_meta()['segments'])} 个增量段")
+        n_before = dist["n"]
+        timed("增量段并入主缓存 (compact, 整列重写一次)", archive.compact)
+        dist = archive.distribution("newton_ring", "R")
+        assert dist["n"] == n_before and not archive._load_meta()["segments"]
+        print(f"  合并前后牛顿环 R 的记录数一致: {dist['n']:,}")
+        archive.close()
+    print("\n计算完成！")
@@ -0,0 +1,231 @@
+import itertools
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+from scipy import special, stats
+
+# 小样本A类不确定度的自助法 (bootstrap) / 刀切法 (jackknife) 估计:
+# 各实验只有 5-7 次重复测量，s/√n 给出的区间并不可靠。这里对平均值给出
+#   - 经典结果: u_A = s/√n 及 t 分布区间；
+#   - 刀切法标准误差 (对平均值与 s/√n 相同，作为核对)；
+#   - 自助法标准误差、百分位区间和 BCa 区间。
+# n 不超过 exact_max_n 时枚举全部 C(2n-1, n) 种重抽样结果 (按多项分布概率加权)，没有随机误差；
+# n 更大时随机重抽样: 同一计算块内的各组数据共用一套重抽样方案 (各数据被抽中的次数矩阵)，
+# 所有组的自助平均值由一次矩阵乘法得到。每个计算块的随机种子由 np.random.SeedSequence(seed).spawn 派生，
+# 与进程数和调度顺序无关，结果可以复现。
+# 每组数据的自助分布有 K 个值 (精确枚举时 K = C(2n-1, n)，n = 8 时 6435)，计算块的组数按
+# m·K 不超过 MAX_CHUNK_ELEMENTS 选取，内存占用与数据组数和 n 无关。
+
+# --- 常量定义 ---
+EXACT_MAX_N = 8           # n <= 8 时精确枚举 (n = 8 时 6435 种)
+N_RESAMPLES = 2000        # 随机重抽样次数
+MAX_CHUNK_ELEMENTS = 2_000_000  # 每个计算块自助分布数组 (m, K) 的元素数上限 (float64 约 16 MB)
+
+
+# --- 辅助计算函数 ---
+@lru_cache(maxsize=None)
+def multiset_counts(n):
+    """
+    n 个数据有放回抽 n 次的全部结果 (不计顺序)。
+
+    Returns:
+        tuple: counts (形状 (K, n)，每行为各数据被抽中的次数), weights (形状 (K,)，各结果的概率)
+    """
+    rows = []
+    for bars in itertools.combinations(range(2 * n - 1), n - 1):  # 隔板法
+        edges = (-1,) + bars + (2 * n - 1,)
+        rows.append([edges[i + 1] - edges[i] - 1 for i in range(n)])
+    counts = np.array(rows, dtype=float)
+    log_w = special.gammaln(n + 1) - special.gammaln(counts + 1).sum(axis=1) - n * np.log(n)
+    return counts, np.exp(log_w)
+
+
+def bootstrap_means(x, n_resamples, rng, exact_max_n=EXACT_MAX_N):
+    """
+    各组平均值的自助分布 (已排序) 及累积概率。
+
+    Args:
+        x (np.ndarray): 形状 (m, n)，m 组数据。
+
+    Returns:
+        tuple: values (m, K) 从小到大排序, cum_weights (m, K), exact (bool)
+    """
+    n = x.shape[1]
+    if n <= exact_max_n:
+        counts, weights = multiset_counts(n)
+        values = x @ (counts.T / n)
+        # 权重按排序后的顺序取出并原地累加，values 原地排序，不保留排序前的副本
+        order = np.argsort(values, axis=1)
+        cum_weights = weights[order]
+        del order
+        np.cumsum(cum_weights, axis=1, out=cum_weights)
+        values.sort(axis=1)
+        return values, cum_weights, True
+    counts = rng.multinomial(n, np.full(n, 1.0 / n), size=n_resamples)
+    values = x @ (counts.T / n)
+    values.sort(axis=1)
+    cum_weights = np.broadcast_to(np.arange(1, n_resamples + 1) / n_resamples, values.shape)
+    return values, cum_weights, False
+
+
+def weighted_quantile(values, cum_weights, q):
+    """按行取分位数 (累积概率首次达到 q 的值)，q 可以按行不同"""
+    q = np.broadcast_to(np.asarray(q, dtype=float), (values.shape[0],))
+    idx = (cum_weights < q[:, None] - 1e-12).sum(axis=1)
+    idx = np.minimum(idx, values.shape[1] - 1)
+    return values[np.arange(values.shape[0]), idx]
+
+
+def bootstrap_group(x, confidence=0.95, n_resamples=N_RESAMPLES, exact_max_n=EXACT_MAX_N, seed_seq=None):
+    """
+    一组等长数据 (形状 (m, n)) 的各种不确定度估计。
+
+    Returns:
+        dict: mean, u_A, t_low, t_high, u_jack, u_boot,
+              pct_low, pct_high, bca_low, bca_high, exact
+    """
+    x = np.asarray(x, dtype=float)
+    m, n = x.shape
+    rng = np.random.default_rng(seed_seq)
+    alpha = (1 - confidence) / 2
+
+    mean = x.mean(axis=1)
+    u_A = x.std(axis=1, ddof=1) / np.sqrt(n)
+    t_half = stats.t.ppf(1 - alpha, n - 1) * u_A
+
+    # 刀切法: 去掉第 i 个数据后的平均值
+    jack = (x.sum(axis=1, keepdims=True) - x) / (n - 1)
+    d = jack.mean(axis=1, keepdims=True) - jack
+    u_jack = np.sqrt((n - 1) / n * (d**2).sum(axis=1))
+
+    values, cum_weights, exact = bootstrap_means(x, n_resamples, rng, exact_max_n)
+    if exact:
+        # 精确自助分布的平均值标准差有解析式 sqrt((n-1)/n) s/√n
+        u_boot = np.sqrt((n - 1) / n) * u_A
+    else:
+        u_boot = values.std(axis=1, ddof=1)
+
+    pct_low = weighted_quantile(values, cum_weights, alpha)
+    pct_high = weighted_quantile(values, cum_weights, 1 - alpha)
+
+    # BCa: 偏差修正 z0 (来自自助分布) 和加速因子 a (来自刀切法)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # 每行已排序，小于 (或不大于) 平均值的个数即累积概率的下标；与平均值相等的部分各算一半
+        tol = 1e-12 * np.abs(mean)[:, None]
+        rows = np.arange(m)
+        n_below = (values < mean[:, None] - tol).sum(axis=1)
+        n_not_above = (values <= mean[:, None] + tol).sum(axis=1)
+        p_below = np.where(n_below > 0, cum_weights[rows, np.maximum(n_below - 1, 0)], 0.0)
+        p_not_above = np.where(n_not_above > 0, cum_weights[rows, np.maximum(n_not_above - 1, 0)], 0.0)
+        z0 = special.ndtri(np.clip(0.5 * (p_below + p_not_above), 1e-10, 1 - 1e-10))
+        a = (d**3).sum(axis=1) / (6 * ((d**2).sum(axis=1))**1.5)
+        a = np.where(np.isfinite(a), a, 0.0)
+        bounds = []
+        for z_alpha in (special.ndtri(alpha), special.ndtri(1 - alpha)):
+            q = special.ndtr(z0 + (z0 + z_alpha) / (1 - a * (z0 + z_alpha)))
+            bounds.append(weighted_quantile(values, cum_weights, q))
+
+    return {"mean": mean, "u_A": u_A, "t_low": mean - t_half, "t_high": mean + t_half,
+            "u_jack": u_jack, "u_boot": u_boot, "pct_low": pct_low, "pct_high": pct_high,
+            "bca_low": bounds[0], "bca_high": bounds[1], "exact": np.full(m, exact)}
+
+
+def _run_task(args):
+    """进程池任务: (数据块, 参数, 种子)"""
+    x, kwargs, seed_seq = args
+    return bootstrap_group(x, seed_seq=seed_seq, **kwargs)
+
+
+def resample_count(n, n_resamples=N_RESAMPLES, exact_max_n=EXACT_MAX_N):
+    """长度为 n 的一组数据的自助分布中值的个数 K"""
+    return special.comb(2 * n - 1, n, exact=True) if n <= exact_max_n else n_resamples
+
+
+def bootstrap_uncertainty(datasets, confidence=0.95, n_resamples=N_RESAMPLES, exact_max_n=EXACT_MAX_N,
+                          seed=0, max_workers=None, chunk_size=None, max_elements=MAX_CHUNK_ELEMENTS):
+    """
+    批量计算多组重复测量的平均值不确定度 (各组长度可以不同)。
+
+    Args:
+        datasets (list or np.ndarray): 每组一维测量数据，或形状 (m, n) 的数组。
+        confidence (float): 区间的置信水平。
+        seed (int): 随机种子，相同种子、相同数据的结果相同 (与 max_workers 无关)。
+        max_workers (int): 进程数，None 或 1 时在本进程计算。
+        chunk_size (int): 每个任务的数据组数，None 时按 max_elements // K 选取。
+        max_elements (int): 每个任务的自助分布数组 (组数 × K) 的元素数上限。
+
+    Returns:
+        dict: 与 bootstrap_group 相同的键，每个值为按输入顺序排列的数组
+    """
+    groups = defaultdict(list)
+    for i, d in enumerate(datasets):
+        groups[len(d)].append(i)
+    if any(n < 2 for n in groups):
+        raise ValueError("每组至少需要2个数据")
+
+    kwargs = {"confidence": confidence, "n_resamples": n_resamples, "exact_max_n": exact_max_n}
+    tasks, positions = [], []
+    for n in sorted(groups):
+        members = np.array(groups[n])
+        chunk = max(1, max_elements // resample_count(n, n_resamples, exact_max_n))
+        if chunk_size is not None:
+            chunk = min(chunk, chunk_size)
+        for start in range(0, len(members), chunk):
+            index = members[start:start + chunk]
+            tasks.append(np.array([datasets[i] for i in index], dtype=float))
+            positions.append(index)
+    seeds = np.random.SeedSequence(seed).spawn(len(tasks))
+    jobs = [(x, kwargs, s) for x, s in zip(tasks, seeds)]
+
+    if max_workers is None or max_workers <= 1:
+        results = map(_run_task, jobs)
+        return _assemble(len(datasets), positions, results)
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return _assemble(len(datasets), positions, pool.map(_run_task, jobs))
+
+
+def _assemble(n_sets, positions, results):
+    out = {}
+    for index, result in zip(positions, results):
+        for key, value in result.items():
+            if key not in out:
+                out[key] = np.empty(n_sets, dtype=value.dtype)
+            out[key][index] = value
+    return out
+
+
+# --- 示例: 各实验的示例数据，以及整个年级数据量下的吞吐量 ---
+if __name__ == "__main__":
+    examples = {
+        "铝件 外径 (mm)": [25.30, 25.30, 25.40, 25.28, 25.30, 25.34, 25.30],
+        "铝件 凹槽深度 (mm)": [22.10, 22.16, 22.00, 21.80, 22.10, 22.26, 22.14],
+        "转动惯量 角加速度 (rad/s²)": [0.21389, 0.21515, 0.21743, 0.21997, 0.21693, 0.21849],
+        "牛顿环 第11环直径 (mm)": [5.513, 5.460, 5.516, 5.472, 5.527],
+    }
+    result = bootstrap_uncertainty(list(examples.values()))
+    print("--- 平均值的不确定度 (95% 区间) ---")
+    for i, name in enumerate(examples):
+        r = {k: v[i] for k, v in result.items()}
+        print(f"\n{name}: 平均值 {r['mean']:.5g} ({'精确枚举' if r['exact'] else '随机重抽样'})")
+        print(f"  u_A = s/√n = {r['u_A']:.2g}, 刀切法 {r['u_jack']:.2g}, 自助法 {r['u_boot']:.2g}")
+        print(f"  t 分布区间:  [{r['t_low']:.5g}, {r['t_high']:.5g}]")
+        print(f"  百分位区间:  [{r['pct_low']:.5g}, {r['pct_high']:.5g}]")
+        print(f"  BCa 区间:    [{r['bca_low']:.5g}, {r['bca_high']:.5g}]")
+
+    rng = np.random.default_rng(1)
+    max_workers = os.cpu_count() or 4
+    print(f"\n--- 吞吐量 ({max_workers} 个进程) ---")
+    for n_sets, n in ((200_000, 6), (20_000, 15)):
+        data = 25.3 + 0.03 * rng.standard_normal((n_sets, n))
+        start = time.perf_counter()
+        batch = bootstrap_uncertainty(data, max_workers=max_workers)
+        elapsed = time.perf_counter() - start
+        again = bootstrap_uncertainty(data[:2000], max_workers=1)
+        same = np.array_equal(again["bca_low"], bootstrap_uncertainty(data[:2000], max_workers=2)["bca_low"])
+        print(f"  {n_sets:,} 组 × {n} 个数据: {elapsed:.2f} s ({n_sets / elapsed:,.0f} 组/s)，"
+              f"单进程与多进程结果{'相同' if same else '不同'}")
+    print("\n计算完成！")
@@ -0,0 +1,238 @@
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import 实验公式
+
+# --- 用户输入区 ---
+HOST = "127.0.0.1"   # 只在本机监听
+PORT = 8765
+max_workers = os.cpu_count() or 4   # 批量接口使用的进程数
+batch_chunk_size = 256              # 批量请求拆分给每个进程的数据组数
+# --- END 用户输入区 ---
+
+# 使用方法:
+#   python 计算服务.py          启动服务
+#   python 计算服务.py bench    对已启动的服务做压力测试，报告吞吐量和 p99 延迟
+#
+# 接口 (POST，请求体为 JSON，参数名与 实验公式.py 中对应函数的参数名相同):
+#   /newton_ring        {"groups": [[X1, X1', X11, X11'], ...]}
+#   /wedge              {"groups": [[X_initial, X_final, L_initial, L_final], ...]}
+#   /aluminium_density  {"outer_diameter": [...], "inner_diameter": [...], "depth": [...], "height": [...], "mass": 35.75}
+#   /irregular_density  {"m_a": 10.3, "m_asw": 20.6, "m_osw": 9.15}
+#   /solar_cell_fit     {"voltage": [...], "current_mA": [...], "u_current_mA": [...] (可选)}
+#   /gamma              {"h_mm": [...], "T2_ms2": [...], "m": 0.0485, "A": 0.00082958}
+#   /moment_of_inertia  {"mass_g": 25, "radius_mm": 25, "avg_angular_accel": 2.70786}
+#   /batch              {"endpoint": "newton_ring", "datasets": [{...}, {...}, ...]}
+# GET /stats 返回请求数、吞吐量以及 p50/p99 延迟。
+
+CALCULATORS = {
+    "newton_ring": 实验公式.newton_ring,
+    "wedge": 实验公式.wedge,
+    "aluminium_density": 实验公式.aluminium_density,
+    "irregular_density": 实验公式.irregular_density,
+    "solar_cell_fit": 实验公式.solar_cell_fit,
+    "gamma": 实验公式.gamma_ratio,
+    "moment_of_inertia": 实验公式.moment_of_inertia,
+}
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+# --- 计算部分 (进程池中的 worker 也会调用) ---
+def to_json_value(value):
+    """把 NumPy 结果转换为可 JSON 序列化的值，NaN/inf 转为 null"""
+    value = np.asarray(value).tolist()
+    if isinstance(value, list):
+        return [to_json_value(v) for v in value]
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def compute(endpoint, params):
+    """计算一组数据，参数错误时抛出 ValueError"""
+    func = CALCULATORS.get(endpoint)
+    if func is None:
+        raise ValueError(f"未知的计算接口: {endpoint}")
+    if not isinstance(params, dict):
+        raise ValueError("请求体必须是 JSON 对象")
+    try:
+        result = func(**params)
+    except (TypeError, IndexError) as e:
+        raise ValueError(f"参数错误: {e}") from e
+    return {key: to_json_value(val) for key, val in result.items()}
+
+
+def compute_chunk(endpoint, datasets):
+    """worker 进程中计算一批数据组，单组出错不影响其他组"""
+    results = []
+    for params in datasets:
+        try:
+            results.append(compute(endpoint, params))
+        except ValueError as e:
+            results.append({"error": str(e)})
+    return results
+
+
+# --- HTTP 服务 ---
+class CalculatorServer:
+    def __init__(self, pool):
+        self.pool = pool
+        self.latencies = deque(maxlen=100000)  # 最近请求的处理延迟 (s)
+        self.started = time.perf_counter()
+        self.request_count = 0
+
+    async def dispatch(self, method, path, body):
+        """根据路径分发请求，返回 (状态码, JSON 对象)"""
+        endpoint = path.strip("/")
+        if method == "GET" and endpoint == "stats":
+            return 200, self.stats()
+        if method != "POST":
+            return 405, {"error": "只支持 POST 请求"}
+        if endpoint != "batch" and endpoint not in CALCULATORS:
+            return 404, {"error": f"未知的计算接口: {path}"}
+        try:
+            params = json.loads(body or b"{}")
+        except ValueError:
+            return 400, {"error": "请求体不是合法的 JSON"}
+
+        try:
+            if endpoint == "batch":
+                return 200, {"results": await self.run_batch(params)}
+            # 单组计算只需几十微秒，直接在事件循环中完成比转交进程池更快
+            return 200, compute(endpoint, params)
+        except ValueError as e:
+            return 400, {"error": str(e)}
+
+    async def run_batch(self, params):
+        """把批量请求按 batch_chunk_size 拆分后交给进程池并行计算"""
+        if not isinstance(params, dict):
+            raise ValueError("请求体必须是 JSON 对象")
+        endpoint = params.get("endpoint")
+        datasets = params.get("datasets")
+        if endpoint not in CALCULATORS:
+            raise ValueError(f"未知的计算接口: {endpoint}")
+        if not isinstance(datasets, list):
+            raise ValueError("datasets 必须是数组")
+        loop = asyncio.get_running_loop()
+        chunks = [datasets[i:i + batch_chunk_size] for i in range(0, len(datasets), batch_chunk_size)]
+        parts = await asyncio.gather(*[loop.run_in_executor(self.pool, compute_chunk, endpoint, chunk)
+                                       for chunk in chunks])
+        return [result for part in parts for result in part]
+
+    def stats(self):
+        """请求数、吞吐量和延迟分位数"""
+        elapsed = time.perf_counter() - self.started
+        result = {"requests": self.request_count,
+                  "requests_per_second": self.request_count / elapsed if elapsed > 0 else 0.0}
+        if self.latencies:
+            lat_ms = np.array(self.latencies) * 1000
+            result.update({"p50_ms": float(np.percentile(lat_ms, 50)),
+                           "p99_ms": float(np.percentile(lat_ms, 99)),
+                           "max_ms": float(lat_ms.max())})
+        return result
+
+    async def handle_connection(self, reader, writer):
+        """处理一个 HTTP/1.1 连接 (支持 keep-alive)"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                parts = request_line.decode("latin-1").split()
+                if len(parts) < 2:
+                    break
+                method, path = parts[0], parts[1]
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                start = time.perf_counter()
+                status, payload = await self.dispatch(method, path, body)
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                writer.write((f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                              f"Content-Type: application/json; charset=utf-8\r\n"
+                              f"Content-Length: {len(data)}\r\n\r\n").encode("latin-1") + data)
+                await writer.drain()
+                self.latencies.append(time.perf_counter() - start)
+                self.request_count += 1
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve():
+    """启动服务直到 Ctrl+C"""
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        server = CalculatorServer(pool)
+        tcp_server = await asyncio.start_server(server.handle_connection, HOST, PORT)
+        print(f"计算服务已启动: http://{HOST}:{PORT}  (进程池 {max_workers} 个 worker)")
+        try:
+            async with tcp_server:
+                await tcp_server.serve_forever()
+        finally:
+            print(f"\n服务已停止，统计: {server.stats()}")
+
+
+# --- 压力测试 ---
+async def bench_client(path, body, n_requests, latencies):
+    """单个 keep-alive 连接上顺序发送 n_requests 个请求"""
+    reader, writer = await asyncio.open_connection(HOST, PORT)
+    request = (f"POST {path} HTTP/1.1\r\nHost: {HOST}\r\nContent-Type: application/json\r\n"
+               f"Content-Length: {len(body)}\r\n\r\n").encode("latin-1") + body
+    for _ in range(n_requests):
+        start = time.perf_counter()
+        writer.write(request)
+        await writer.drain()
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":")[1])
+        await reader.readexactly(length)
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+
+
+async def bench(n_connections=16, requests_per_connection=200):
+    """用牛顿环示例数据测试单组接口的吞吐量和延迟"""
+    body = json.dumps({"groups": [[19.672, 21.961, 18.038, 23.551], [19.688, 21.975, 18.040, 23.500],
+                                  [19.712, 21.978, 18.052, 23.568], [19.712, 21.962, 18.038, 23.510],
+                                  [19.722, 22.012, 18.061, 23.588]]}).encode("utf-8")
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*[bench_client("/newton_ring", body, requests_per_connection, latencies)
+                           for _ in range(n_connections)])
+    elapsed = time.perf_counter() - start
+    lat_ms = np.array(latencies) * 1000
+    print(f"请求数: {len(latencies)}, 并发连接: {n_connections}, 用时 {elapsed:.2f} s")
+    print(f"吞吐量: {len(latencies) / elapsed:.0f} 请求/秒")
+    print(f"延迟: p50 = {np.percentile(lat_ms, 50):.2f} ms, p99 = {np.percentile(lat_ms, 99):.2f} ms")
+
+
+if __name__ == "__main__":
+    try:
+        if len(sys.argv) > 1 and sys.argv[1] == "bench":
+            asyncio.run(bench())
+        else:
+            asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
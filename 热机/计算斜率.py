@@ -1,7 +1,14 @@
+import os
+import sys
+
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.font_manager as fm
 
+# 逐点诊断使用 数据处理工具/拟合诊断.py (与批量检查的强影响点规则相同)
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "数据处理工具"))
+from 拟合诊断 import fit_diagnostics, cook_threshold_for
+
 # --- 1. 输入实验数据 ---
 # 注意：请用你自己的实验数据替换以下示例数据
 # 高度 h，单位：毫米 (mm)
@@ -52,6 +59,18 @@ print(f"线性拟合结果:")
 print(f"斜率 K = {K_mm_ms2:.4f} mm/ms²")
 print(f"截距 b = {b_mm:.4f} mm")
 
+# 逐点诊断: 杠杆值 h_i = 1/n + (x_i - x̄)²/Sxx，Cook 距离，以及去掉该点后的斜率 (由解析式得到，无需重新拟合)
+# Cook 距离超过按点数取的阈值 (正常数据中约 5% 的数据组会超过) 标为影响较大
+n_points = len(T2_data_ms2)
+if n_points > 3:
+    diag = fit_diagnostics(T2_data_ms2, h_data_mm)
+    print(f"\n逐点诊断 (Cook 距离 > {cook_threshold_for(n_points):.3f} 的点对斜率影响较大，建议检查该点读数):")
+    print(f"{'点':>3} {'T² (ms²)':>10} {'h (mm)':>8} {'残差 (mm)':>10} {'杠杆值':>7} {'Cook距离':>8} {'去掉后 K':>10}")
+    for i in range(n_points):
+        mark = "  <- 影响较大" if diag["influential"][i] else ""
+        print(f"{i + 1:>3} {T2_data_ms2[i]:>10.2f} {h_data_mm[i]:>8.2f} {diag['residuals'][i]:>10.3f} "
+              f"{diag['leverage'][i]:>7.3f} {diag['cooks_d'][i]:>8.3f} {diag['loo_slope'][i]:>10.4f}{mark}")
+
 # --- 3. 计算比热容比 gamma --- 
 # 单位换算：斜率从 mm/ms² 转换为 m/s²
 K_m_s2 = K_mm_ms2 * 1000.0
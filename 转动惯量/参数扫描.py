@@ -0,0 +1,175 @@
+import time
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+# 解决matplotlib中文显示问题
+plt.rcParams['font.sans-serif'] = ['SimHei']  # 指定默认字体为黑体
+plt.rcParams['axes.unicode_minus'] = False  # 解决保存图像是负号'-'显示为方块的问题
+
+# --- 用户输入区 ---
+# 实验前规划用: 在 (重物质量 m, 塔轮半径 r, 角加速度 α) 的网格上计算
+#   驱动力矩 τ = m(g - αr)r,  总转动惯量 I = τ/α
+# 以及 I 对各输入量的灵敏系数 ∂I/∂m、∂I/∂r、∂I/∂α 和各输入量对 u(I)² 的贡献比例。
+# αr ≥ g 的区域模型无效 (力矩非正)，在图中以灰色标出。
+mass_g_grid = np.linspace(5, 100, 200)        # 重物质量 (g)
+radius_mm_grid = np.linspace(5, 40, 250)      # 塔轮半径 (mm)
+alpha_grid = np.geomspace(0.05, 50, 250)      # 角加速度 (rad/s²)，实验中一般为 0.2-3，按对数均匀取点
+
+# 各输入量的标准不确定度，用于估计 I 的相对不确定度
+u_mass_g = 0.05 / np.sqrt(3)      # 物理天平 (g)
+u_radius_mm = 0.02 / np.sqrt(3)   # 游标卡尺 (mm)
+u_alpha_rel = 0.005               # 角加速度的相对不确定度 (可由 求A类不确定度.py 的结果估计)
+
+heatmap_mass_g = 25               # 画 τ、I 热力图时使用的重物质量 (取网格中最接近的值)
+chunk_points = 2_000_000          # 每块计算的网格点数，控制内存占用
+sensitivity_file = 'inertia_sweep_sensitivity.npz'  # 热力图所用质量下的灵敏系数和贡献比例
+
+g = 9.8 # 重力加速度 (m/s²)
+# --- END 用户输入区 ---
+
+
+# --- 辅助计算函数 ---
+def evaluate_chunk(mass_kg, radius_m, alpha):
+    """
+    在广播网格上计算 τ、I 及 I 的相对不确定度，模型无效处为 NaN。
+
+    Args:
+        mass_kg (np.ndarray): 形状 (mc, 1, 1) 的质量 (kg)。
+        radius_m (np.ndarray): 形状 (1, nr, 1) 的半径 (m)。
+        alpha (np.ndarray): 形状 (1, 1, na) 的角加速度 (rad/s²)。
+
+    Returns:
+        tuple: torque, inertia, rel_u_inertia, sensitivity, 前三个形状为 (mc, nr, na)；
+               sensitivity 为 dict: dI_dm (m²), dI_dr (kg·m), dI_dalpha (kg·m²·s²)，
+               以及 share_m、share_r、share_alpha (对 u(I)² 的贡献比例，三者之和为1)
+    """
+    alpha_r = alpha * radius_m
+    valid = alpha_r < g
+    torque = mass_kg * (g - alpha_r) * radius_m
+    inertia = torque / alpha
+    # I = m g r/α - m r²  的偏导数 (灵敏系数)
+    dI_dm = (g - alpha_r) * radius_m / alpha
+    dI_dr = mass_kg * (g - 2 * alpha_r) / alpha
+    dI_dalpha = -mass_kg * g * radius_m / alpha**2
+    var_m = (dI_dm * u_mass_g / 1000.0)**2
+    var_r = (dI_dr * u_radius_mm / 1000.0)**2
+    var_alpha = (dI_dalpha * u_alpha_rel * alpha)**2
+    var_total = var_m + var_r + var_alpha
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rel_u_inertia = np.sqrt(var_total) / inertia
+    sensitivity = {"dI_dm": dI_dm, "dI_dr": dI_dr, "dI_dalpha": dI_dalpha,
+                   "share_m": var_m / var_total, "share_r": var_r / var_total, "share_alpha": var_alpha / var_total}
+    sensitivity = {k: np.where(valid, np.broadcast_to(v, torque.shape), np.nan) for k, v in sensitivity.items()}
+    torque = np.where(valid, torque, np.nan)
+    inertia = np.where(valid, inertia, np.nan)
+    rel_u_inertia = np.where(valid, rel_u_inertia, np.nan)
+    return torque, inertia, rel_u_inertia, sensitivity
+
+
+def plot_heatmap(ax, data, title, label):
+    """在 (α, r) 平面上画热力图，无效区域显示为灰色"""
+    cmap = plt.get_cmap("viridis").copy()
+    cmap.set_bad("lightgray")
+    mesh = ax.pcolormesh(alpha_grid, radius_mm_grid, np.ma.masked_invalid(data), cmap=cmap, shading="auto")
+    boundary_mm = g / alpha_grid * 1000.0
+    if np.any(boundary_mm <= radius_mm_grid.max()):  # 网格内出现模型无效区域时画出边界
+        ax.plot(alpha_grid, np.where(boundary_mm <= radius_mm_grid.max(), boundary_mm, np.nan), 'r--', lw=1, label='αr = g')
+        ax.legend(loc='upper right')
+    ax.set_ylim(radius_mm_grid.min(), radius_mm_grid.max())
+    ax.set_xscale('log')
+    ax.set_xlabel('角加速度 α (rad/s²)')
+    ax.set_ylabel('塔轮半径 r (mm)')
+    ax.set_title(title)
+    plt.colorbar(mesh, ax=ax, label=label)
+
+
+# --- 主要计算逻辑 ---
+n_m, n_r, n_a = len(mass_g_grid), len(radius_mm_grid), len(alpha_grid)
+if n_m == 0 or n_r == 0 or n_a == 0:
+    print("错误：网格为空，请检查 mass_g_grid、radius_mm_grid 和 alpha_grid。")
+    exit()
+if np.any(alpha_grid == 0):
+    print("错误：角加速度网格中不能包含0！")
+    exit()
+
+radius_m = (radius_mm_grid / 1000.0)[None, :, None]
+alpha = alpha_grid[None, None, :]
+masses_per_chunk = max(1, chunk_points // (n_r * n_a))
+heatmap_index = int(np.argmin(np.abs(mass_g_grid - heatmap_mass_g)))
+
+best_rel_u = np.full((n_r, n_a), np.inf)   # 每个 (r, α) 上所有质量中最小的 u(I)/I
+best_mass_index = np.zeros((n_r, n_a), dtype=int)
+n_invalid = 0
+
+start = time.perf_counter()
+for m_start in range(0, n_m, masses_per_chunk):
+    m_stop = min(m_start + masses_per_chunk, n_m)
+    mass_kg = (mass_g_grid[m_start:m_stop] / 1000.0)[:, None, None]
+    torque, inertia, rel_u, sensitivity = evaluate_chunk(mass_kg, radius_m, alpha)
+    n_invalid += int(np.isnan(inertia).sum())
+
+    rel_u_filled = np.where(np.isnan(rel_u), np.inf, rel_u)
+    chunk_best = rel_u_filled.min(axis=0)
+    improved = chunk_best < best_rel_u
+    best_mass_index[improved] = m_start + rel_u_filled.argmin(axis=0)[improved]
+    best_rel_u[improved] = chunk_best[improved]
+
+    if m_start <= heatmap_index < m_stop:
+        torque_map = torque[heatmap_index - m_start]
+        inertia_map = inertia[heatmap_index - m_start]
+        rel_u_map = rel_u[heatmap_index - m_start]
+        sensitivity_map = {k: v[heatmap_index - m_start] for k, v in sensitivity.items()}
+elapsed = time.perf_counter() - start
+
+n_total = n_m * n_r * n_a
+best_rel_u[np.isinf(best_rel_u)] = np.nan
+
+print("--- 转动惯量参数扫描 ---")
+print(f"网格: m {n_m} × r {n_r} × α {n_a} = {n_total:,} 个点 (每块 {masses_per_chunk * n_r * n_a:,} 个点)")
+print(f"计算用时: {elapsed:.2f} s ({n_total / elapsed / 1e6:.1f} M点/秒)")
+print(f"模型无效 (αr ≥ g) 的点: {n_invalid:,} ({n_invalid / n_total * 100:.1f} %)")
+if np.all(np.isnan(best_rel_u)):
+    print("警告：整个网格都处于模型无效区域，请调整网格范围。")
+else:
+    i_r, i_a = np.unravel_index(np.nanargmin(best_rel_u), best_rel_u.shape)
+    print(f"I 的相对不确定度最小的配置: m = {mass_g_grid[best_mass_index[i_r, i_a]]:.1f} g, "
+          f"r = {radius_mm_grid[i_r]:.1f} mm, α = {alpha_grid[i_a]:.2f} rad/s², "
+          f"u(I)/I = {best_rel_u[i_r, i_a] * 100:.3f} %")
+
+# 实验常用区间 (α = 0.2-3 rad/s²) 内各输入量对 u(I)² 的平均贡献
+lab_range = (alpha_grid >= 0.2) & (alpha_grid <= 3)
+if lab_range.any():
+    print(f"m = {mass_g_grid[heatmap_index]:.1f} g、α = 0.2-3 rad/s² 时对 u(I)² 的平均贡献: "
+          + ", ".join(f"{name} {np.nanmean(sensitivity_map[key][:, lab_range]) * 100:.1f} %"
+                      for name, key in (("质量", "share_m"), ("半径", "share_r"), ("角加速度", "share_alpha"))))
+
+# --- 导出热力图 ---
+mass_label = f"m = {mass_g_grid[heatmap_index]:.1f} g"
+fig, axes = plt.subplots(1, 3, figsize=(18, 5))
+plot_heatmap(axes[0], torque_map, f'驱动力矩 τ ({mass_label})', 'τ (N·m)')
+plot_heatmap(axes[1], inertia_map, f'总转动惯量 I ({mass_label})', 'I (kg·m²)')
+plot_heatmap(axes[2], rel_u_map * 100, f'I 的相对不确定度 ({mass_label})', 'u(I)/I (%)')
+fig.tight_layout()
+fig.savefig('inertia_sweep_heatmap.png')
+print("τ、I 及其相对不确定度热力图已保存为 inertia_sweep_heatmap.png")
+
+fig2, ax = plt.subplots(figsize=(8, 6))
+plot_heatmap(ax, best_rel_u * 100, '各 (r, α) 下选取最佳质量时 I 的相对不确定度', 'min u(I)/I (%)')
+fig2.tight_layout()
+fig2.savefig('inertia_sweep_best_rel_u.png')
+print("最佳质量下的相对不确定度热力图已保存为 inertia_sweep_best_rel_u.png")
+
+fig3, axes = plt.subplots(1, 3, figsize=(18, 5))
+for ax, (name, key) in zip(axes, (("质量 m", "share_m"), ("半径 r", "share_r"), ("角加速度 α", "share_alpha"))):
+    plot_heatmap(ax, sensitivity_map[key] * 100, f'{name} 对 u(I)² 的贡献 ({mass_label})', '贡献比例 (%)')
+fig3.tight_layout()
+fig3.savefig('inertia_sweep_contributions.png')
+print("各输入量对 u(I)² 的贡献热力图已保存为 inertia_sweep_contributions.png")
+
+np.savez_compressed(sensitivity_file, mass_g=mass_g_grid[heatmap_index], radius_mm=radius_mm_grid,
+                    alpha=alpha_grid, rel_u_inertia=rel_u_map, **sensitivity_map)
+print(f"灵敏系数 (∂I/∂m, ∂I/∂r, ∂I/∂α)、贡献比例和 u(I)/I 已导出到 {sensitivity_file} "
+      "(数组形状为 (半径, 角加速度))")
+
+print("\n计算完成！")